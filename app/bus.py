@@ -0,0 +1,100 @@
+"""Cross-worker invalidation bus over Unix datagram sockets.
+
+`manage.py serve` gives every worker the same directory (JORA_BUS_DIR). Each
+worker binds `<dir>/<pid>.sock` and broadcasts remote-enabled events to the
+other sockets there; receivers run the handlers registered with
+`events.subscribe(..., remote=True)`. Delivery is best effort: a worker that
+misses a message falls back to its cache TTLs.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+from typing import Optional
+from app import events
+
+logger = logging.getLogger(__name__)
+
+BUS_DIR_ENV = "JORA_BUS_DIR"
+# Default Unix datagram limits comfortably fit id lists of this size
+MAX_MESSAGE_BYTES = 64 * 1024
+
+class InvalidationBus:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, f"{os.getpid()}.sock")
+        self._sock: Optional[socket.socket] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(self.path)
+        self._sock.setblocking(False)
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self._sock.fileno(), self._receive)
+        events.set_remote_sink(self.broadcast)
+
+    def stop(self) -> None:
+        events.set_remote_sink(None)
+        if self._sock is None:
+            return
+        self._loop.remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def broadcast(self, topic: str, payload: dict) -> None:
+        message = json.dumps({"topic": topic, "payload": payload}, default=str).encode()
+        if len(message) > MAX_MESSAGE_BYTES:
+            logger.warning("Dropping %s broadcast of %d bytes", topic, len(message))
+            return
+        for name in os.listdir(self.directory):
+            peer = os.path.join(self.directory, name)
+            if peer == self.path or not name.endswith(".sock"):
+                continue
+            try:
+                self._sock.sendto(message, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Worker exited without cleaning up
+                try:
+                    os.unlink(peer)
+                except FileNotFoundError:
+                    pass
+            except BlockingIOError:
+                logger.warning("Worker socket %s is full; dropped %s", name, topic)
+
+    def _receive(self) -> None:
+        while True:
+            try:
+                data = self._sock.recv(MAX_MESSAGE_BYTES)
+            except BlockingIOError:
+                return
+            try:
+                message = json.loads(data)
+            except ValueError:
+                logger.warning("Ignoring malformed bus message")
+                continue
+            events.deliver_remote(message["topic"], message["payload"])
+
+_bus: Optional[InvalidationBus] = None
+
+def start() -> None:
+    """Join the bus when running under `manage.py serve`; a no-op otherwise"""
+    global _bus
+    directory = os.environ.get(BUS_DIR_ENV)
+    if not directory:
+        return
+    _bus = InvalidationBus(directory)
+    _bus.start()
+
+def stop() -> None:
+    global _bus
+    if _bus is not None:
+        _bus.stop()
+        _bus = None
@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List
+
+_MISSING = object()
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._epoch = 0  # Bumped by clear()
+        # key -> [loads in flight, invalidations seen]; only keys being loaded are tracked
+        self._loading: Dict[Hashable, List[int]] = {}
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._store(key, value)
+    
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Cached value for `key`, calling `loader` on a miss.
+        
+        A load that overlaps a delete() of the same key or a clear() may have
+        read the state being invalidated, so its result is returned but not
+        cached. Invalidating other keys doesn't affect it.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            loading = self._loading.setdefault(key, [0, 0])
+            loading[0] += 1
+            seen, epoch = loading[1], self._epoch
+        try:
+            value = loader()
+            with self._lock:
+                if loading[1] == seen and self._epoch == epoch:
+                    self._store(key, value)
+        finally:
+            with self._lock:
+                loading[0] -= 1
+                if not loading[0]:
+                    del self._loading[key]
+        return value
+    
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            loading = self._loading.get(key)
+            if loading is not None:
+                loading[1] += 1
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,120 @@
+import zlib
+from typing import Optional
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip is always available
+    brotli = None
+
+# Already compressed or binary payloads gain nothing
+SKIP_TYPES = (b"image/", b"video/", b"audio/", b"application/zip", b"application/gzip", b"text/event-stream")
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.brotli = encoding == "br"
+        if self.brotli:
+            self._impl = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            # wbits 16+ writes a gzip header and trailer
+            self._impl = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._impl.process(data) if self.brotli else self._impl.compress(data)
+
+    def flush(self) -> bytes:
+        """Emit everything buffered so far without ending the stream"""
+        return self._impl.flush() if self.brotli else self._impl.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._impl.finish() if self.brotli else self._impl.flush()
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with brotli (if installed) or gzip.
+
+    Bodies smaller than `minimum_size` go out untouched. Streaming responses are
+    compressed chunk by chunk and flushed as they go, so exports keep streaming.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = None
+        for name, value in scope.get("headers", ()):
+            if name == b"accept-encoding":
+                encoding = negotiate(value.decode("latin-1"))
+                break
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = dict(message.get("headers", ()))
+                content_type = headers.get(b"content-type", b"")
+                if b"content-encoding" in headers or content_type.startswith(SKIP_TYPES):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    await send(start)
+                    await send(message)
+                    passthrough = True
+                    return
+                compressor = _Compressor(encoding)
+                headers = [
+                    (name, value) for name, value in start.get("headers", ())
+                    if name not in (b"content-length", b"content-encoding")
+                ]
+                headers.append((b"content-encoding", encoding.encode()))
+                headers.append((b"vary", b"Accept-Encoding"))
+                if not more_body:
+                    data = compressor.compress(body) + compressor.finish()
+                    headers.append((b"content-length", str(len(data)).encode()))
+                    await send({**start, "headers": headers})
+                    await send({"type": "http.response.body", "body": data})
+                    return
+                await send({**start, "headers": headers})
+
+            if more_body:
+                data = compressor.compress(body) + compressor.flush()
+            else:
+                data = compressor.compress(body) + compressor.finish()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,142 @@
+import json
+import logging
+import threading
+import time
+from typing import Dict, List, Tuple
+from app.config import settings
+from app.database import get_engine, observe_pool_wait
+
+logger = logging.getLogger(__name__)
+
+CRITICAL = "critical"
+NORMAL = "normal"
+LOW = "low"
+
+# Share of the current limit each priority may occupy. Low-priority traffic is
+# shed first, leaving headroom for checkout and payments.
+ADMISSION_SHARE = {LOW: 0.5, NORMAL: 0.8, CRITICAL: 1.0}
+
+class AIMDLimiter:
+    """Adaptive concurrency limit driven by DB pool wait times.
+
+    The limit grows by roughly one per limit's worth of uncongested completions
+    while it is the binding constraint, and is cut multiplicatively (at most once
+    per cooldown) when requests wait too long for a pooled connection.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int,
+                 wait_threshold_ms: float, backoff: float = 0.8, cooldown: float = 1.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.wait_threshold = wait_threshold_ms / 1000
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self.inflight = 0
+        self.shed: Dict[str, int] = {LOW: 0, NORMAL: 0, CRITICAL: 0}
+        self.last_pool_wait_ms = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def try_acquire(self, priority: str) -> bool:
+        with self._lock:
+            if self.inflight >= self.limit * ADMISSION_SHARE[priority]:
+                self.shed[priority] += 1
+                return False
+            if priority == LOW and _pool_saturated():
+                self.shed[priority] += 1
+                return False
+            self.inflight += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.inflight -= 1
+            # Additive increase only when the limit is what's holding traffic back
+            if self.inflight + 1 >= self.limit * ADMISSION_SHARE[NORMAL]:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def record_pool_wait(self, seconds: float) -> None:
+        self.last_pool_wait_ms = seconds * 1000
+        if seconds < self.wait_threshold:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self.limit = max(self.minimum, self.limit * self.backoff)
+        logger.warning("DB pool wait %.0f ms; concurrency limit cut to %.0f", seconds * 1000, self.limit)
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": round(self.limit, 1),
+            "inflight": self.inflight,
+            "last_pool_wait_ms": round(self.last_pool_wait_ms, 1),
+            "shed": dict(self.shed),
+        }
+
+def _pool_saturated() -> bool:
+    pool = get_engine().pool
+    checkedout = getattr(pool, "checkedout", None)
+    if checkedout is None:
+        return False
+    return checkedout() >= settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+
+def _parse_priorities(config: Dict[str, str]) -> List[Tuple[str, str, str]]:
+    """("METHOD", "/path prefix", priority), longest prefix first"""
+    rules = []
+    for route, priority in config.items():
+        method, _, prefix = route.partition(" ")
+        rules.append((method.upper(), prefix.rstrip("*"), priority))
+    return sorted(rules, key=lambda rule: len(rule[1]), reverse=True)
+
+class LoadShedMiddleware:
+    """ASGI middleware that admits /api requests through the adaptive limiter.
+
+    Requests over their priority's share of the limit get 503 with Retry-After
+    immediately instead of queueing on the connection pool.
+    """
+
+    def __init__(self, app, limiter: AIMDLimiter):
+        self.app = app
+        self.limiter = limiter
+        self.rules = _parse_priorities(settings.REQUEST_PRIORITIES)
+        observe_pool_wait(limiter.record_pool_wait)
+
+    def _priority(self, method: str, path: str) -> str:
+        for rule_method, prefix, priority in self.rules:
+            if rule_method in ("*", method) and path.startswith(prefix):
+                return priority
+        return NORMAL
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/api/") or scope["method"] == "OPTIONS":
+            return await self.app(scope, receive, send)
+
+        if not self.limiter.try_acquire(self._priority(scope["method"], scope["path"])):
+            body = json.dumps({"detail": "Service busy, please retry"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(settings.LOAD_SHED_RETRY_AFTER_SECONDS).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
+
+def build_limiter() -> AIMDLimiter:
+    return AIMDLimiter(
+        initial=settings.CONCURRENCY_LIMIT_INITIAL,
+        minimum=settings.CONCURRENCY_LIMIT_MIN,
+        maximum=settings.CONCURRENCY_LIMIT_MAX,
+        wait_threshold_ms=settings.POOL_WAIT_THRESHOLD_MS,
+    )
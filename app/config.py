@@ -1,9 +1,13 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from typing import Optional
 
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
     
     # JWT
     SECRET_KEY: str
@@ -14,11 +18,116 @@ class Settings(BaseSettings):
     # CORS
     FRONTEND_URL: str = "http://localhost:3000"
     
+    # Rate limiting ("<count>/<second|minute|hour|day>[:ip|user|route]" per "METHOD /path")
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # or "redis" (shared across workers)
+    RATE_LIMIT_REDIS_URL: Optional[str] = None
+    RATE_LIMIT_SHARDS: int = 16
+    RATE_LIMIT_TRUSTED_PROXIES: int = 0  # Proxies in front of the app that append to X-Forwarded-For
+    RATE_LIMITS: dict[str, str] = {
+        "POST /api/auth/login": "10/minute:ip",
+        "POST /api/auth/register": "5/minute:ip",
+        "POST /api/cart/add": "60/minute:user",
+    }
+    
+    # Load shedding (adaptive concurrency limit per worker)
+    LOAD_SHED_ENABLED: bool = True
+    CONCURRENCY_LIMIT_INITIAL: int = 30
+    CONCURRENCY_LIMIT_MIN: int = 5
+    CONCURRENCY_LIMIT_MAX: int = 200
+    POOL_WAIT_THRESHOLD_MS: float = 50.0
+    LOAD_SHED_RETRY_AFTER_SECONDS: int = 1
+    # "METHOD /path-prefix" -> critical | normal | low (longest prefix wins, "*" matches any method)
+    REQUEST_PRIORITIES: dict[str, str] = {
+        "POST /api/orders": "critical",
+        "* /api/webhooks": "critical",
+        "* /api/auth": "critical",
+        "GET /api/products": "low",
+        "GET /api/categories": "low",
+        "GET /api/search": "low",
+        "* /api/admin/orders/export": "low",
+    }
+    
+    # Response compression (brotli needs the optional 'brotli' package; gzip otherwise)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    
+    # Server (python manage.py serve)
+    SERVER_WORKERS: int = 0  # 0 = one per available CPU
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = 30
+    
+    # Startup
+    WARMUP_ON_STARTUP: bool = False
+    WARMUP_POOL_CONNECTIONS: int = 5
+    STARTUP_TIME_TARGET_MS: int = 1000
+    
+    # Catalog
+    IMPORT_BATCH_SIZE: int = 1000
+    STOCK_SYNC_CHUNK_SIZE: int = 1000
+    FACET_PRICE_BANDS: list[int] = [1000, 2500, 5000, 10000]
+    FACET_REFRESH_INTERVAL_SECONDS: float = 5.0
+    CHANGE_FEED_MAX_TRANSACTION_SECONDS: int = 300  # Longest a catalog write may stay uncommitted
+    CHANGE_FEED_RETENTION_DAYS: int = 30
+    FEED_OUTPUT_DIR: str = "var/feeds"
+    FEED_PRODUCT_URL: str = "http://localhost:3000/products/{slug}"
+    FEED_FILES_URL: str = "http://localhost:8000/api/catalog/feeds"  # Where sitemap.xml links its chunks
+    FEED_CHUNK_PRODUCTS: int = 10000
+    FEED_BRAND: str = "JORA"
+    FEED_CURRENCY: str = "INR"
+    SUGGEST_WINDOW_DAYS: int = 90  # Sales and searches that weight suggestions
+    SUGGEST_REFRESH_INTERVAL_SECONDS: float = 2.0
+    SUGGEST_RESYNC_SECONDS: int = 900
+    SUGGEST_QUERY_MIN_SEARCHES: int = 5
+    SUGGEST_MAX_QUERIES: int = 5000
+    SNAPSHOT_ENABLED: bool = False  # Serve product detail and categories from the mmap snapshot
+    SNAPSHOT_PATH: str = "var/catalog.snapshot"
+    SNAPSHOT_REBUILD_INTERVAL_SECONDS: float = 10.0
+    SNAPSHOT_CHECK_INTERVAL_SECONDS: float = 1.0
+    
+    # Media uploads (derivatives need Pillow; AVIF is skipped if Pillow lacks libavif)
+    MEDIA_ROOT: str = "var/media"
+    MEDIA_URL: str = "/media"  # Served from MEDIA_ROOT when it is a path; use a CDN URL in front otherwise
+    MEDIA_MAX_UPLOAD_BYTES: int = 20 * 1024 * 1024
+    MEDIA_WIDTHS: list[int] = [320, 640, 1024, 1600]
+    MEDIA_PRIMARY_WIDTH: int = 640
+    MEDIA_FORMATS: list[str] = ["webp", "avif"]
+    MEDIA_QUALITY: int = 80
+    MEDIA_WORKERS: int = 2  # Image processes per API worker
+    
+    # Checkout pricing
+    GST_RATE: float = 0.18
+    FREE_SHIPPING_THRESHOLD: float = 1000
+    FLAT_SHIPPING_COST: float = 100
+    SHIPPING_RULES_RESYNC_SECONDS: int = 300
+    QUOTE_TTL_SECONDS: int = 900
+    RESERVATION_TTL_SECONDS: int = 600  # How long a quote holds its stock
+    RESERVATION_SWEEPER_ENABLED: bool = True
+    RESERVATION_SWEEP_INTERVAL_SECONDS: float = 60.0
+    RESERVATION_SWEEP_BATCH_SIZE: int = 1000
+    
+    # Orders
+    BULK_ORDER_CHUNK_SIZE: int = 500
+    B2B_BULK_ORDER_MAX_LINES: int = 10000
+    
+    # Reporting
+    EXPORT_BATCH_SIZE: int = 2000
+    
     # Payment Gateways
     RAZORPAY_KEY_ID: Optional[str] = None
     RAZORPAY_KEY_SECRET: Optional[str] = None
     STRIPE_SECRET_KEY: Optional[str] = None
     STRIPE_PUBLISHABLE_KEY: Optional[str] = None
+    RAZORPAY_WEBHOOK_SECRET: Optional[str] = None
+    STRIPE_WEBHOOK_SECRET: Optional[str] = None
+    STRIPE_WEBHOOK_TOLERANCE_SECONDS: int = 300
+    PAYMENT_CURRENCY: str = "INR"  # Captures in any other currency are rejected
+    WEBHOOK_INGEST_MAX_BATCH: int = 200
+    WEBHOOK_INGEST_MAX_DELAY_MS: float = 5.0
+    PAYMENT_WORKER_ENABLED: bool = True
+    PAYMENT_EVENT_BATCH_SIZE: int = 200
+    PAYMENT_POLL_INTERVAL_SECONDS: float = 0.5
     
     # Email
     SMTP_HOST: str = "smtp.gmail.com"
@@ -31,12 +140,37 @@ class Settings(BaseSettings):
     SHIPROCKET_EMAIL: Optional[str] = None
     SHIPROCKET_PASSWORD: Optional[str] = None
     
+    SHIPROCKET_PICKUP_LOCATION: str = "Primary"
+    
     # WhatsApp
     WHATSAPP_API_KEY: Optional[str] = None
     WHATSAPP_PHONE_NUMBER: Optional[str] = None
+    WHATSAPP_API_URL: str = "https://graph.facebook.com/v20.0"
+    
+    # Outbox (notifications and shipping run in the background)
+    OUTBOX_WORKER_ENABLED: bool = True
+    INTEGRATION_TRANSPORT: str = "live"  # "fake" logs messages instead of sending them
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 2.0
+    OUTBOX_LEASE_SECONDS: int = 300
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_BACKOFF_BASE_SECONDS: float = 5.0
+    OUTBOX_BACKOFF_MAX_SECONDS: float = 3600.0
+    OUTBOX_CONCURRENCY: dict[str, int] = {"email": 4, "shiprocket": 2, "whatsapp": 4}
     
     class Config:
         env_file = ".env"
         case_sensitive = True
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """Build settings on first use so importing the app has no side effects"""
+    return Settings()
+
+class _LazySettings:
+    """Proxy that defers reading the environment until an attribute is accessed"""
+    
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+
+settings = _LazySettings()
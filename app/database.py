@@ -1,23 +1,114 @@
-from sqlalchemy import create_engine
+import time
+from functools import lru_cache
+from typing import Callable, List
+from sqlalchemy import create_engine, UniqueConstraint
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
-)
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 Base = declarative_base()
 
+# Callbacks receiving how long (seconds) get_db waited for a pooled connection
+_pool_wait_observers: List[Callable[[float], None]] = []
+
+def observe_pool_wait(callback: Callable[[float], None]) -> None:
+    """Register a callback for connection pool wait times (used by load shedding)"""
+    _pool_wait_observers.append(callback)
+
+@lru_cache
+def get_engine() -> Engine:
+    """Create the engine on first use and bind the session factory to it"""
+    engine = create_engine(
+        settings.DATABASE_URL,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT
+    )
+    SessionLocal.configure(bind=engine)
+    return engine
+
 def get_db():
     """Dependency for getting database session"""
+    get_engine()
     db = SessionLocal()
     try:
+        if _pool_wait_observers:
+            # Check out the connection up front so the pool wait can be measured
+            started = time.perf_counter()
+            db.connection()
+            waited = time.perf_counter() - started
+            for observer in _pool_wait_observers:
+                observer(waited)
         yield db
     finally:
         db.close()
+
+def upsert(db, model, rows: list, update_columns: list, increment: bool = False):
+    """Multi-row INSERT that updates `update_columns` when a unique key already exists.
+    
+    Uses MySQL's ON DUPLICATE KEY UPDATE; SQLite/PostgreSQL (local stand-ins) use
+    ON CONFLICT on the table's first unique constraint or primary key. With
+    `increment=True` the incoming values are added to the stored ones instead of
+    replacing them (counter tables).
+    """
+    if not rows:
+        return None
+    
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+    
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table)
+        stmt = stmt.on_duplicate_key_update({
+            col: table.c[col] + stmt.inserted[col] if increment else stmt.inserted[col]
+            for col in update_columns
+        })
+    else:
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        unique_cols = _conflict_columns(table)
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=unique_cols,
+            set_={
+                col: table.c[col] + stmt.excluded[col] if increment else stmt.excluded[col]
+                for col in update_columns
+            }
+        )
+    
+    return db.execute(stmt, rows)
+
+def insert_ignore(db, model, rows: list):
+    """Multi-row INSERT that silently skips rows hitting an existing unique key"""
+    if not rows:
+        return None
+    
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+    
+    if dialect == "mysql":
+        stmt = table.insert().prefix_with("IGNORE")
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table).on_conflict_do_nothing()
+    else:
+        stmt = table.insert().prefix_with("OR IGNORE")
+    
+    return db.execute(stmt, rows)
+
+def _conflict_columns(table) -> list:
+    """Columns of the first single/multi-column unique key, falling back to the primary key"""
+    for column in table.columns:
+        if column.unique:
+            return [column.name]
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint):
+            return [col.name for col in constraint.columns]
+    return [col.name for col in table.primary_key.columns]
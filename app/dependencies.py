@@ -1,3 +1,4 @@
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
@@ -38,6 +39,14 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Logout and password change bump token_version; the user row is loaded anyway
+    if payload.get("ver", 0) != user.token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
     return user
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
@@ -63,3 +72,20 @@ async def get_b2b_user(current_user: User = Depends(get_current_active_user)) ->
             detail="B2B access required"
         )
     return current_user
+
+optional_security = HTTPBearer(auto_error=False)
+
+async def get_optional_user_id(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> Optional[str]:
+    """User id from a valid access token, or None for anonymous requests.
+    
+    Only the token signature is checked (no database lookup), so public pages
+    can personalise cheaply.
+    """
+    if credentials is None:
+        return None
+    payload = decode_token(credentials.credentials)
+    if payload is None or payload.get("type") != "access":
+        return None
+    return payload.get("sub")
@@ -0,0 +1,61 @@
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict], None]
+
+# Topics published by write paths. Payloads are plain dicts of ids.
+STOCK_CHANGED = "stock.changed"  # product_ids, plus variant_ids when known
+PRODUCT_CHANGED = "product.changed"  # product_ids, category_ids (old and new), deleted
+WISHLIST_CHANGED = "wishlist.changed"  # user_id
+CATEGORY_CHANGED = "category.changed"  # category_ids
+SHIPPING_RULES_CHANGED = "shipping_rules.changed"  # no payload
+
+_subscribers: Dict[str, List[Handler]] = defaultdict(list)
+# Handlers that also run for events published by other worker processes
+_remote_subscribers: Dict[str, List[Handler]] = defaultdict(list)
+# Set by the cross-worker bus (app.bus) while this process is a server worker
+_remote_sink: Optional[Callable[[str, dict], None]] = None
+
+def subscribe(topic: str, handler: Optional[Handler] = None, *, remote: bool = False):
+    """Register a handler for a topic (usable as a decorator)
+    
+    `remote=True` is for in-process cache invalidation: the handler also runs when
+    another worker publishes the topic. Handlers doing database work leave it off
+    so the work happens once, in the worker that made the change.
+    """
+    def register(handler: Handler) -> Handler:
+        _subscribers[topic].append(handler)
+        if remote:
+            _remote_subscribers[topic].append(handler)
+        return handler
+    return register(handler) if handler is not None else register
+
+def _deliver(topic: str, payload: dict, handlers: List[Handler]) -> None:
+    for handler in list(handlers):
+        try:
+            handler(payload)
+        except Exception:
+            logger.exception("Event handler %s failed for %s", handler.__name__, topic)
+
+def publish(topic: str, payload: dict) -> None:
+    """Deliver an event to every subscriber. Call only after the change is committed.
+    
+    Handler failures are logged and never propagate back to the writer.
+    """
+    _deliver(topic, payload, _subscribers.get(topic, ()))
+    if _remote_sink is not None and topic in _remote_subscribers:
+        try:
+            _remote_sink(topic, payload)
+        except Exception:
+            logger.exception("Broadcasting %s to other workers failed", topic)
+
+def deliver_remote(topic: str, payload: dict) -> None:
+    """Run the remote-enabled handlers for an event received from another worker"""
+    _deliver(topic, payload, _remote_subscribers.get(topic, ()))
+
+def set_remote_sink(sink: Optional[Callable[[str, dict], None]]) -> None:
+    global _remote_sink
+    _remote_sink = sink
@@ -0,0 +1,116 @@
+"""Sparse fieldsets: `?fields=name,base_price&include=variants.sku,variants.images`
+
+`fields` picks top-level fields of the response schema and `include` adds
+related collections (optionally narrowed with "relation.field"). Only the
+requested columns are loaded and only the requested keys are serialized.
+Without either parameter the full response is returned unchanged.
+"""
+import typing
+from typing import Dict, List, Optional, Set, Type
+from fastapi import HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import load_only, selectinload
+
+def _nested_schema(annotation) -> Optional[Type[BaseModel]]:
+    for candidate in (annotation, *typing.get_args(annotation)):
+        if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+            return candidate
+    return None
+
+def _scalar_fields(schema: Type[BaseModel]) -> List[str]:
+    return [name for name, field in schema.model_fields.items() if _nested_schema(field.annotation) is None]
+
+def _split(value: Optional[str]) -> List[str]:
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
+
+class FieldSet:
+    def __init__(self, schema: Type[BaseModel], fields: Set[str], relations: Dict[str, Optional[Set[str]]]):
+        self.schema = schema
+        self.fields = fields
+        self.relations = relations
+
+    def options(self, model) -> list:
+        """Query options loading only the columns needed for the requested fields"""
+        mapper = sa_inspect(model)
+        columns = {attr.key for attr in mapper.column_attrs}
+        wanted = [getattr(model, name) for name in self.fields if name in columns]
+        options = []
+        for relation, subfields in self.relations.items():
+            prop = mapper.relationships[relation]
+            # Many-to-one loads need the foreign key, or every row lazy-loads it
+            for column in prop.local_columns:
+                key = mapper.get_property_by_column(column).key
+                if key not in self.fields:
+                    wanted.append(getattr(model, key))
+            loader = selectinload(getattr(model, relation))
+            if subfields is not None:
+                related = prop.mapper
+                related_columns = {attr.key for attr in related.column_attrs}
+                loader = loader.load_only(
+                    *(getattr(related.class_, name) for name in subfields if name in related_columns)
+                )
+            options.append(loader)
+        if wanted:
+            options.insert(0, load_only(*wanted))
+        return options
+
+    def dump(self, obj, **overrides) -> dict:
+        """Serialize the requested fields; `overrides` supplies computed values such as in_wishlist"""
+        data = {}
+        for name in self.fields:
+            if name in overrides:
+                data[name] = overrides[name]
+            else:
+                data[name] = getattr(obj, name, self.schema.model_fields[name].default)
+        for relation, subfields in self.relations.items():
+            nested = _nested_schema(self.schema.model_fields[relation].annotation)
+            names = subfields or _scalar_fields(nested)
+            value = getattr(obj, relation)
+            if value is None:
+                data[relation] = None
+            elif isinstance(value, (list, tuple)):
+                data[relation] = [{name: getattr(item, name) for name in names} for item in value]
+            else:
+                data[relation] = {name: getattr(value, name) for name in names}
+        return jsonable_encoder(data)
+
+def parse_fieldset(schema: Type[BaseModel], fields: Optional[str], include: Optional[str]) -> Optional[FieldSet]:
+    if fields is None and include is None:
+        return None
+    scalars = _scalar_fields(schema)
+    requested = _split(fields) if fields is not None else scalars
+    for name in requested:
+        if name not in scalars:
+            raise HTTPException(status_code=400, detail=f"Unknown field '{name}'")
+    selected = set(requested)
+    if "id" in scalars:
+        selected.add("id")
+
+    relations: Dict[str, Optional[Set[str]]] = {}
+    for item in _split(include):
+        relation, _, subfield = item.partition(".")
+        field = schema.model_fields.get(relation)
+        nested = _nested_schema(field.annotation) if field else None
+        if nested is None:
+            raise HTTPException(status_code=400, detail=f"Unknown include '{relation}'")
+        if not subfield:
+            relations[relation] = None
+            continue
+        if subfield not in _scalar_fields(nested):
+            raise HTTPException(status_code=400, detail=f"Unknown field '{item}'")
+        if relation not in relations:
+            relations[relation] = {"id"} if "id" in nested.model_fields else set()
+        if relations[relation] is not None:
+            relations[relation].add(subfield)
+    return FieldSet(schema, selected, relations)
+
+def sparse_fields(schema: Type[BaseModel]):
+    """Dependency returning the requested FieldSet, or None for a full response"""
+    def dependency(
+        fields: Optional[str] = Query(None, description="Comma separated top-level fields"),
+        include: Optional[str] = Query(None, description="Relations to embed, e.g. variants or variants.sku"),
+    ) -> Optional[FieldSet]:
+        return parse_fieldset(schema, fields, include)
+    return dependency
@@ -0,0 +1,49 @@
+import logging
+from typing import Dict
+from app.config import settings
+from app.integrations.base import Transport, TransportError, PermanentTransportError
+from app.integrations.fake import FakeTransport
+
+logger = logging.getLogger(__name__)
+
+EMAIL = "email"
+SHIPROCKET = "shiprocket"
+WHATSAPP = "whatsapp"
+
+def build_transports() -> Dict[str, Transport]:
+    """Live transports for the configured integrations.
+    
+    An unconfigured integration gets no transport, so its messages stay pending
+    until it is configured rather than being reported as sent.
+    INTEGRATION_TRANSPORT=fake uses fakes for every integration (offline runs).
+    """
+    use_fakes = settings.INTEGRATION_TRANSPORT == "fake"
+    transports: Dict[str, Transport] = {}
+    
+    if not use_fakes and settings.SMTP_USER and settings.SMTP_PASSWORD:
+        from app.integrations.email import SMTPTransport
+        transports[EMAIL] = SMTPTransport()
+    if not use_fakes and settings.SHIPROCKET_EMAIL and settings.SHIPROCKET_PASSWORD:
+        from app.integrations.shiprocket import ShiprocketTransport
+        transports[SHIPROCKET] = ShiprocketTransport()
+    if not use_fakes and settings.WHATSAPP_API_KEY and settings.WHATSAPP_PHONE_NUMBER:
+        from app.integrations.whatsapp import WhatsAppTransport
+        transports[WHATSAPP] = WhatsAppTransport()
+    
+    for name in (EMAIL, SHIPROCKET, WHATSAPP):
+        if use_fakes:
+            transports[name] = FakeTransport(name)
+        elif name not in transports:
+            logger.warning("%s is not configured; its outbox messages will wait until it is", name)
+    return transports
+
+__all__ = [
+    "EMAIL",
+    "SHIPROCKET",
+    "WHATSAPP",
+    "Transport",
+    "TransportError",
+    "PermanentTransportError",
+    "FakeTransport",
+    "build_transports",
+]
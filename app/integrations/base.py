@@ -0,0 +1,23 @@
+from typing import List, Optional
+
+class Transport:
+    """Delivers outbox messages for one integration.
+    
+    `send_batch` receives up to `max_batch` messages (dicts with id, kind and
+    payload) and returns one entry per message: None on success or the
+    exception that made it fail. Raising fails the whole batch.
+    """
+    name: str = "transport"
+    max_batch: int = 1
+    
+    async def send_batch(self, messages: List[dict]) -> List[Optional[Exception]]:
+        raise NotImplementedError
+    
+    async def close(self) -> None:
+        pass
+
+class TransportError(Exception):
+    """A delivery failure that is worth retrying"""
+
+class PermanentTransportError(Exception):
+    """A delivery failure that retrying cannot fix; the message is dead-lettered"""
@@ -0,0 +1,67 @@
+import smtplib
+from email.message import EmailMessage
+from typing import List, Optional
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.integrations.base import Transport, PermanentTransportError
+
+SUBJECTS = {
+    "order_confirmation": "Your JORA order {order_number} is confirmed",
+    "order_status": "Your JORA order {order_number} is now {status}",
+    "order_shipped": "Your JORA order {order_number} has shipped",
+    "order_cancelled": "Your JORA order {order_number} was cancelled",
+}
+
+def render(kind: str, payload: dict) -> tuple:
+    """Build (subject, body) for an outbox email"""
+    subject = SUBJECTS.get(kind, "Update on your JORA order {order_number}").format(**payload)
+    lines = [f"Hi {payload.get('first_name') or 'there'},", "", subject + "."]
+    if payload.get("tracking_number"):
+        lines.append(f"Tracking number: {payload['tracking_number']}")
+    if payload.get("total_amount") is not None:
+        lines.append(f"Order total: ₹{payload['total_amount']}")
+    lines += ["", "Thank you for shopping with JORA."]
+    return subject, "\n".join(lines)
+
+class SMTPTransport(Transport):
+    """Sends a whole batch of emails over one SMTP session"""
+    name = "email"
+    max_batch = 50
+    
+    def _send(self, messages: List[dict]) -> List[Optional[Exception]]:
+        results = []
+        # Connecting or logging in may fail the whole batch; nothing has been sent yet
+        smtp = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=30)
+        try:
+            smtp.starttls()
+            smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+            for message in messages:
+                payload = message["payload"]
+                if not payload.get("email"):
+                    results.append(PermanentTransportError("No recipient email"))
+                    continue
+                subject, body = render(message["kind"], payload)
+                mail = EmailMessage()
+                mail["From"] = settings.FROM_EMAIL
+                mail["To"] = payload["email"]
+                mail["Subject"] = subject
+                mail.set_content(body)
+                try:
+                    smtp.send_message(mail)
+                    results.append(None)
+                except smtplib.SMTPRecipientsRefused as exc:
+                    results.append(PermanentTransportError(str(exc)))
+                except (smtplib.SMTPException, OSError) as exc:
+                    results.append(exc)
+        except BaseException:
+            smtp.close()
+            raise
+        # Everything was handed over; a failing QUIT must not re-send the batch
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+        return results
+    
+    async def send_batch(self, messages: List[dict]) -> List[Optional[Exception]]:
+        return await run_in_threadpool(self._send, messages)
@@ -0,0 +1,31 @@
+import logging
+import random
+from typing import List, Optional
+from app.integrations.base import Transport, TransportError
+
+logger = logging.getLogger(__name__)
+
+class FakeTransport(Transport):
+    """Records messages instead of sending them, for local runs and tests.
+    
+    `failure_rate` makes a share of deliveries fail so retry and dead-letter
+    handling can be exercised offline.
+    """
+    
+    def __init__(self, name: str, max_batch: int = 50, failure_rate: float = 0.0):
+        self.name = name
+        self.max_batch = max_batch
+        self.failure_rate = failure_rate
+        self.sent: List[dict] = []
+    
+    async def send_batch(self, messages: List[dict]) -> List[Optional[Exception]]:
+        results = []
+        for message in messages:
+            if self.failure_rate and random.random() < self.failure_rate:
+                results.append(TransportError("simulated failure"))
+                continue
+            self.sent.append(message)
+            # Payloads carry customer details; the id is enough to find the row
+            logger.info("[%s] %s #%s", self.name, message["kind"], message["id"])
+            results.append(None)
+        return results
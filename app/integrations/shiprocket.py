@@ -0,0 +1,88 @@
+import asyncio
+import time
+from typing import List, Optional
+import httpx
+from app.config import settings
+from app.integrations.base import Transport, TransportError, PermanentTransportError
+
+BASE_URL = "https://apiv2.shiprocket.in/v1/external"
+TOKEN_TTL_SECONDS = 9 * 24 * 3600  # Shiprocket tokens are valid for 10 days
+
+class ShiprocketTransport(Transport):
+    """Books shipments, one create-order call per message.
+
+    Shiprocket has no bulk order API, so a "batch" is parallel single-order
+    delivery sharing one auth token and connection pool, with at most
+    `max_in_flight` calls open at once across every batch of this transport.
+    """
+    name = "shiprocket"
+    max_batch = 25
+    max_in_flight = 5
+    
+    def __init__(self):
+        self._client = httpx.AsyncClient(base_url=BASE_URL, timeout=20)
+        self._token = None
+        self._token_expires = 0.0
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+    
+    async def _auth_headers(self) -> dict:
+        if not self._token or time.monotonic() > self._token_expires:
+            response = await self._client.post("/auth/login", json={
+                "email": settings.SHIPROCKET_EMAIL,
+                "password": settings.SHIPROCKET_PASSWORD,
+            })
+            if response.status_code >= 400:
+                raise TransportError(f"Shiprocket login failed: {response.status_code}")
+            self._token = response.json()["token"]
+            self._token_expires = time.monotonic() + TOKEN_TTL_SECONDS
+        return {"Authorization": f"Bearer {self._token}"}
+    
+    @staticmethod
+    def _order_body(payload: dict) -> dict:
+        address = payload.get("shipping_address") or {}
+        return {
+            "order_id": payload["order_number"],
+            "order_date": payload["created_at"],
+            "pickup_location": settings.SHIPROCKET_PICKUP_LOCATION,
+            "billing_customer_name": payload.get("first_name") or "",
+            "billing_last_name": payload.get("last_name") or "",
+            "billing_address": address.get("address_line1", ""),
+            "billing_address_2": address.get("address_line2") or "",
+            "billing_city": address.get("city", ""),
+            "billing_pincode": address.get("pincode", ""),
+            "billing_state": address.get("state", ""),
+            "billing_country": address.get("country", "India"),
+            "billing_email": payload.get("email") or "",
+            "billing_phone": payload.get("phone") or "",
+            "shipping_is_billing": True,
+            "order_items": [
+                {"name": item["name"], "sku": item["sku"], "units": item["quantity"],
+                 "selling_price": item["unit_price"]}
+                for item in payload.get("items", [])
+            ],
+            "payment_method": "Prepaid",
+            "sub_total": payload["subtotal"],
+            "length": 30, "breadth": 25, "height": 5,
+            "weight": 0.5 * sum(item["quantity"] for item in payload.get("items", [])),
+        }
+    
+    async def _create(self, headers: dict, message: dict) -> Optional[Exception]:
+        try:
+            async with self._in_flight:
+                response = await self._client.post(
+                    "/orders/create/adhoc", json=self._order_body(message["payload"]), headers=headers
+                )
+        except httpx.HTTPError as exc:
+            return TransportError(str(exc))
+        if response.status_code == 422:
+            return PermanentTransportError(response.text[:500])
+        if response.status_code >= 400:
+            return TransportError(f"{response.status_code}: {response.text[:500]}")
+        return None
+    
+    async def send_batch(self, messages: List[dict]) -> List[Optional[Exception]]:
+        headers = await self._auth_headers()
+        return await asyncio.gather(*(self._create(headers, message) for message in messages))
+    
+    async def close(self) -> None:
+        await self._client.aclose()
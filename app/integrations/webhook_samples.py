@@ -0,0 +1,73 @@
+"""Recorded Razorpay/Stripe webhook payload shapes, used to replay events locally.
+
+Only the fields the payment processor reads are kept; ids and amounts are
+filled in per event so a burst can target real orders in a dev database.
+"""
+import hashlib
+import hmac
+import json
+import time
+import uuid
+from app.config import settings
+
+def razorpay_event(event_type: str, order_id: str, amount_paise: int = 249900) -> dict:
+    payment_id = f"pay_{uuid.uuid4().hex[:14]}"
+    entity = {
+        "id": payment_id,
+        "entity": "payment",
+        "amount": amount_paise,
+        "currency": "INR",
+        "status": "failed" if event_type == "payment.failed" else "captured",
+        "order_id": f"order_{uuid.uuid4().hex[:14]}",
+        "method": "upi",
+        "captured": event_type != "payment.failed",
+        "notes": {"order_id": order_id},
+        "created_at": int(time.time()),
+    }
+    return {
+        "entity": "event",
+        "account_id": "acc_local",
+        "event": event_type,
+        "contains": ["payment"],
+        "payload": {"payment": {"entity": entity}},
+        "created_at": int(time.time()),
+    }
+
+def stripe_event(event_type: str, order_id: str, amount: int = 249900) -> dict:
+    intent_id = f"pi_{uuid.uuid4().hex[:24]}"
+    return {
+        "id": f"evt_{uuid.uuid4().hex[:24]}",
+        "object": "event",
+        "type": event_type,
+        "created": int(time.time()),
+        "livemode": False,
+        "data": {
+            "object": {
+                "id": intent_id,
+                "object": "payment_intent",
+                "amount": amount,
+                "currency": "inr",
+                "status": "succeeded" if event_type == "payment_intent.succeeded" else "requires_payment_method",
+                "metadata": {"order_id": order_id},
+            }
+        },
+    }
+
+def signed_razorpay(event: dict, event_id: str = None) -> tuple:
+    """(body, headers) for a Razorpay delivery signed with RAZORPAY_WEBHOOK_SECRET"""
+    body = json.dumps(event).encode()
+    signature = hmac.new(settings.RAZORPAY_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    return body, {
+        "Content-Type": "application/json",
+        "X-Razorpay-Signature": signature,
+        "X-Razorpay-Event-Id": event_id or f"evt_{uuid.uuid4().hex[:14]}",
+    }
+
+def signed_stripe(event: dict) -> tuple:
+    """(body, headers) for a Stripe delivery signed with STRIPE_WEBHOOK_SECRET"""
+    body = json.dumps(event).encode()
+    timestamp = str(int(time.time()))
+    signature = hmac.new(
+        settings.STRIPE_WEBHOOK_SECRET.encode(), f"{timestamp}.".encode() + body, hashlib.sha256
+    ).hexdigest()
+    return body, {"Content-Type": "application/json", "Stripe-Signature": f"t={timestamp},v1={signature}"}
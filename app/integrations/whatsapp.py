@@ -0,0 +1,51 @@
+from typing import List, Optional
+import httpx
+from app.config import settings
+from app.integrations.base import Transport, TransportError, PermanentTransportError
+
+TEMPLATES = {
+    "order_confirmation": "Hi {first_name}, your JORA order {order_number} is confirmed. Total: ₹{total_amount}",
+    "order_shipped": "Hi {first_name}, your JORA order {order_number} has shipped. Tracking: {tracking_number}",
+    "order_cancelled": "Hi {first_name}, your JORA order {order_number} was cancelled.",
+}
+
+class WhatsAppTransport(Transport):
+    """Sends text messages through the WhatsApp Business Cloud API"""
+    name = "whatsapp"
+    max_batch = 20
+    
+    def __init__(self):
+        self._client = httpx.AsyncClient(timeout=15)
+    
+    async def _send(self, message: dict) -> Optional[Exception]:
+        payload = message["payload"]
+        if not payload.get("phone"):
+            return PermanentTransportError("No recipient phone number")
+        template = TEMPLATES.get(message["kind"])
+        if template is None:
+            return PermanentTransportError(f"No WhatsApp template for {message['kind']}")
+        text = template.format_map({"first_name": "", "tracking_number": "", **payload})
+        try:
+            response = await self._client.post(
+                f"{settings.WHATSAPP_API_URL}/{settings.WHATSAPP_PHONE_NUMBER}/messages",
+                headers={"Authorization": f"Bearer {settings.WHATSAPP_API_KEY}"},
+                json={
+                    "messaging_product": "whatsapp",
+                    "to": payload["phone"],
+                    "type": "text",
+                    "text": {"body": text},
+                },
+            )
+        except httpx.HTTPError as exc:
+            return TransportError(str(exc))
+        if 400 <= response.status_code < 500 and response.status_code != 429:
+            return PermanentTransportError(f"{response.status_code}: {response.text[:500]}")
+        if response.status_code >= 400:
+            return TransportError(f"{response.status_code}: {response.text[:500]}")
+        return None
+    
+    async def send_batch(self, messages: List[dict]) -> List[Optional[Exception]]:
+        return [await self._send(message) for message in messages]
+    
+    async def close(self) -> None:
+        await self._client.aclose()
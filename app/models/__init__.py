@@ -8,6 +8,17 @@ from app.models.order import Order, OrderItem, OrderStatus, PaymentStatus
 from app.models.cart import Cart, Wishlist
 from app.models.coupon import Coupon, DiscountType
 from app.models.b2b import B2BCustomer, ApprovalStatus
+from app.models.analytics import DailySales, DailyVariantSales, DailyCategorySales
+from app.models.outbox import OutboxMessage, OutboxStatus
+from app.models.payment_event import PaymentEvent, PaymentEventStatus
+from app.models.facet import CategoryFacet
+from app.models.listing import ProductListing
+from app.models.token import RevokedToken
+from app.models.catalog_change import CatalogChange
+from app.models.media import MediaAsset
+from app.models.shipping import ShippingZone, ShippingZonePrefix, TaxRule
+from app.models.search import SearchQuery
+from app.models.reservation import StockReservation
 
 __all__ = [
     "User",
@@ -27,4 +38,21 @@ __all__ = [
     "DiscountType",
     "B2BCustomer",
     "ApprovalStatus",
+    "DailySales",
+    "DailyVariantSales",
+    "DailyCategorySales",
+    "OutboxMessage",
+    "OutboxStatus",
+    "PaymentEvent",
+    "PaymentEventStatus",
+    "CategoryFacet",
+    "ProductListing",
+    "RevokedToken",
+    "CatalogChange",
+    "MediaAsset",
+    "ShippingZone",
+    "ShippingZonePrefix",
+    "TaxRule",
+    "SearchQuery",
+    "StockReservation",
 ]
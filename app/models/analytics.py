@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, Date, Numeric, Enum as SQLEnum
+from app.database import Base
+from app.models.order import OrderStatus, PaymentStatus
+
+# Rollups are keyed by the order's creation day and its current statuses.
+# Variant/category id 0 collects items whose variant or category is gone.
+
+class DailySales(Base):
+    __tablename__ = "sales_daily"
+    
+    day = Column(Date, primary_key=True)
+    status = Column(SQLEnum(OrderStatus), primary_key=True)
+    payment_status = Column(SQLEnum(PaymentStatus), primary_key=True)
+    orders_count = Column(Integer, default=0, nullable=False)
+    units = Column(Integer, default=0, nullable=False)
+    revenue = Column(Numeric(14, 2), default=0, nullable=False)
+
+class DailyVariantSales(Base):
+    __tablename__ = "sales_daily_variant"
+    
+    day = Column(Date, primary_key=True)
+    product_variant_id = Column(Integer, primary_key=True, autoincrement=False)
+    status = Column(SQLEnum(OrderStatus), primary_key=True)
+    payment_status = Column(SQLEnum(PaymentStatus), primary_key=True)
+    units = Column(Integer, default=0, nullable=False)
+    revenue = Column(Numeric(14, 2), default=0, nullable=False)
+
+class DailyCategorySales(Base):
+    __tablename__ = "sales_daily_category"
+    
+    day = Column(Date, primary_key=True)
+    category_id = Column(Integer, primary_key=True, autoincrement=False)
+    status = Column(SQLEnum(OrderStatus), primary_key=True)
+    payment_status = Column(SQLEnum(PaymentStatus), primary_key=True)
+    units = Column(Integer, default=0, nullable=False)
+    revenue = Column(Numeric(14, 2), default=0, nullable=False)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Index, func
+from app.database import Base
+
+class CatalogChange(Base):
+    """Append-only catalog change log; `version` orders every change"""
+    __tablename__ = "catalog_changes"
+    
+    # SQLite only autoincrements an INTEGER PRIMARY KEY
+    version = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    entity = Column(String(20), nullable=False)  # "product" or "category"
+    entity_id = Column(String(36), nullable=False)
+    op = Column(String(10), nullable=False)  # "upsert" or "delete"
+    changed_at = Column(DateTime, default=func.now(), nullable=False)  # Database clock, not the app host's
+    
+    __table_args__ = (
+        Index("ix_catalog_changes_changed_at", "changed_at"),
+    )
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String
+from app.database import Base
+
+class CategoryFacet(Base):
+    """Precomputed product counts per facet value, per category.
+    
+    category_id 0 holds counts across the whole catalog, summed from the other
+    rows; -1 holds products without a category. Facets are "size",
+    "color", "price" (band label) and "availability" ("in_stock").
+    """
+    __tablename__ = "category_facets"
+    
+    category_id = Column(Integer, primary_key=True, autoincrement=False)
+    facet = Column(String(20), primary_key=True)
+    value = Column(String(50), primary_key=True)
+    product_count = Column(Integer, default=0, nullable=False)
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Numeric, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.mysql import CHAR
+from app.database import Base
+
+class ProductListing(Base):
+    """Flattened listing tile, one row per product.
+    
+    Maintained in the same transaction as product, variant and stock writes so a
+    listing page is a single indexed scan with no joins or JSON parsing.
+    """
+    __tablename__ = "product_listing"
+    
+    product_id = Column(CHAR(36), ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    category_id = Column(Integer)
+    name = Column(String(255), nullable=False)
+    slug = Column(String(300), nullable=False)
+    min_price = Column(Numeric(10, 2), nullable=False)  # Cheapest variant, before discount
+    discount_percentage = Column(Numeric(5, 2), default=0)
+    total_stock = Column(Integer, default=0, nullable=False)
+    image_url = Column(String(500))
+    category_path = Column(String(500))  # e.g. "Women / Kurtas"
+    color_swatches = Column(String(500))  # Comma separated, in variant order
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index("ix_product_listing_browse", "is_active", "category_id", "created_at"),
+        Index("ix_product_listing_price", "is_active", "min_price"),
+    )
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy.dialects.mysql import CHAR
+from datetime import datetime
+from app.database import Base
+
+class MediaAsset(Base):
+    """An uploaded image, keyed by the sha256 of its bytes so identical uploads are stored once"""
+    __tablename__ = "media_assets"
+    
+    sha256 = Column(CHAR(64), primary_key=True)
+    content_type = Column(String(50), nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    original_url = Column(String(500), nullable=False)
+    primary_url = Column(String(500), nullable=False)  # The derivative written into variant images
+    derivatives = Column(JSON, nullable=False)  # [{"width", "format", "url"}]
+    created_at = Column(DateTime, default=datetime.utcnow)
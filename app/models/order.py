@@ -4,6 +4,8 @@ from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
 import enum
+import random
+import string
 from app.database import Base
 
 class OrderStatus(str, enum.Enum):
@@ -21,6 +23,12 @@ class PaymentStatus(str, enum.Enum):
     FAILED = "failed"
     REFUNDED = "refunded"
 
+def generate_order_number() -> str:
+    """Generate unique order number"""
+    timestamp = datetime.now().strftime("%Y%m%d")
+    random_str = ''.join(random.choices(string.digits, k=6))
+    return f"JORA{timestamp}{random_str}"
+
 class Order(Base):
     __tablename__ = "orders"
     
@@ -64,6 +72,7 @@ class OrderItem(Base):
     quantity = Column(Integer, nullable=False)
     unit_price = Column(Numeric(10, 2), nullable=False)
     total_price = Column(Numeric(10, 2), nullable=False)
+    category_id = Column(Integer)  # Product category at order time; rollups add and subtract under it
     
     # Relationships
     order = relationship("Order", back_populates="items")
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, JSON, DateTime, Index, Enum as SQLEnum
+from datetime import datetime
+import enum
+from app.database import Base
+
+class OutboxStatus(str, enum.Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    SENT = "sent"
+    DEAD = "dead"
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox_messages"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    integration = Column(String(30), nullable=False)  # email, shiprocket, whatsapp
+    kind = Column(String(50), nullable=False)  # e.g. order_confirmation
+    payload = Column(JSON, nullable=False)
+    status = Column(SQLEnum(OutboxStatus), default=OutboxStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    available_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    locked_until = Column(DateTime)  # Lease held by the worker that claimed it
+    last_error = Column(String(1000))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index("ix_outbox_messages_due", "status", "available_at"),
+    )
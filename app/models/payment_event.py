@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, JSON, DateTime, Index, UniqueConstraint, Enum as SQLEnum
+from datetime import datetime
+import enum
+from app.database import Base
+
+class PaymentEventStatus(str, enum.Enum):
+    PENDING = "pending"
+    PROCESSED = "processed"
+    IGNORED = "ignored"  # Not a payment transition we act on, or no matching order
+    FAILED = "failed"
+
+class PaymentEvent(Base):
+    __tablename__ = "payment_events"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    provider = Column(String(20), nullable=False)  # razorpay, stripe
+    event_id = Column(String(255), nullable=False)  # Gateway event id, used for deduplication
+    event_type = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(SQLEnum(PaymentEventStatus), default=PaymentEventStatus.PENDING, nullable=False)
+    order_id = Column(String(36))
+    error = Column(String(500))
+    received_at = Column(DateTime, default=datetime.utcnow)
+    processed_at = Column(DateTime)
+    
+    __table_args__ = (
+        UniqueConstraint("provider", "event_id", name="uq_payment_events_provider_event"),
+        Index("ix_payment_events_status", "status", "id"),
+    )
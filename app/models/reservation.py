@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.mysql import CHAR
+from datetime import datetime
+from app.database import Base
+
+class StockReservation(Base):
+    """Units a shopper holds from checkout start until they order, release or `expires_at` passes"""
+    __tablename__ = "stock_reservations"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(CHAR(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    product_variant_id = Column(Integer, ForeignKey("product_variants.id", ondelete="CASCADE"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # Live holds per variant (availability) and the sweeper's expiry scan
+        Index("ix_stock_reservations_variant_expires", "product_variant_id", "expires_at"),
+        Index("ix_stock_reservations_expires_at", "expires_at"),
+    )
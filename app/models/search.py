@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String, Date
+from app.database import Base
+
+class SearchQuery(Base):
+    """Daily count of a normalized storefront search that returned products; feeds suggestions"""
+    __tablename__ = "search_queries"
+    
+    day = Column(Date, primary_key=True)
+    query = Column(String(100), primary_key=True)
+    searches = Column(Integer, default=0, nullable=False)
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, Numeric, Boolean, DateTime, JSON, ForeignKey
+from datetime import datetime
+from app.database import Base
+
+class ShippingZone(Base):
+    """Shipping rate and serviceability for every pincode starting with one of `pincode_prefixes`"""
+    __tablename__ = "shipping_zones"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), nullable=False)
+    pincode_prefixes = Column(JSON, nullable=False)  # ["110", "1220"]; the longest matching prefix wins
+    rate = Column(Numeric(10, 2), nullable=False, default=0)
+    free_above = Column(Numeric(10, 2))  # Subtotal above which shipping is free
+    delivery_days = Column(Integer)
+    cod_available = Column(Boolean, default=True)
+    is_serviceable = Column(Boolean, default=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ShippingZonePrefix(Base):
+    """The zone that owns a pincode prefix; the primary key keeps each prefix to one zone"""
+    __tablename__ = "shipping_zone_prefixes"
+    
+    prefix = Column(String(6), primary_key=True)
+    zone_id = Column(Integer, ForeignKey("shipping_zones.id", ondelete="CASCADE"), nullable=False, index=True)
+
+class TaxRule(Base):
+    """GST rate for lines shipped to `state` (any state when null) at or above a unit price"""
+    __tablename__ = "tax_rules"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), nullable=False)
+    state = Column(String(100))
+    min_unit_price = Column(Numeric(10, 2), nullable=False, default=0)
+    rate = Column(Numeric(5, 4), nullable=False)  # 0.0500 = 5%
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.mysql import CHAR
+from datetime import datetime
+from app.database import Base
+
+class RevokedToken(Base):
+    """Exchanged refresh tokens by `jti`, kept until the token would have expired anyway"""
+    __tablename__ = "revoked_tokens"
+    
+    jti = Column(CHAR(36), primary_key=True)
+    user_id = Column(CHAR(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_revoked_tokens_expires_at", "expires_at"),
+    )
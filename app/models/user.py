@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum as SQLEnum
 from sqlalchemy.dialects.mysql import CHAR
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -22,6 +22,7 @@ class User(Base):
     phone = Column(String(20))
     role = Column(SQLEnum(UserRole), default=UserRole.CUSTOMER, nullable=False)
     is_verified = Column(Boolean, default=False)
+    token_version = Column(Integer, default=0, nullable=False)  # Bumped to revoke every issued token
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
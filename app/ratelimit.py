@@ -0,0 +1,209 @@
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from app.auth import decode_token
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+KEY_TYPES = ("ip", "user", "route")
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """Token bucket: `capacity` requests in a burst, refilled at `capacity / period` per second"""
+    route: str
+    capacity: int
+    period: int
+    key_type: str = "ip"
+
+    @property
+    def refill_rate(self) -> float:
+        return self.capacity / self.period
+
+def parse_rule(route: str, spec: str) -> RateLimitRule:
+    """Parse "10/minute" or "10/minute:user" into a rule"""
+    limit, _, key_type = spec.partition(":")
+    count, _, period = limit.partition("/")
+    key_type = key_type or "ip"
+    if period not in PERIODS or key_type not in KEY_TYPES:
+        raise ValueError(f"Invalid rate limit for {route}: {spec!r}")
+    return RateLimitRule(route=route, capacity=int(count), period=PERIODS[period], key_type=key_type)
+
+class InMemoryBackend:
+    """Per-process token buckets spread over independently locked shards.
+
+    Sharding keeps lock contention low when many threads check limits at once.
+    It is also the local fake for the shared backend in development and tests.
+
+    Each shard keeps one LRU per rule period, so the oldest bucket in it is
+    also the first to refill. Every call drops fully refilled buckets from the
+    front (lossless, amortized O(1)). Past `max_keys_per_shard` the least
+    recently used bucket of the checked period is dropped as well.
+    """
+
+    def __init__(self, shards: int = 16, max_keys_per_shard: int = 50000):
+        self._shards = [(defaultdict(OrderedDict), threading.Lock()) for _ in range(shards)]
+        self._max_keys = max_keys_per_shard
+
+    async def take(self, key: str, rule: RateLimitRule) -> Tuple[bool, float]:
+        lrus, lock = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+        with lock:
+            buckets = lrus[rule.period]
+            # Re-inserting moves the key to the most recently used end
+            tokens, updated = buckets.pop(key, (rule.capacity, now))
+            tokens = min(rule.capacity, tokens + (now - updated) * rule.refill_rate)
+            if tokens >= 1:
+                buckets[key] = (tokens - 1, now)
+                allowed, retry_after = True, 0.0
+            else:
+                buckets[key] = (tokens, now)
+                allowed, retry_after = False, (1 - tokens) / rule.refill_rate
+            self._evict(lrus, now, rule)
+        return allowed, retry_after
+
+    def _evict(self, lrus: dict, now: float, rule: RateLimitRule) -> None:
+        for period, buckets in lrus.items():
+            # A bucket idle for its own full period has refilled completely
+            while buckets and now - next(iter(buckets.values()))[1] > period:
+                buckets.popitem(last=False)
+        if sum(len(buckets) for buckets in lrus.values()) > self._max_keys:
+            lrus[rule.period].popitem(last=False)
+
+class RedisBackend:
+    """Token buckets shared by every worker and host, evaluated atomically in Redis.
+
+    Requires the optional `redis` package.
+    """
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + (now - updated) * rate)
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package") from exc
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    async def take(self, key: str, rule: RateLimitRule) -> Tuple[bool, float]:
+        allowed, tokens = await self._script(
+            keys=[f"ratelimit:{key}"], args=[rule.capacity, rule.refill_rate, time.time()]
+        )
+        if allowed:
+            return True, 0.0
+        return False, (1 - float(tokens)) / rule.refill_rate
+
+def build_backend():
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisBackend(settings.RATE_LIMIT_REDIS_URL)
+    return InMemoryBackend(shards=settings.RATE_LIMIT_SHARDS)
+
+class RateLimitMiddleware:
+    """ASGI middleware applying RATE_LIMITS before routing.
+
+    Rejected requests never reach a route, so no database session is opened
+    for them. Rules are keyed by "METHOD /path"; a trailing "*" matches a prefix.
+    """
+
+    def __init__(self, app, rules: Optional[Dict[str, str]] = None, backend=None):
+        self.app = app
+        self.exact: Dict[str, RateLimitRule] = {}
+        self.prefixes: List[Tuple[str, RateLimitRule]] = []
+        for route, spec in (rules if rules is not None else settings.RATE_LIMITS).items():
+            rule = parse_rule(route, spec)
+            if route.endswith("*"):
+                self.prefixes.append((route[:-1], rule))
+            else:
+                self.exact[route] = rule
+        self.backend = backend or build_backend()
+
+    def _match(self, method: str, path: str) -> Optional[RateLimitRule]:
+        route = f"{method} {path.rstrip('/') or '/'}"
+        rule = self.exact.get(route)
+        if rule is None:
+            for prefix, candidate in self.prefixes:
+                if route.startswith(prefix):
+                    return candidate
+        return rule
+
+    @staticmethod
+    def _client_ip(scope) -> str:
+        proxies = settings.RATE_LIMIT_TRUSTED_PROXIES
+        if proxies > 0:
+            hops = [
+                hop.strip()
+                for name, value in scope.get("headers", ())
+                if name == b"x-forwarded-for"
+                for hop in value.decode("latin-1").split(",")
+            ]
+            # Entries left of the ones our proxies appended are client-controlled
+            if len(hops) >= proxies and hops[-proxies]:
+                return hops[-proxies]
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def _key(self, scope, rule: RateLimitRule) -> str:
+        if rule.key_type == "route":
+            return rule.route
+        if rule.key_type == "user":
+            for name, value in scope.get("headers", ()):
+                if name == b"authorization" and value[:7].lower() == b"bearer ":
+                    # Signature check only; no database lookup
+                    payload = decode_token(value[7:].decode("latin-1"))
+                    if payload and payload.get("sub"):
+                        return f"{rule.route}|user:{payload['sub']}"
+                    break
+        return f"{rule.route}|ip:{self._client_ip(scope)}"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        rule = self._match(scope["method"], scope["path"])
+        if rule is None:
+            return await self.app(scope, receive, send)
+
+        try:
+            allowed, retry_after = await self.backend.take(self._key(scope, rule), rule)
+        except Exception:
+            # A broken shared backend must not take the API down with it
+            logger.exception("Rate limit backend failed; allowing request")
+            return await self.app(scope, receive, send)
+
+        if allowed:
+            return await self.app(scope, receive, send)
+
+        body = json.dumps({"detail": "Too many requests"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
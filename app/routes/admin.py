@@ -0,0 +1,274 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import get_db
+from app.schemas import (
+    StockSyncRequest, StockSyncReport, SalesPoint, RankedSales,
+    BulkOrderStatusRequest, BulkOrderStatusReport, MediaAssetResponse,
+    ShippingZoneCreate, ShippingZoneResponse, TaxRuleCreate, TaxRuleResponse
+)
+from app.services.inventory import sync_stock
+from app.services.order_export import export_csv, export_ndjson
+from app.services.order_status import bulk_transition
+from app.services import media, rollups, shipping_rules
+from app.models.analytics import DailyVariantSales, DailyCategorySales
+from app.models.order import OrderStatus, PaymentStatus
+from app.models.shipping import ShippingZone, TaxRule
+from app.dependencies import get_admin_user
+from app.models.user import User
+
+router = APIRouter(prefix="/api/admin", tags=["Admin"])
+
+@router.post("/inventory/sync", response_model=StockSyncReport)
+async def sync_inventory(
+    feed: StockSyncRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Apply a warehouse stock snapshot or delta feed keyed by SKU (Admin only)"""
+    items = [(item.sku, item.quantity) for item in feed.items]
+    return await run_in_threadpool(
+        sync_stock, db, items, feed.mode, settings.STOCK_SYNC_CHUNK_SIZE
+    )
+
+@router.post("/orders/bulk-status", response_model=BulkOrderStatusReport)
+async def bulk_update_order_status(
+    request: BulkOrderStatusRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Move many orders to one status, with optional tracking numbers (Admin only)
+    
+    Cancelling restores stock for all cancelled orders with one aggregated update per batch.
+    """
+    pairs = [(item.order_id, item.tracking_number) for item in request.orders]
+    return await run_in_threadpool(
+        bulk_transition, db, pairs, request.status, settings.BULK_ORDER_CHUNK_SIZE
+    )
+
+@router.get("/orders/export")
+async def export_orders(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    status: Optional[List[OrderStatus]] = Query(None),
+    current_user: User = Depends(get_admin_user)
+):
+    """Stream orders with their items as CSV or NDJSON (Admin only)
+    
+    `start` is inclusive and `end` exclusive, both on `created_at`.
+    """
+    if format == "csv":
+        body = export_csv(start, end, status, settings.EXPORT_BATCH_SIZE)
+        media_type = "text/csv"
+    else:
+        body = export_ndjson(start, end, status, settings.EXPORT_BATCH_SIZE)
+        media_type = "application/x-ndjson"
+    
+    filename = f"orders-{datetime.utcnow():%Y%m%d%H%M%S}.{format}"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/media", response_model=MediaAssetResponse, status_code=201)
+async def upload_media(
+    file: UploadFile = File(...),
+    variant_id: Optional[int] = Form(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Upload a JPEG/PNG/WebP image and generate its WebP/AVIF derivatives (Admin only)
+    
+    Identical bytes are stored once. With `variant_id`, the primary derivative is
+    appended to that variant's images.
+    """
+    try:
+        asset, deduplicated = await media.ingest(db, file.file)
+        variant_images = None
+        if variant_id is not None:
+            variant_images = await run_in_threadpool(media.attach, db, asset, variant_id)
+    except media.MediaError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+    
+    response = MediaAssetResponse.model_validate(asset)
+    response.deduplicated = deduplicated
+    response.variant_images = variant_images
+    return response
+
+def _commit_rules(db: Session) -> None:
+    """Commit a zone or tax rule change and have every worker recompile its index"""
+    db.commit()
+    shipping_rules.announce()
+
+def _commit_zone(db: Session, zone: ShippingZone) -> None:
+    """Claim the zone's prefixes and commit; a prefix owned by another zone is a 409"""
+    db.flush()
+    try:
+        shipping_rules.set_zone_prefixes(db, zone.id, zone.pincode_prefixes)
+    except shipping_rules.PrefixConflict as exc:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(exc))
+    _commit_rules(db)
+
+@router.get("/shipping-zones", response_model=List[ShippingZoneResponse])
+async def list_shipping_zones(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """All shipping zones (Admin only)"""
+    return db.query(ShippingZone).order_by(ShippingZone.name).all()
+
+@router.post("/shipping-zones", response_model=ShippingZoneResponse, status_code=201)
+async def create_shipping_zone(
+    zone_data: ShippingZoneCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Create a shipping zone for a set of pincode prefixes (Admin only)"""
+    zone = ShippingZone(**zone_data.model_dump())
+    db.add(zone)
+    _commit_zone(db, zone)
+    db.refresh(zone)
+    return zone
+
+@router.put("/shipping-zones/{zone_id}", response_model=ShippingZoneResponse)
+async def update_shipping_zone(
+    zone_id: int,
+    zone_data: ShippingZoneCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Replace a shipping zone (Admin only)"""
+    zone = db.query(ShippingZone).filter(ShippingZone.id == zone_id).first()
+    if not zone:
+        raise HTTPException(status_code=404, detail="Shipping zone not found")
+    for field, value in zone_data.model_dump().items():
+        setattr(zone, field, value)
+    _commit_zone(db, zone)
+    db.refresh(zone)
+    return zone
+
+@router.delete("/shipping-zones/{zone_id}", status_code=204)
+async def delete_shipping_zone(
+    zone_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Delete a shipping zone; its pincodes fall back to shorter prefixes or the flat rate (Admin only)"""
+    zone = db.query(ShippingZone).filter(ShippingZone.id == zone_id).first()
+    if not zone:
+        raise HTTPException(status_code=404, detail="Shipping zone not found")
+    shipping_rules.set_zone_prefixes(db, zone.id, [])
+    db.delete(zone)
+    _commit_rules(db)
+    return None
+
+@router.get("/tax-rules", response_model=List[TaxRuleResponse])
+async def list_tax_rules(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """All tax rules (Admin only)"""
+    return db.query(TaxRule).order_by(TaxRule.state, TaxRule.min_unit_price).all()
+
+@router.post("/tax-rules", response_model=TaxRuleResponse, status_code=201)
+async def create_tax_rule(
+    rule_data: TaxRuleCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Create a GST rate for a state and unit price band (Admin only)"""
+    rule = TaxRule(**rule_data.model_dump())
+    db.add(rule)
+    _commit_rules(db)
+    db.refresh(rule)
+    return rule
+
+@router.put("/tax-rules/{rule_id}", response_model=TaxRuleResponse)
+async def update_tax_rule(
+    rule_id: int,
+    rule_data: TaxRuleCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Replace a tax rule (Admin only)"""
+    rule = db.query(TaxRule).filter(TaxRule.id == rule_id).first()
+    if not rule:
+        raise HTTPException(status_code=404, detail="Tax rule not found")
+    for field, value in rule_data.model_dump().items():
+        setattr(rule, field, value)
+    _commit_rules(db)
+    db.refresh(rule)
+    return rule
+
+@router.delete("/tax-rules/{rule_id}", status_code=204)
+async def delete_tax_rule(
+    rule_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Delete a tax rule (Admin only)"""
+    rule = db.query(TaxRule).filter(TaxRule.id == rule_id).first()
+    if not rule:
+        raise HTTPException(status_code=404, detail="Tax rule not found")
+    db.delete(rule)
+    _commit_rules(db)
+    return None
+
+def _date_range(start: Optional[date], end: Optional[date]) -> tuple:
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be on or before end")
+    return start, end
+
+@router.get("/analytics/sales", response_model=List[SalesPoint])
+async def sales_by_day(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    status: Optional[List[OrderStatus]] = Query(None),
+    payment_status: Optional[List[PaymentStatus]] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Daily orders, units and revenue from the sales rollups (Admin only)"""
+    start, end = _date_range(start, end)
+    return rollups.sales_by_day(db, start, end, status, payment_status)
+
+@router.get("/analytics/top-variants", response_model=List[RankedSales])
+async def top_variants(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=200),
+    status: Optional[List[OrderStatus]] = Query(None),
+    payment_status: Optional[List[PaymentStatus]] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Best-selling variants by units (Admin only)"""
+    start, end = _date_range(start, end)
+    return rollups.top_items(
+        db, DailyVariantSales, "product_variant_id", start, end, limit, status, payment_status
+    )
+
+@router.get("/analytics/categories", response_model=List[RankedSales])
+async def sales_by_category(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = Query(50, ge=1, le=500),
+    status: Optional[List[OrderStatus]] = Query(None),
+    payment_status: Optional[List[PaymentStatus]] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Units and revenue per category (Admin only)"""
+    start, end = _date_range(start, end)
+    return rollups.top_items(
+        db, DailyCategorySales, "category_id", start, end, limit, status, payment_status
+    )
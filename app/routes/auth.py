@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.schemas import UserCreate, UserLogin, UserResponse, Token
+from app.schemas import UserCreate, UserLogin, UserResponse, Token, RefreshRequest, PasswordChange
 from app.models.user import User
-from app.auth import verify_password, get_password_hash, create_access_token, create_refresh_token
+from app.auth import verify_password, get_password_hash, create_token_pair, decode_token
+from app.dependencies import get_current_user
+from app.services import revocation
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
@@ -47,12 +49,62 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Create tokens
-    access_token = create_access_token(data={"sub": user.id})
-    refresh_token = create_refresh_token(data={"sub": user.id})
+    return create_token_pair(user)
+
+@router.post("/refresh", response_model=Token)
+async def refresh_tokens(request: RefreshRequest, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new access/refresh pair (no password check)
+    
+    Refresh tokens are single use. Presenting one that was already exchanged
+    is treated as theft and revokes every token of that user.
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    payload = decode_token(request.refresh_token)
+    if payload is None or payload.get("type") != "refresh" or not payload.get("jti"):
+        raise invalid
+    
+    user = db.query(User).filter(User.id == payload.get("sub")).first()
+    if user is None or payload.get("ver", 0) != user.token_version:
+        raise invalid
     
-    return {
-        "access_token": access_token,
-        "refresh_token": refresh_token,
-        "token_type": "bearer"
-    }
+    if not revocation.claim(db, payload):
+        revocation.revoke_all(db, user)
+        db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token reuse detected; please log in again",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    tokens = create_token_pair(user)
+    db.commit()
+    return tokens
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Revoke every access and refresh token issued to the user"""
+    revocation.revoke_all(db, current_user)
+    db.commit()
+    return None
+
+@router.post("/change-password", response_model=Token)
+async def change_password(
+    password_data: PasswordChange,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Change password, revoke all existing tokens and return a fresh pair for this session"""
+    if not verify_password(password_data.current_password, current_user.password_hash):
+        raise HTTPException(status_code=400, detail="Current password is incorrect")
+    
+    current_user.password_hash = get_password_hash(password_data.new_password)
+    revocation.revoke_all(db, current_user)
+    db.commit()
+    return create_token_pair(current_user)
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
 from sqlalchemy.orm import Session
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
 from app.database import get_db
-from app.schemas import B2BRegistration, B2BResponse
+from app.schemas import B2BRegistration, B2BResponse, B2BBulkOrderReport
 from app.models.b2b import B2BCustomer
 from app.models.user import User, UserRole
-from app.dependencies import get_current_active_user, get_admin_user
+from app.dependencies import get_current_active_user, get_admin_user, get_b2b_user
+from app.services.b2b_orders import BulkOrderError, detect_format, place_bulk_order
 
 router = APIRouter(prefix="/api/b2b", tags=["B2B"])
 
@@ -44,6 +48,30 @@ async def get_b2b_profile(
     
     return b2b_profile
 
+@router.post("/orders/bulk", response_model=B2BBulkOrderReport, status_code=201)
+async def create_bulk_order(
+    file: UploadFile = File(...),
+    shipping_address_id: int = Form(...),
+    billing_address_id: int = Form(...),
+    format: Optional[str] = Query(None, pattern="^(csv|json)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_b2b_user)
+):
+    """Place one order from a CSV or JSON list of SKU/quantity lines (B2B only)
+    
+    Nothing is ordered unless every line passes; otherwise the response lists
+    each failing line. Prices carry the buyer's discount tier.
+    """
+    try:
+        fmt = detect_format(file.filename, format)
+        return await run_in_threadpool(
+            place_bulk_order, db, current_user, file.file, fmt, shipping_address_id, billing_address_id,
+            settings.BULK_ORDER_CHUNK_SIZE, settings.B2B_BULK_ORDER_MAX_LINES
+        )
+    except BulkOrderError as exc:
+        detail = {"message": exc.detail, "errors": exc.errors} if exc.errors else exc.detail
+        raise HTTPException(status_code=exc.status_code, detail=detail)
+
 @router.put("/{b2b_id}/approve")
 async def approve_b2b(
     b2b_id: int,
@@ -1,22 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.database import get_db
 from app.schemas import CartItemAdd, CartItemUpdate, CartItemResponse
 from app.models.cart import Cart
 from app.models.product_variant import ProductVariant
 from app.dependencies import get_current_active_user
+from app.fieldsets import FieldSet, sparse_fields
 from app.models.user import User
+from app.services import reservations
 
 router = APIRouter(prefix="/api/cart", tags=["Cart"])
 
 @router.get("", response_model=List[CartItemResponse])
 async def get_cart(
+    fieldset: Optional[FieldSet] = Depends(sparse_fields(CartItemResponse)),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get user's cart items"""
-    cart_items = db.query(Cart).filter(Cart.user_id == current_user.id).all()
+    """Get user's cart items (`fields`/`include` for a sparse response, e.g. include=variant.sku)"""
+    query = db.query(Cart).filter(Cart.user_id == current_user.id)
+    if fieldset:
+        cart_items = query.options(*fieldset.options(Cart)).all()
+        return JSONResponse([fieldset.dump(item) for item in cart_items])
+    cart_items = query.all()
     return cart_items
 
 @router.post("/add", response_model=CartItemResponse, status_code=201)
@@ -31,8 +39,9 @@ async def add_to_cart(
     if not variant:
         raise HTTPException(status_code=404, detail="Product variant not found")
     
-    # Check stock
-    if variant.stock_quantity < item.quantity:
+    # Check stock, less what other checkouts are holding
+    held = reservations.held(db, [variant.id], exclude_user_id=current_user.id).get(variant.id, 0)
+    if variant.stock_quantity - held < item.quantity:
         raise HTTPException(status_code=400, detail="Insufficient stock")
     
     # Check if item already in cart
@@ -75,8 +84,9 @@ async def update_cart_item(
     if not cart_item:
         raise HTTPException(status_code=404, detail="Cart item not found")
     
-    # Check stock
-    if cart_item.variant.stock_quantity < item_update.quantity:
+    # Check stock, less what other checkouts are holding
+    held = reservations.held(db, [cart_item.product_variant_id], exclude_user_id=current_user.id)
+    if cart_item.variant.stock_quantity - held.get(cart_item.product_variant_id, 0) < item_update.quantity:
         raise HTTPException(status_code=400, detail="Insufficient stock")
     
     cart_item.quantity = item_update.quantity
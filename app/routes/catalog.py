@@ -0,0 +1,38 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.schemas import CatalogChangesPage
+from app.config import settings
+from app.services import changelog, feeds
+
+router = APIRouter(prefix="/api/catalog", tags=["Catalog"])
+
+@router.get("/changes", response_model=CatalogChangesPage)
+async def get_catalog_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """Product and category changes after version `since`, oldest first
+    
+    Start from 0 and keep calling with `next_since` while `has_more` is true.
+    Each entity appears at most once per page: an upsert with its current data or
+    a delete tombstone. 410 means `since` fell out of the retained log and the
+    consumer has to resync from `GET /api/products` and start again from the
+    `next_since` of a fresh call.
+    """
+    try:
+        return changelog.changes_since(db, since, limit)
+    except changelog.ChangesExpired:
+        raise HTTPException(status_code=410, detail="Change log no longer covers this version; resync required")
+
+@router.get("/feeds/{name}")
+async def get_feed_file(name: str):
+    """Generated sitemap index, sitemap chunks and product feeds (see `manage.py generate-feeds`)"""
+    path = os.path.join(settings.FEED_OUTPUT_DIR, name)
+    if not feeds.is_feed_file(name) or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Feed file not found")
+    media_type = "application/xml" if name == feeds.SITEMAP_INDEX else "application/gzip"
+    return FileResponse(path, media_type=media_type)
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List
 from app.database import get_db
+from app.services import changelog
+from app import events, snapshot
 from app.schemas import CategoryCreate, CategoryResponse
 from app.models.category import Category
 from app.dependencies import get_admin_user
@@ -12,6 +14,9 @@ router = APIRouter(prefix="/api/categories", tags=["Categories"])
 @router.get("", response_model=List[CategoryResponse])
 async def get_categories(db: Session = Depends(get_db)):
     """Get all categories"""
+    snap = snapshot.current()
+    if snap is not None:
+        return Response(bytes(snap.categories()), media_type="application/json")
     categories = db.query(Category).order_by(Category.display_order).all()
     return categories
 
@@ -24,6 +29,10 @@ async def create_category(
     """Create a new category (Admin only)"""
     category = Category(**category_data.model_dump())
     db.add(category)
+    db.flush()
+    changelog.record(db, changelog.CATEGORY, upserts=[category.id])
     db.commit()
     db.refresh(category)
+    
+    events.publish(events.CATEGORY_CHANGED, {"category_ids": [category.id]})
     return category
@@ -0,0 +1,68 @@
+from decimal import Decimal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.schemas import CheckoutQuoteRequest, CheckoutQuote, Serviceability
+from app.dependencies import get_current_active_user
+from app.models.user import User
+from app.services import pricing, reservations, shipping_rules
+
+router = APIRouter(prefix="/api/checkout", tags=["Checkout"])
+
+@router.post("/quote", response_model=CheckoutQuote)
+async def get_quote(
+    quote_request: CheckoutQuoteRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Price the cart (or an item list) with coupon, shipping and tax
+    
+    Returns a signed `quote_token`; pass it to `POST /api/orders` to place the
+    order at these totals while the items, coupon and prices are unchanged.
+    The items' stock is held for this shopper until `reserved_until`; quoting
+    again renews the hold, and placing the order or
+    `DELETE /api/checkout/reservation` releases it.
+    """
+    if quote_request.items is None:
+        items = pricing.cart_items(db, current_user.id)
+    else:
+        items = [(item.product_variant_id, item.quantity) for item in quote_request.items]
+    
+    try:
+        address = pricing.destination(db, current_user.id, quote_request.shipping_address_id)
+        return pricing.quote(db, current_user.id, items, quote_request.coupon_code, address)
+    except pricing.PricingError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+
+@router.delete("/reservation", status_code=204)
+async def release_reservation(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Give back the stock held by this shopper's checkout (e.g. on leaving checkout)"""
+    reservations.release(db, current_user.id)
+    db.commit()
+    return None
+
+@router.get("/serviceability", response_model=Serviceability)
+async def check_serviceability(
+    pincode: str = Query(..., min_length=6, max_length=10),
+    subtotal: float = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Whether we deliver to a pincode, and at what shipping cost for `subtotal`"""
+    normalized = shipping_rules.normalize_pincode(pincode)
+    if len(normalized) != shipping_rules.PINCODE_LENGTH:
+        raise HTTPException(status_code=400, detail="Pincode must have 6 digits")
+    
+    zone = shipping_rules.current(db).zone(normalized)
+    if zone is not None and not zone.is_serviceable:
+        return Serviceability(pincode=normalized, serviceable=False, zone=zone.name, cod_available=False)
+    return Serviceability(
+        pincode=normalized,
+        serviceable=True,
+        zone=zone.name if zone else None,
+        delivery_days=zone.delivery_days if zone else None,
+        cod_available=zone.cod_available if zone else True,
+        shipping_cost=pricing.zone_shipping_cost(zone, Decimal(str(subtotal))),
+    )
@@ -1,89 +1,65 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
+from typing import List, Optional
 from app.database import get_db
 from app.schemas import OrderCreate, OrderResponse
-from app.models.order import Order, OrderItem, OrderStatus, PaymentStatus
-from app.models.product_variant import ProductVariant
-from app.models.coupon import Coupon
+from app.models.order import Order, OrderItem, OrderStatus, PaymentStatus, generate_order_number
 from app.dependencies import get_current_active_user, get_admin_user
+from app.fieldsets import FieldSet, sparse_fields
 from app.models.user import User
-import random
-import string
+from app import events
+from app.services import catalog, outbox, pricing, reservations, rollups
+from app.services.order_status import can_transition, restore_stock
 
 router = APIRouter(prefix="/api/orders", tags=["Orders"])
 
-def generate_order_number() -> str:
-    """Generate unique order number"""
-    timestamp = datetime.now().strftime("%Y%m%d")
-    random_str = ''.join(random.choices(string.digits, k=6))
-    return f"JORA{timestamp}{random_str}"
-
 @router.post("", response_model=OrderResponse, status_code=201)
 async def create_order(
     order_data: OrderCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Create a new order"""
-    # Calculate totals
-    subtotal = 0
-    order_items_data = []
-    
-    for item in order_data.items:
-        variant = db.query(ProductVariant).filter(ProductVariant.id == item.product_variant_id).first()
-        if not variant:
-            raise HTTPException(status_code=404, detail=f"Variant {item.product_variant_id} not found")
-        
-        if variant.stock_quantity < item.quantity:
-            raise HTTPException(status_code=400, detail=f"Insufficient stock for {variant.sku}")
-        
-        price = variant.price_override or variant.product.base_price
-        total_price = price * item.quantity
-        subtotal += total_price
-        
-        order_items_data.append({
-            "variant": variant,
-            "quantity": item.quantity,
-            "unit_price": price,
-            "total_price": total_price
-        })
-    
-    # Apply coupon if provided
-    discount_amount = 0
-    if order_data.coupon_code:
-        coupon = db.query(Coupon).filter(Coupon.code == order_data.coupon_code).first()
-        if coupon and coupon.is_active and coupon.valid_from <= datetime.utcnow() <= coupon.valid_until:
-            if subtotal >= coupon.min_order_value:
-                if coupon.discount_type == "percentage":
-                    discount_amount = subtotal * (coupon.discount_value / 100)
-                    if coupon.max_discount:
-                        discount_amount = min(discount_amount, coupon.max_discount)
-                else:
-                    discount_amount = coupon.discount_value
-    
-    # Calculate tax and shipping
-    tax_amount = (subtotal - discount_amount) * 0.18  # 18% GST
-    shipping_cost = 0 if subtotal > 1000 else 100  # Free shipping above 1000
-    total_amount = subtotal + tax_amount + shipping_cost - discount_amount
+    """Create a new order
+    
+    Pass the `quote_token` from `POST /api/checkout/quote` to reuse its totals;
+    it is rejected with 409 if the items, coupon or prices changed since.
+    """
+    try:
+        address = pricing.destination(db, current_user.id, order_data.shipping_address_id)
+        order_items_data = pricing.load_lines(
+            db, [(item.product_variant_id, item.quantity) for item in order_data.items],
+            lock=True, user_id=current_user.id
+        )
+        if order_data.quote_token:
+            amounts = pricing.redeem(
+                db, order_data.quote_token, current_user.id, order_items_data, order_data.coupon_code, address
+            )
+            if amounts is None:
+                raise HTTPException(status_code=409, detail="Quote is no longer valid; request a new quote")
+        else:
+            amounts = pricing.totals(db, order_items_data, order_data.coupon_code, address)
+        if amounts["discount_amount"] > 0:
+            pricing.use_coupon(db, order_data.coupon_code)
+    except pricing.PricingError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
     
     # Create order
     order = Order(
         order_number=generate_order_number(),
         user_id=current_user.id,
-        subtotal=subtotal,
-        shipping_cost=shipping_cost,
-        tax_amount=tax_amount,
-        discount_amount=discount_amount,
-        total_amount=total_amount,
+        subtotal=amounts["subtotal"],
+        shipping_cost=amounts["shipping_cost"],
+        tax_amount=amounts["tax_amount"],
+        discount_amount=amounts["discount_amount"],
+        total_amount=amounts["total_amount"],
         shipping_address_id=order_data.shipping_address_id,
         billing_address_id=order_data.billing_address_id
     )
     
     db.add(order)
-    db.commit()
-    db.refresh(order)
+    # Flush, not commit: the variant row locks must hold until stock is decremented
+    db.flush()
     
     # Create order items and update stock
     for item_data in order_items_data:
@@ -94,42 +70,65 @@ async def create_order(
             variant_details=f"{item_data['variant'].size} / {item_data['variant'].color}",
             quantity=item_data["quantity"],
             unit_price=item_data["unit_price"],
-            total_price=item_data["total_price"]
+            total_price=item_data["total_price"],
+            category_id=item_data["variant"].product.category_id
         )
         db.add(order_item)
         
         # Update stock
         item_data["variant"].stock_quantity -= item_data["quantity"]
     
+    # The order now owns the stock, so the checkout's holds go with the same commit
+    reservations.release(db, current_user.id)
+    db.flush()
+    product_ids = list({item_data["variant"].product_id for item_data in order_items_data})
+    catalog.stock_changed(db, product_ids)
+    rollups.add_orders(db, [order.id])
+    outbox.enqueue_order_placed(db, order)
     db.commit()
     db.refresh(order)
     
+    events.publish(events.STOCK_CHANGED, {
+        "product_ids": product_ids,
+        "variant_ids": [item_data["variant"].id for item_data in order_items_data],
+    })
     return order
 
 @router.get("", response_model=List[OrderResponse])
 async def get_user_orders(
+    fieldset: Optional[FieldSet] = Depends(sparse_fields(OrderResponse)),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get all orders for current user"""
-    orders = db.query(Order).filter(Order.user_id == current_user.id).order_by(Order.created_at.desc()).all()
+    """Get all orders for current user (`fields`/`include` for a sparse response)"""
+    query = db.query(Order).filter(Order.user_id == current_user.id).order_by(Order.created_at.desc())
+    if fieldset:
+        orders = query.options(*fieldset.options(Order)).all()
+        return JSONResponse([fieldset.dump(order) for order in orders])
+    orders = query.all()
     return orders
 
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order(
     order_id: str,
+    fieldset: Optional[FieldSet] = Depends(sparse_fields(OrderResponse)),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get order details"""
-    order = db.query(Order).filter(
+    query = db.query(Order).filter(
         Order.id == order_id,
         Order.user_id == current_user.id
-    ).first()
+    )
+    if fieldset:
+        query = query.options(*fieldset.options(Order))
+    order = query.first()
     
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
+    if fieldset:
+        return JSONResponse(fieldset.dump(order))
     return order
 
 @router.post("/{order_id}/cancel", response_model=OrderResponse)
@@ -139,10 +138,11 @@ async def cancel_order(
     current_user: User = Depends(get_current_active_user)
 ):
     """Cancel an order"""
+    # Row lock so a concurrent cancel waits and then sees CANCELLED, not a second restock
     order = db.query(Order).filter(
         Order.id == order_id,
         Order.user_id == current_user.id
-    ).first()
+    ).with_for_update().first()
     
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
@@ -150,16 +150,17 @@ async def cancel_order(
     if order.status not in [OrderStatus.PENDING, OrderStatus.CONFIRMED]:
         raise HTTPException(status_code=400, detail="Order cannot be cancelled")
     
-    order.status = OrderStatus.CANCELLED
+    with rollups.track_orders(db, [order.id]):
+        order.status = OrderStatus.CANCELLED
     
     # Restore stock
-    for item in order.items:
-        if item.variant:
-            item.variant.stock_quantity += item.quantity
+    product_ids = restore_stock(db, [order.id])
     
+    outbox.enqueue_order_status(db, order)
     db.commit()
     db.refresh(order)
     
+    events.publish(events.STOCK_CHANGED, {"product_ids": product_ids})
     return order
 
 @router.put("/{order_id}/status")
@@ -171,16 +172,29 @@ async def update_order_status(
     current_user: User = Depends(get_admin_user)
 ):
     """Update order status (Admin only)"""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    # Locked like bulk_transition, so the transition is checked against the committed status
+    order = db.query(Order).filter(Order.id == order_id).with_for_update().first()
     
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    order.status = status
+    if not can_transition(order.status, status):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot move order from {order.status.value} to {status.value}"
+        )
+    
+    with rollups.track_orders(db, [order.id]):
+        order.status = status
     if tracking_number:
         order.tracking_number = tracking_number
     
+    product_ids = restore_stock(db, [order.id]) if status == OrderStatus.CANCELLED else []
+    
+    outbox.enqueue_order_status(db, order)
     db.commit()
     db.refresh(order)
     
+    if product_ids:
+        events.publish(events.STOCK_CHANGED, {"product_ids": product_ids})
     return order
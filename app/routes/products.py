@@ -1,12 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import exists, or_
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
+from app.config import settings
 from app.database import get_db
-from app.schemas import ProductResponse, ProductCreate, ProductUpdate
+from app import events, snapshot
+from app.schemas import (
+    ProductResponse, ProductCreate, ProductUpdate, CatalogImportReport, FacetCounts,
+    ProductListingResponse,
+)
+from app.services.catalog_import import detect_format, import_catalog, ImportFormatError
 from app.models.product import Product
 from app.models.product_variant import ProductVariant
-from app.dependencies import get_admin_user
+from app.models.listing import ProductListing
+from app.dependencies import get_admin_user, get_optional_user_id
+from app.fieldsets import FieldSet, sparse_fields
+from app.services import catalog, facets, suggest, wishlist as wishlist_service
 from app.models.user import User
 
 router = APIRouter(prefix="/api/products", tags=["Products"])
@@ -19,9 +30,18 @@ async def get_products(
     search: Optional[str] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
-    db: Session = Depends(get_db)
+    size: Optional[List[str]] = Query(None),
+    color: Optional[List[str]] = Query(None),
+    in_stock: bool = False,
+    fieldset: Optional[FieldSet] = Depends(sparse_fields(ProductResponse)),
+    db: Session = Depends(get_db),
+    user_id: Optional[str] = Depends(get_optional_user_id)
 ):
-    """Get all products with optional filters"""
+    """Get all products with optional filters
+    
+    Signed-in shoppers get `in_wishlist` set from their cached wishlist membership.
+    `fields`/`include` trim both the loaded columns and the response.
+    """
     query = db.query(Product).filter(Product.is_active == True)
     
     if category_id:
@@ -41,15 +61,125 @@ async def get_products(
     if max_price:
         query = query.filter(Product.base_price <= max_price)
     
+    # Variant facets: one variant must satisfy every selected facet at once
+    if size or color or in_stock:
+        variant_match = exists().where(ProductVariant.product_id == Product.id)
+        if size:
+            variant_match = variant_match.where(ProductVariant.size.in_(size))
+        if color:
+            variant_match = variant_match.where(ProductVariant.color.in_(color))
+        if in_stock:
+            variant_match = variant_match.where(ProductVariant.stock_quantity > 0)
+        query = query.filter(variant_match)
+    
+    if fieldset:
+        query = query.options(*fieldset.options(Product))
+    
     products = query.offset(skip).limit(limit).all()
-    return products
+    if search and not skip and products:
+        # Searches that find something feed the popular-query suggestions
+        suggest.suggester.record_search(search)
+    wishlisted = wishlist_service.membership(db, user_id) if user_id else frozenset()
+    if fieldset:
+        return JSONResponse([
+            fieldset.dump(product, in_wishlist=product.id in wishlisted) for product in products
+        ])
+    if not user_id:
+        return products
+    
+    return [
+        ProductResponse.model_validate(product).model_copy(
+            update={"in_wishlist": product.id in wishlisted}
+        )
+        for product in products
+    ]
+
+@router.get("/listing", response_model=List[ProductListingResponse])
+async def get_product_listing(
+    skip: int = 0,
+    limit: int = Query(20, le=100),
+    category_id: Optional[int] = None,
+    search: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_stock: bool = False,
+    sort: str = Query("newest", pattern="^(newest|price_asc|price_desc)$"),
+    db: Session = Depends(get_db),
+    user_id: Optional[str] = Depends(get_optional_user_id)
+):
+    """Listing page tiles: price, stock, first image, category path and swatches
+    
+    Read from the product_listing table, which product, variant and stock writes
+    keep up to date, so a page needs no joins or per-variant JSON parsing.
+    """
+    query = db.query(ProductListing).filter(ProductListing.is_active == True)
+    
+    if category_id:
+        query = query.filter(ProductListing.category_id == category_id)
+    if search:
+        query = query.filter(ProductListing.name.contains(search))
+    if min_price:
+        query = query.filter(ProductListing.min_price >= min_price)
+    if max_price:
+        query = query.filter(ProductListing.min_price <= max_price)
+    if in_stock:
+        query = query.filter(ProductListing.total_stock > 0)
+    
+    if sort == "price_asc":
+        query = query.order_by(ProductListing.min_price, ProductListing.product_id)
+    elif sort == "price_desc":
+        query = query.order_by(ProductListing.min_price.desc(), ProductListing.product_id)
+    else:
+        query = query.order_by(ProductListing.created_at.desc(), ProductListing.product_id)
+    
+    tiles = [ProductListingResponse.model_validate(row) for row in query.offset(skip).limit(limit)]
+    if user_id:
+        wishlisted = wishlist_service.membership(db, user_id)
+        for tile in tiles:
+            tile.in_wishlist = tile.product_id in wishlisted
+    return tiles
+
+@router.get("/facets", response_model=FacetCounts)
+async def get_product_facets(
+    category_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Size, color, price band and availability counts for a category (or the whole catalog)
+    
+    Served from the precomputed facet table, which is refreshed shortly after
+    product and stock changes.
+    """
+    return facets.get_facets(db, category_id or facets.ALL_CATEGORIES)
 
 @router.get("/{slug}", response_model=ProductResponse)
-async def get_product(slug: str, db: Session = Depends(get_db)):
-    """Get product by slug"""
-    product = db.query(Product).filter(Product.slug == slug).first()
+async def get_product(
+    slug: str,
+    fieldset: Optional[FieldSet] = Depends(sparse_fields(ProductResponse)),
+    db: Session = Depends(get_db)
+):
+    """Get product by slug
+    
+    Full responses come from the shared catalog snapshot when one is published,
+    with stock and `is_active` read live; products newer than the snapshot fall
+    back to the database.
+    """
+    snap = snapshot.current() if fieldset is None else None
+    if snap is not None:
+        data = snap.product_by_slug(slug)
+        if data is not None:
+            product = snapshot.with_live_fields(db, data)
+            if product is None:
+                raise HTTPException(status_code=404, detail="Product not found")
+            return JSONResponse(product)
+    
+    query = db.query(Product).filter(Product.slug == slug)
+    if fieldset:
+        query = query.options(*fieldset.options(Product))
+    product = query.first()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    if fieldset:
+        return JSONResponse(fieldset.dump(product))
     return product
 
 @router.post("", response_model=ProductResponse, status_code=201)
@@ -93,11 +223,32 @@ async def create_product(
         )
         db.add(variant)
     
+    catalog.products_changed(db, [product.id])
     db.commit()
     db.refresh(product)
     
+    events.publish(events.PRODUCT_CHANGED, {
+        "product_ids": [product.id], "category_ids": [product.category_id]
+    })
     return product
 
+@router.post("/import", response_model=CatalogImportReport)
+async def import_products(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """Bulk upsert products (by slug) and variants (by sku) from CSV or NDJSON (Admin only)"""
+    try:
+        fmt = detect_format(file.filename, format)
+    except ImportFormatError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    
+    return await run_in_threadpool(
+        import_catalog, db, file.file, fmt, settings.IMPORT_BATCH_SIZE
+    )
+
 @router.put("/{product_id}", response_model=ProductResponse)
 async def update_product(
     product_id: str,
@@ -110,12 +261,19 @@ async def update_product(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
+    old_category_id = product.category_id
+    
     # Update fields
     for field, value in product_data.model_dump(exclude_unset=True).items():
         setattr(product, field, value)
     
+    catalog.products_changed(db, [product.id])
     db.commit()
     db.refresh(product)
+    
+    events.publish(events.PRODUCT_CHANGED, {
+        "product_ids": [product.id], "category_ids": [old_category_id, product.category_id]
+    })
     return product
 
 @router.delete("/{product_id}", status_code=204)
@@ -129,6 +287,12 @@ async def delete_product(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
+    category_id = product.category_id
     db.delete(product)
+    catalog.products_changed(db, [product_id])
     db.commit()
+    
+    events.publish(events.PRODUCT_CHANGED, {
+        "product_ids": [product_id], "category_ids": [category_id], "deleted": True
+    })
     return None
@@ -0,0 +1,21 @@
+from typing import List
+from fastapi import APIRouter, Query
+from app.schemas import SearchSuggestion
+from app.services import suggest
+
+router = APIRouter(prefix="/api/search", tags=["Search"])
+
+@router.get("/suggest", response_model=List[SearchSuggestion])
+async def get_suggestions(
+    q: str = Query(..., max_length=suggest.MAX_QUERY_LENGTH),
+    limit: int = Query(8, ge=1, le=suggest.MAX_RESULTS),
+):
+    """Search-as-you-type: products, categories and popular searches starting with `q`
+    
+    Matches any word start ("shi" finds "Linen Shirt"), heaviest sellers first.
+    Answered from this worker's in-memory index without touching the database.
+    """
+    return [
+        {"text": entry.text, "kind": entry.kind, "id": entry.id, "slug": entry.slug}
+        for entry in suggest.suggester.suggest(q, limit)
+    ]
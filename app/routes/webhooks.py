@@ -0,0 +1,64 @@
+import json
+from fastapi import APIRouter, HTTPException, Request, status
+from app.services.payments import (
+    RAZORPAY, STRIPE, RecentEvents, SignatureError, verify_razorpay, verify_stripe
+)
+from app.workers.payments import ingestor
+
+router = APIRouter(prefix="/api/webhooks", tags=["Webhooks"])
+
+recent_events = RecentEvents()
+
+async def _accept(provider: str, event_id: str, event_type: str, payload: dict) -> dict:
+    key = (provider, event_id)
+    if recent_events.seen(key):
+        return {"status": "duplicate"}
+    
+    try:
+        await ingestor.submit({
+            "provider": provider,
+            "event_id": event_id,
+            "event_type": event_type,
+            "payload": payload,
+        })
+    except Exception:
+        # Non-2xx makes the gateway retry later
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Event not stored")
+    
+    recent_events.add(key)
+    return {"status": "accepted"}
+
+def _parse(body: bytes) -> dict:
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+
+@router.post("/razorpay")
+async def razorpay_webhook(request: Request):
+    """Receive Razorpay events; verified, deduplicated and queued for processing"""
+    body = await request.body()
+    try:
+        verify_razorpay(body, request.headers.get("X-Razorpay-Signature"))
+    except SignatureError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    
+    payload = _parse(body)
+    event_id = request.headers.get("X-Razorpay-Event-Id") or payload.get("id")
+    if not event_id:
+        raise HTTPException(status_code=400, detail="Missing event id")
+    return await _accept(RAZORPAY, event_id, payload.get("event", ""), payload)
+
+@router.post("/stripe")
+async def stripe_webhook(request: Request):
+    """Receive Stripe events; verified, deduplicated and queued for processing"""
+    body = await request.body()
+    try:
+        verify_stripe(body, request.headers.get("Stripe-Signature"))
+    except SignatureError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    
+    payload = _parse(body)
+    if not payload.get("id"):
+        raise HTTPException(status_code=400, detail="Missing event id")
+    return await _accept(STRIPE, payload["id"], payload.get("type", ""), payload)
@@ -0,0 +1,130 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import select
+from typing import List
+from app.database import get_db, insert_ignore
+from app.schemas import (
+    WishlistAdd, WishlistItemResponse, WishlistMoveToCart, CartItemResponse, ProductResponse
+)
+from app.models.cart import Cart, Wishlist
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.dependencies import get_current_active_user
+from app.models.user import User
+from app.services import reservations, wishlist as wishlist_service
+
+router = APIRouter(prefix="/api/wishlist", tags=["Wishlist"])
+
+def _item_response(item: Wishlist) -> WishlistItemResponse:
+    return WishlistItemResponse(
+        id=item.id,
+        product_id=item.product_id,
+        created_at=item.created_at,
+        product=ProductResponse.model_validate(item.product).model_copy(update={"in_wishlist": True})
+    )
+
+@router.get("", response_model=List[WishlistItemResponse])
+async def get_wishlist(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get user's wishlist with product details"""
+    items = db.query(Wishlist).filter(Wishlist.user_id == current_user.id).options(
+        selectinload(Wishlist.product).selectinload(Product.variants)
+    ).order_by(Wishlist.created_at.desc()).all()
+    return [_item_response(item) for item in items]
+
+@router.post("", response_model=WishlistItemResponse, status_code=201)
+async def add_to_wishlist(
+    item: WishlistAdd,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Add a product to the wishlist (adding it again is a no-op)"""
+    product = db.query(Product).filter(Product.id == item.product_id).first()
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    insert_ignore(db, Wishlist, [{"user_id": current_user.id, "product_id": item.product_id}])
+    db.commit()
+    wishlist_service.changed(current_user.id)
+    
+    return _item_response(db.query(Wishlist).filter(
+        Wishlist.user_id == current_user.id,
+        Wishlist.product_id == item.product_id
+    ).first())
+
+@router.delete("/{product_id}", status_code=204)
+async def remove_from_wishlist(
+    product_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Remove a product from the wishlist"""
+    deleted = db.query(Wishlist).filter(
+        Wishlist.user_id == current_user.id,
+        Wishlist.product_id == product_id
+    ).delete()
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Wishlist item not found")
+    
+    db.commit()
+    wishlist_service.changed(current_user.id)
+    return None
+
+@router.post("/move-to-cart", response_model=List[CartItemResponse])
+async def move_to_cart(
+    request: WishlistMoveToCart,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Move wishlisted products into the cart as the chosen variants"""
+    quantities = {}
+    for item in request.items:
+        quantities[item.product_variant_id] = quantities.get(item.product_variant_id, 0) + item.quantity
+    
+    variants = {
+        variant.id: variant
+        for variant in db.execute(
+            select(ProductVariant).where(ProductVariant.id.in_(quantities))
+        ).scalars()
+    }
+    wishlisted = wishlist_service.membership(db, current_user.id)
+    held = reservations.held(db, variants, exclude_user_id=current_user.id)
+    cart_items = {
+        cart_item.product_variant_id: cart_item
+        for cart_item in db.execute(
+            select(Cart).where(Cart.user_id == current_user.id, Cart.product_variant_id.in_(quantities))
+        ).scalars()
+    }
+    
+    for variant_id, quantity in quantities.items():
+        variant = variants.get(variant_id)
+        if variant is None:
+            raise HTTPException(status_code=404, detail=f"Variant {variant_id} not found")
+        if variant.product_id not in wishlisted:
+            raise HTTPException(status_code=400, detail=f"Product for variant {variant.sku} is not in your wishlist")
+        in_cart = cart_items[variant_id].quantity if variant_id in cart_items else 0
+        if variant.stock_quantity - held.get(variant_id, 0) < in_cart + quantity:
+            raise HTTPException(status_code=400, detail=f"Insufficient stock for {variant.sku}")
+    
+    moved = []
+    for variant_id, quantity in quantities.items():
+        if variant_id in cart_items:
+            cart_items[variant_id].quantity += quantity
+            moved.append(cart_items[variant_id])
+        else:
+            cart_item = Cart(user_id=current_user.id, product_variant_id=variant_id, quantity=quantity)
+            db.add(cart_item)
+            moved.append(cart_item)
+    
+    db.query(Wishlist).filter(
+        Wishlist.user_id == current_user.id,
+        Wishlist.product_id.in_({variants[v].product_id for v in quantities})
+    ).delete(synchronize_session=False)
+    db.commit()
+    wishlist_service.changed(current_user.id)
+    
+    for cart_item in moved:
+        db.refresh(cart_item)
+    return moved
@@ -1,7 +1,8 @@
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, field_validator, model_validator
+from typing import Literal, Optional, Union
+from datetime import date, datetime
 from app.models.user import UserRole
+from app.models.order import OrderStatus
 
 # User Schemas
 class UserBase(BaseModel):
@@ -36,6 +37,13 @@ class Token(BaseModel):
     refresh_token: str
     token_type: str = "bearer"
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class PasswordChange(BaseModel):
+    current_password: str
+    new_password: str = Field(..., min_length=8)
+
 class TokenData(BaseModel):
     user_id: Optional[str] = None
 
@@ -105,8 +113,164 @@ class ProductResponse(ProductBase):
     is_active: bool
     created_at: datetime
     variants: list[ProductVariantResponse] = []
+    in_wishlist: bool = False
+    
+    model_config = ConfigDict(from_attributes=True)
+
+class ProductListingResponse(BaseModel):
+    """Listing tile served from the denormalized product_listing table"""
+    product_id: str
+    name: str
+    slug: str
+    category_id: Optional[int] = None
+    category_path: Optional[str] = None
+    min_price: float
+    discount_percentage: float = 0
+    total_stock: int
+    image_url: Optional[str] = None
+    color_swatches: list[str] = []
+    created_at: Optional[datetime] = None
+    in_wishlist: bool = False
     
     model_config = ConfigDict(from_attributes=True)
+    
+    @field_validator("color_swatches", mode="before")
+    @classmethod
+    def split_swatches(cls, value):
+        if isinstance(value, str):
+            return value.split(",") if value else []
+        return value or []
+
+class FacetValue(BaseModel):
+    value: str
+    count: int
+
+class FacetCounts(BaseModel):
+    size: list[FacetValue] = []
+    color: list[FacetValue] = []
+    price: list[FacetValue] = []
+    availability: list[FacetValue] = []
+
+class MediaDerivative(BaseModel):
+    width: int
+    format: str
+    url: str
+
+class MediaAssetResponse(BaseModel):
+    sha256: str
+    content_type: str
+    size_bytes: int
+    width: int
+    height: int
+    original_url: str
+    primary_url: str
+    derivatives: list[MediaDerivative]
+    deduplicated: bool = False
+    variant_images: Optional[list[str]] = None
+    
+    model_config = ConfigDict(from_attributes=True)
+
+# Catalog Change Feed Schemas
+class CatalogChangeEntry(BaseModel):
+    version: int
+    entity: Literal["product", "category"]
+    id: str
+    op: Literal["upsert", "delete"]
+    data: Optional[dict] = None  # Current ProductResponse/CategoryResponse for upserts
+
+class CatalogChangesPage(BaseModel):
+    changes: list[CatalogChangeEntry]
+    next_since: int
+    has_more: bool
+
+class SearchSuggestion(BaseModel):
+    text: str
+    kind: str  # product, category or query
+    id: Optional[Union[str, int]] = None  # Product or category id; None for a popular query
+    slug: Optional[str] = None
+
+# Catalog Import Schemas
+class ProductImportRow(BaseModel):
+    """One line of a catalog import: product fields plus an optional variant"""
+    slug: str = Field(..., min_length=1, max_length=300)
+    name: str = Field(..., min_length=1, max_length=255)
+    description: Optional[str] = None
+    fabric_details: Optional[str] = None
+    care_instructions: Optional[str] = None
+    base_price: float = Field(..., ge=0)
+    discount_percentage: float = Field(0, ge=0, le=100)
+    category_id: Optional[int] = None
+    category_slug: Optional[str] = None
+    is_active: bool = True
+    sku: Optional[str] = Field(None, max_length=100)
+    size: Optional[str] = Field(None, max_length=20)
+    color: Optional[str] = Field(None, max_length=50)
+    stock_quantity: int = Field(0, ge=0)
+    price_override: Optional[float] = Field(None, ge=0)
+    images: Optional[list[str]] = None
+    
+    @field_validator("images", mode="before")
+    @classmethod
+    def split_images(cls, value):
+        # CSV cells carry image URLs separated by "|"
+        if isinstance(value, str):
+            return [url.strip() for url in value.split("|") if url.strip()]
+        return value
+    
+    @model_validator(mode="after")
+    def check_variant_fields(self):
+        if self.sku and (not self.size or not self.color):
+            raise ValueError("size and color are required when sku is given")
+        return self
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+class CatalogImportReport(BaseModel):
+    rows_total: int
+    rows_imported: int
+    products_upserted: int
+    variants_upserted: int
+    error_count: int
+    errors: list[ImportRowError] = []
+    elapsed_ms: float
+    rows_per_second: float
+
+# Inventory Schemas
+class StockSyncItem(BaseModel):
+    sku: str
+    quantity: int
+
+class StockSyncRequest(BaseModel):
+    mode: Literal["absolute", "delta"] = "absolute"
+    items: list[StockSyncItem]
+    
+    @model_validator(mode="after")
+    def check_quantities(self):
+        if self.mode == "absolute" and any(item.quantity < 0 for item in self.items):
+            raise ValueError("absolute stock quantities cannot be negative")
+        return self
+
+class StockSyncReport(BaseModel):
+    received: int
+    checked: int
+    changed: int
+    unknown_count: int
+    unknown_skus: list[str] = []
+    elapsed_ms: float
+
+# Analytics Schemas
+class SalesPoint(BaseModel):
+    day: date
+    orders: int
+    units: int
+    revenue: float
+
+class RankedSales(BaseModel):
+    id: int
+    units: int
+    revenue: float
 
 # Category Schemas
 class CategoryBase(BaseModel):
@@ -141,16 +305,68 @@ class CartItemResponse(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
 
+# Wishlist Schemas
+class WishlistAdd(BaseModel):
+    product_id: str
+
+class WishlistItemResponse(BaseModel):
+    id: int
+    product_id: str
+    created_at: datetime
+    product: ProductResponse
+    
+    model_config = ConfigDict(from_attributes=True)
+
+class WishlistMoveToCart(BaseModel):
+    items: list[CartItemAdd] = Field(..., min_length=1)
+
 # Order Schemas
 class OrderItemCreate(BaseModel):
     product_variant_id: int
-    quantity: int
+    quantity: int = Field(gt=0)
 
 class OrderCreate(BaseModel):
     items: list[OrderItemCreate]
     shipping_address_id: int
     billing_address_id: int
     coupon_code: Optional[str] = None
+    quote_token: Optional[str] = None
+
+# Checkout Schemas
+class CheckoutQuoteRequest(BaseModel):
+    """Price the given items, or the current cart when `items` is omitted"""
+    items: Optional[list[OrderItemCreate]] = None
+    coupon_code: Optional[str] = None
+    shipping_address_id: Optional[int] = None  # Zone shipping and state tax rules need it
+
+class Serviceability(BaseModel):
+    pincode: str
+    serviceable: bool
+    zone: Optional[str] = None
+    delivery_days: Optional[int] = None
+    cod_available: bool = True
+    shipping_cost: Optional[float] = None  # For `subtotal`; None when not serviceable
+
+class QuoteLine(BaseModel):
+    product_variant_id: int
+    sku: str
+    product_name: str
+    quantity: int
+    unit_price: float
+    total_price: float
+
+class CheckoutQuote(BaseModel):
+    lines: list[QuoteLine]
+    subtotal: float
+    discount_amount: float
+    tax_amount: float
+    shipping_cost: float
+    total_amount: float
+    coupon_code: Optional[str] = None
+    cart_version: str
+    quote_token: str
+    expires_at: datetime
+    reserved_until: datetime  # Stock is held for this checkout until then
 
 class OrderItemResponse(BaseModel):
     id: int
@@ -177,6 +393,25 @@ class OrderResponse(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
 
+class BulkOrderStatusItem(BaseModel):
+    order_id: str
+    tracking_number: Optional[str] = Field(None, max_length=100)
+
+class BulkOrderStatusRequest(BaseModel):
+    status: OrderStatus
+    orders: list[BulkOrderStatusItem] = Field(..., min_length=1)
+
+class SkippedOrder(BaseModel):
+    order_id: str
+    reason: str
+
+class BulkOrderStatusReport(BaseModel):
+    requested: int
+    updated: int
+    skipped_count: int
+    skipped: list[SkippedOrder] = []
+    elapsed_ms: float
+
 # Coupon Schemas
 class CouponCreate(BaseModel):
     code: str
@@ -200,6 +435,49 @@ class CouponResponse(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
 
+# Shipping & Tax Rule Schemas
+class ShippingZoneBase(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    pincode_prefixes: list[str] = Field(..., min_length=1)
+    rate: float = Field(0, ge=0)
+    free_above: Optional[float] = Field(None, ge=0)
+    delivery_days: Optional[int] = Field(None, ge=0)
+    cod_available: bool = True
+    is_serviceable: bool = True
+    
+    @field_validator("pincode_prefixes")
+    @classmethod
+    def check_prefixes(cls, value):
+        prefixes = sorted({prefix.strip() for prefix in value})
+        for prefix in prefixes:
+            if not prefix.isdigit() or len(prefix) > 6:
+                raise ValueError(f"Pincode prefix '{prefix}' must be 1-6 digits")
+        return prefixes
+
+class ShippingZoneCreate(ShippingZoneBase):
+    pass
+
+class ShippingZoneResponse(ShippingZoneBase):
+    id: int
+    updated_at: Optional[datetime] = None
+    
+    model_config = ConfigDict(from_attributes=True)
+
+class TaxRuleBase(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    state: Optional[str] = Field(None, max_length=100)  # None applies to every state without its own rules
+    min_unit_price: float = Field(0, ge=0)
+    rate: float = Field(..., ge=0, le=1)
+
+class TaxRuleCreate(TaxRuleBase):
+    pass
+
+class TaxRuleResponse(TaxRuleBase):
+    id: int
+    updated_at: Optional[datetime] = None
+    
+    model_config = ConfigDict(from_attributes=True)
+
 # B2B Schemas
 class B2BRegistration(BaseModel):
     business_name: str
@@ -214,3 +492,15 @@ class B2BResponse(BaseModel):
     moq_requirement: int
     
     model_config = ConfigDict(from_attributes=True)
+
+class B2BBulkOrderReport(BaseModel):
+    order_id: str
+    order_number: str
+    lines: int
+    units: int
+    discount_tier: float
+    subtotal: float
+    shipping_cost: float
+    tax_amount: float
+    total_amount: float
+    elapsed_ms: float
@@ -0,0 +1,149 @@
+"""Pre-forking production server used by `python manage.py serve`.
+
+The master imports the app once, binds the listening socket and forks the
+workers, which share the socket and the app's imported pages copy-on-write.
+Each worker runs its own uvicorn loop, lifespan and database pool. SIGTERM or
+SIGINT drains every worker (uvicorn stops accepting and waits for in-flight
+requests) and force-kills stragglers after the grace period.
+"""
+import logging
+import math
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import time
+from typing import Dict
+from app.bus import BUS_DIR_ENV
+
+logger = logging.getLogger("jora.server")
+
+# A worker that dies sooner than this after starting is respawned with a delay
+MIN_WORKER_LIFETIME_SECONDS = 1.0
+
+def available_cpus() -> int:
+    """CPUs this process may run on, capped by a cgroup v2 quota when in a container"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+class PreforkServer:
+    def __init__(self, app_path: str, host: str, port: int, workers: int, graceful_timeout: int):
+        self.app_path = app_path
+        self.host = host
+        self.port = port
+        self.worker_count = workers
+        self.graceful_timeout = graceful_timeout
+        self.workers: Dict[int, float] = {}
+        self._stopping = False
+
+    def _bind(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET6 if ":" in self.host else socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def _spawn(self, app, sock: socket.socket) -> None:
+        import uvicorn
+
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = time.monotonic()
+            return
+
+        # Worker: uvicorn installs its own SIGTERM/SIGINT handlers for draining
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        exit_code = 0
+        try:
+            config = uvicorn.Config(
+                app, lifespan="on", timeout_graceful_shutdown=self.graceful_timeout,
+            )
+            uvicorn.Server(config).run(sockets=[sock])
+        except BaseException:
+            logger.exception("Worker %d crashed", os.getpid())
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def run(self) -> None:
+        from uvicorn.importer import import_from_string
+
+        # Preload so workers inherit imported modules instead of importing N times
+        app = import_from_string(self.app_path)
+        sock = self._bind()
+        bus_dir = tempfile.mkdtemp(prefix="jora-bus-")
+        os.environ[BUS_DIR_ENV] = bus_dir
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        logger.info("Serving %s on %s:%d with %d workers", self.app_path, self.host, self.port, self.worker_count)
+
+        try:
+            for _ in range(self.worker_count):
+                self._spawn(app, sock)
+            while not self._stopping:
+                self._reap(app, sock)
+                time.sleep(0.2)
+        finally:
+            self._shutdown()
+            sock.close()
+            shutil.rmtree(bus_dir, ignore_errors=True)
+
+    def _reap(self, app, sock: socket.socket) -> None:
+        while self.workers:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            started = self.workers.pop(pid, None)
+            if started is None or self._stopping:
+                continue
+            logger.warning("Worker %d exited with status %d; restarting", pid, status)
+            if time.monotonic() - started < MIN_WORKER_LIFETIME_SECONDS:
+                time.sleep(MIN_WORKER_LIFETIME_SECONDS)
+            self._spawn(app, sock)
+
+    def _shutdown(self) -> None:
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        # Give uvicorn the graceful timeout plus time for the lifespan shutdown
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if pid:
+                self.workers.pop(pid, None)
+            else:
+                time.sleep(0.1)
+        for pid in self.workers:
+            logger.warning("Worker %d did not drain in time; killing it", pid)
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.workers.clear()
+
+def serve(host: str = "0.0.0.0", port: int = 8000, workers: int = 0, app_path: str = "main:app") -> None:
+    from app.config import settings
+
+    logging.basicConfig(level=logging.INFO)
+    count = workers or settings.SERVER_WORKERS or available_cpus()
+    PreforkServer(app_path, host, port, count, settings.SERVER_GRACEFUL_TIMEOUT_SECONDS).run()
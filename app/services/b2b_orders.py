@@ -0,0 +1,243 @@
+import csv
+import io
+import json
+import time
+from decimal import Decimal, ROUND_HALF_UP
+from typing import BinaryIO, Dict, Iterator, List, Tuple
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+from app import events
+from app.models.b2b import ApprovalStatus, B2BCustomer
+from app.models.order import Order, OrderItem, OrderStatus, PaymentStatus, generate_order_number
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.models.user import User
+from app.services import catalog, outbox, pricing, reservations, rollups
+
+MAX_REPORTED_ERRORS = 500
+CENT = Decimal("0.01")
+
+class BulkOrderError(ValueError):
+    """The upload can't become an order; `errors` lists every offending line"""
+
+    def __init__(self, detail: str, errors: List[dict] = None, status_code: int = 422):
+        super().__init__(detail)
+        self.detail = detail
+        self.errors = errors or []
+        self.status_code = status_code
+
+def detect_format(filename: str, requested: str = None) -> str:
+    fmt = (requested or (filename or "").rsplit(".", 1)[-1]).lower()
+    if fmt not in ("csv", "json"):
+        raise BulkOrderError("Upload must be CSV or JSON", status_code=400)
+    return fmt
+
+def _iter_lines(stream: BinaryIO, fmt: str) -> Iterator[Tuple[int, object, object]]:
+    """(line, sku, quantity) as uploaded; CSV needs `sku` and `quantity` columns"""
+    if fmt == "json":
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig")
+        try:
+            data = json.load(text)
+        except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+            raise BulkOrderError(f"Invalid JSON: {exc}", status_code=400)
+        finally:
+            text.detach()
+        items = data.get("items") if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            raise BulkOrderError('JSON must be a list of {"sku", "quantity"} or {"items": [...]}', status_code=400)
+        for index, item in enumerate(items, start=1):
+            item = item if isinstance(item, dict) else {}
+            yield index, item.get("sku"), item.get("quantity")
+        return
+
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        if not reader.fieldnames or not {"sku", "quantity"} <= set(reader.fieldnames):
+            raise BulkOrderError("CSV needs 'sku' and 'quantity' columns", status_code=400)
+        for record in reader:
+            yield reader.line_num, record.get("sku"), record.get("quantity")
+    finally:
+        text.detach()
+
+def _parse(stream: BinaryIO, fmt: str, max_lines: int, errors: List[dict]) -> Dict[str, Tuple[int, int]]:
+    """sku -> (first line, total quantity); repeated SKUs are added up"""
+    wanted: Dict[str, Tuple[int, int]] = {}
+    for count, (line, sku, quantity) in enumerate(_iter_lines(stream, fmt), start=1):
+        if count > max_lines:
+            raise BulkOrderError(f"Upload exceeds {max_lines} lines", status_code=413)
+        sku = str(sku).strip() if sku is not None else ""
+        try:
+            quantity = int(str(quantity).strip())
+        except ValueError:
+            quantity = 0
+        if not sku or quantity <= 0:
+            errors.append({"line": line, "sku": sku or None, "error": "sku and a positive whole quantity are required"})
+            continue
+        first_line, total = wanted.get(sku, (line, 0))
+        wanted[sku] = (first_line, total + quantity)
+    return wanted
+
+def _resolve(db: Session, skus: List[str], chunk_size: int) -> Dict[str, dict]:
+    """Variants with their product's name and price for every SKU.
+
+    SKUs are mapped to ids first and the rows are then locked in id order, the
+    order checkout and reservations lock variants in, so a bulk order and a
+    consumer checkout sharing variants can't deadlock.
+    """
+    variants = ProductVariant.__table__
+    products = Product.__table__
+    ids = []
+    for start in range(0, len(skus), chunk_size):
+        ids.extend(db.execute(
+            select(variants.c.id).where(variants.c.sku.in_(skus[start:start + chunk_size]))
+        ).scalars())
+    ids.sort()
+
+    found = {}
+    for start in range(0, len(ids), chunk_size):
+        rows = db.execute(
+            select(
+                variants.c.id, variants.c.sku, variants.c.size, variants.c.color,
+                variants.c.stock_quantity, variants.c.price_override, variants.c.product_id,
+                products.c.name, products.c.base_price, products.c.is_active, products.c.category_id,
+            )
+            .select_from(variants.join(products, products.c.id == variants.c.product_id))
+            .where(variants.c.id.in_(ids[start:start + chunk_size]))
+            .order_by(variants.c.id)
+            .with_for_update(of=variants)
+        ).mappings()
+        found.update((row["sku"], dict(row)) for row in rows)
+    return found
+
+def _outstanding_credit(db: Session, user_id: str) -> Decimal:
+    """Value of this buyer's live orders that haven't been paid yet"""
+    total = db.execute(
+        select(func.coalesce(func.sum(Order.total_amount), 0)).where(
+            Order.user_id == user_id,
+            Order.payment_status == PaymentStatus.PENDING,
+            Order.status.notin_([OrderStatus.CANCELLED, OrderStatus.REFUNDED]),
+        )
+    ).scalar()
+    return Decimal(str(total))
+
+def place_bulk_order(db: Session, user: User, stream: BinaryIO, fmt: str, shipping_address_id: int,
+                     billing_address_id: int, chunk_size: int, max_lines: int) -> dict:
+    """Validate a whole SKU/quantity upload and create it as one order, or reject it with every error.
+
+    SKUs are resolved, then locked in id order, in chunks of `chunk_size`.
+    Stock, MOQ (per SKU) and the credit limit are checked before anything is
+    written; the items and stock decrements then go out as multi-row statements.
+    """
+    started = time.perf_counter()
+    # Locking the profile serializes a buyer's orders, so two uploads can't both spend the same credit
+    profile = db.execute(
+        select(B2BCustomer).where(B2BCustomer.user_id == user.id).with_for_update()
+    ).scalar_one_or_none()
+    if profile is None or profile.approval_status != ApprovalStatus.APPROVED:
+        raise BulkOrderError("An approved B2B profile is required", status_code=403)
+
+    errors: List[dict] = []
+    wanted = _parse(stream, fmt, max_lines, errors)
+    if not wanted and not errors:
+        raise BulkOrderError("Upload has no order lines", status_code=400)
+
+    variants = _resolve(db, sorted(wanted), chunk_size)
+    holds = reservations.held(db, [variant["id"] for variant in variants.values()], exclude_user_id=user.id)
+    moq = profile.moq_requirement or 0
+    tier = Decimal(str(profile.discount_tier or 0))
+    lines = []
+    for sku, (line, quantity) in wanted.items():
+        variant = variants.get(sku)
+        if variant is None:
+            errors.append({"line": line, "sku": sku, "error": "Unknown SKU"})
+        elif not variant["is_active"]:
+            errors.append({"line": line, "sku": sku, "error": "Product is not available"})
+        elif quantity < moq:
+            errors.append({"line": line, "sku": sku, "error": f"Below the minimum order quantity of {moq}"})
+        elif quantity > variant["stock_quantity"] - holds.get(variant["id"], 0):
+            # Units held by shoppers mid-checkout aren't available to bulk orders either
+            available = max(variant["stock_quantity"] - holds.get(variant["id"], 0), 0)
+            errors.append({"line": line, "sku": sku, "error": f"Only {available} in stock"})
+        else:
+            list_price = Decimal(str(variant["price_override"] or variant["base_price"]))
+            unit_price = (list_price * (100 - tier) / 100).quantize(CENT, rounding=ROUND_HALF_UP)
+            lines.append({"variant": variant, "quantity": quantity, "unit_price": unit_price,
+                          "total_price": unit_price * quantity})
+    if errors:
+        errors.sort(key=lambda error: error["line"])
+        raise BulkOrderError(f"{len(errors)} line(s) can't be ordered", errors[:MAX_REPORTED_ERRORS])
+
+    try:
+        address = pricing.destination(db, user.id, shipping_address_id)
+        amounts = pricing.totals(db, lines, None, address)
+    except pricing.PricingError as exc:
+        raise BulkOrderError(exc.detail, status_code=exc.status_code)
+    if profile.credit_limit is not None:
+        available = Decimal(str(profile.credit_limit)) - _outstanding_credit(db, user.id)
+        if amounts["total_amount"] > available:
+            raise BulkOrderError(
+                f"Order total {amounts['total_amount']} exceeds the available credit of {max(available, Decimal('0'))}",
+                status_code=402,
+            )
+
+    order = Order(
+        order_number=generate_order_number(),
+        user_id=user.id,
+        payment_method="credit" if profile.credit_limit is not None else None,
+        subtotal=amounts["subtotal"],
+        shipping_cost=amounts["shipping_cost"],
+        tax_amount=amounts["tax_amount"],
+        discount_amount=amounts["discount_amount"],
+        total_amount=amounts["total_amount"],
+        shipping_address_id=shipping_address_id,
+        billing_address_id=billing_address_id,
+    )
+    db.add(order)
+    db.flush()
+
+    db.execute(OrderItem.__table__.insert(), [
+        {
+            "order_id": order.id,
+            "product_variant_id": line["variant"]["id"],
+            "product_name": line["variant"]["name"],
+            "variant_details": f"{line['variant']['size']} / {line['variant']['color']}",
+            "quantity": line["quantity"],
+            "unit_price": line["unit_price"],
+            "total_price": line["total_price"],
+            "category_id": line["variant"]["category_id"],
+        }
+        for line in lines
+    ])
+    stock = ProductVariant.__table__
+    decrement = (
+        update(stock)
+        .where(stock.c.id == bindparam("b_id"))
+        .values(stock_quantity=stock.c.stock_quantity - bindparam("b_quantity"))
+    )
+    changes = [{"b_id": line["variant"]["id"], "b_quantity": line["quantity"]} for line in lines]
+    for start in range(0, len(changes), chunk_size):
+        db.execute(decrement, changes[start:start + chunk_size])
+
+    product_ids = sorted({line["variant"]["product_id"] for line in lines})
+    catalog.stock_changed(db, product_ids)
+    rollups.add_orders(db, [order.id])
+    outbox.enqueue_order_placed(db, order)
+    db.commit()
+
+    events.publish(events.STOCK_CHANGED, {
+        "product_ids": product_ids,
+        "variant_ids": [change["b_id"] for change in changes],
+    })
+    return {
+        "order_id": order.id,
+        "order_number": order.order_number,
+        "lines": len(lines),
+        "units": sum(line["quantity"] for line in lines),
+        "discount_tier": float(tier),
+        "subtotal": amounts["subtotal"],
+        "shipping_cost": amounts["shipping_cost"],
+        "tax_amount": amounts["tax_amount"],
+        "total_amount": amounts["total_amount"],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
@@ -0,0 +1,20 @@
+"""Write-path hooks for catalog changes.
+
+Product, variant and stock writes call these inside their own transaction so
+the listing read model and the change log commit atomically with the change.
+"""
+from typing import Iterable
+from sqlalchemy.orm import Session
+from app.services import changelog, listing
+
+def products_changed(db: Session, product_ids: Iterable[str]) -> None:
+    """Products created, edited or deleted (including their variants)"""
+    product_ids = set(product_ids)
+    existing = listing.refresh(db, product_ids)
+    changelog.record(db, changelog.PRODUCT, upserts=existing, deletes=product_ids - existing)
+
+def stock_changed(db: Session, product_ids: Iterable[str]) -> None:
+    """Only stock levels moved (checkout, cancellation, stock sync)"""
+    product_ids = set(product_ids)
+    listing.refresh_stock(db, product_ids)
+    changelog.record(db, changelog.PRODUCT, upserts=product_ids)
@@ -0,0 +1,215 @@
+import csv
+import io
+import json
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+from typing import BinaryIO, Iterator, Tuple
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app import events
+from app.database import upsert
+from app.services import catalog
+from app.models.category import Category
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.schemas import ProductImportRow
+
+MAX_REPORTED_ERRORS = 500
+
+PRODUCT_FIELDS = [
+    "name", "description", "fabric_details", "care_instructions", "base_price",
+    "discount_percentage", "category_id", "is_active",
+]
+VARIANT_FIELDS = ["size", "color", "stock_quantity", "price_override", "images"]
+
+class ImportFormatError(ValueError):
+    """Raised when the upload format cannot be determined"""
+
+def detect_format(filename: str, requested: str = None) -> str:
+    """Pick csv or ndjson from an explicit choice or the file extension"""
+    if requested:
+        fmt = requested.lower()
+    else:
+        fmt = (filename or "").rsplit(".", 1)[-1].lower()
+        fmt = "ndjson" if fmt in ("ndjson", "jsonl") else fmt
+    if fmt not in ("csv", "ndjson"):
+        raise ImportFormatError("Upload must be CSV or NDJSON")
+    return fmt
+
+def _iter_csv(text: io.TextIOBase) -> Iterator[Tuple[int, object]]:
+    reader = csv.DictReader(text)
+    for record in reader:
+        # Header is line 1; empty cells mean "not provided"
+        yield reader.line_num, {k: v for k, v in record.items() if k and v not in ("", None)}
+
+def _iter_ndjson(text: io.TextIOBase) -> Iterator[Tuple[int, object]]:
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_no, exc
+
+def iter_rows(stream: BinaryIO, fmt: str) -> Iterator[Tuple[int, object]]:
+    """Stream (line number, raw record) pairs without reading the whole upload"""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        yield from (_iter_csv(text) if fmt == "csv" else _iter_ndjson(text))
+    finally:
+        text.detach()
+
+def _supplied(row: ProductImportRow, fields: list) -> dict:
+    """Values the row actually provides for `fields`; blank values count as missing"""
+    return {
+        field: getattr(row, field) for field in fields
+        if field in row.model_fields_set and getattr(row, field) not in (None, "", [])
+    }
+
+def _merge(records: dict, key: str, row: ProductImportRow, fields: list, new_values) -> None:
+    """Fold a row into records[key] = (insert values, columns to update).
+
+    Later rows for the same key only override the fields they supply, and only
+    supplied fields are updated on an existing record. `new_values` builds the
+    insert values used when the key is new.
+    """
+    supplied = _supplied(row, fields)
+    if key not in records:
+        # A new record starts from the schema defaults for fields the row leaves out
+        defaults = {field: getattr(row, field) for field in fields if field not in row.model_fields_set}
+        records[key] = ({**new_values(), **dict.fromkeys(fields), **defaults}, set())
+    values, columns = records[key]
+    values.update(supplied)
+    columns.update(supplied)
+
+def _upsert_supplied(db: Session, model, records: list, always: list) -> None:
+    """Upsert records that supply different columns, one statement per column set"""
+    groups = defaultdict(list)
+    for values, columns in records:
+        groups[tuple(sorted(columns))].append(values)
+    for columns, rows in groups.items():
+        upsert(db, model, rows, list(columns) + always)
+
+def _write_batch(db: Session, rows: list) -> Tuple[int, int, dict]:
+    """Upsert products by slug and variants by sku, merging rows that share a key.
+    
+    Returns the product and variant counts plus the change event payload.
+    """
+    now = datetime.utcnow()
+    products = {}
+    for _, row in rows:
+        _merge(products, row.slug, row, PRODUCT_FIELDS, lambda: {
+            "id": str(uuid.uuid4()), "slug": row.slug, "created_at": now, "updated_at": now,
+        })
+    # Categories products are moving out of also need their facets refreshed
+    old_categories = set(db.execute(
+        select(Product.category_id).distinct().where(Product.slug.in_(products))
+    ).scalars())
+    _upsert_supplied(db, Product, list(products.values()), ["updated_at"])
+
+    product_ids = dict(
+        db.execute(select(Product.slug, Product.id).where(Product.slug.in_(products))).all()
+    )
+
+    variants = {}
+    for _, row in rows:
+        if row.sku:
+            _merge(variants, row.sku, row, VARIANT_FIELDS, lambda: {"sku": row.sku})
+            variants[row.sku][0]["product_id"] = product_ids[row.slug]
+    _upsert_supplied(db, ProductVariant, list(variants.values()), ["product_id"])
+    catalog.products_changed(db, product_ids.values())
+
+    new_categories = {values["category_id"] for values, columns in products.values() if "category_id" in columns}
+    change = {
+        "product_ids": list(product_ids.values()),
+        "category_ids": sorted((old_categories | new_categories) - {None}),
+    }
+    return len(products), len(variants), change
+
+def import_catalog(db: Session, stream: BinaryIO, fmt: str, batch_size: int) -> dict:
+    """Import a catalog upload in chunks, committing after every batch.
+
+    Invalid rows are reported and skipped. If a batch fails in the database it is
+    retried row by row so a single bad row doesn't sink its neighbours.
+    """
+    started = time.perf_counter()
+    categories = dict(db.execute(select(Category.slug, Category.id)).all())
+
+    rows_total = rows_imported = products_upserted = variants_upserted = 0
+    error_count = 0
+    errors = []
+
+    def record_error(line: int, message: str):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"line": line, "error": message})
+
+    rows = iter_rows(stream, fmt)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        rows_total += len(batch)
+
+        valid = []
+        for line, raw in batch:
+            if isinstance(raw, Exception):
+                record_error(line, f"Invalid JSON: {raw}")
+                continue
+            try:
+                row = ProductImportRow.model_validate(raw)
+            except ValidationError as exc:
+                record_error(line, "; ".join(
+                    f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}"
+                    for err in exc.errors()
+                ))
+                continue
+            if row.category_slug and row.category_id is None:
+                if row.category_slug not in categories:
+                    record_error(line, f"Unknown category '{row.category_slug}'")
+                    continue
+                row.category_id = categories[row.category_slug]
+            valid.append((line, row))
+
+        if not valid:
+            continue
+
+        try:
+            products, variants, change = _write_batch(db, valid)
+            db.commit()
+            events.publish(events.PRODUCT_CHANGED, change)
+            rows_imported += len(valid)
+            products_upserted += products
+            variants_upserted += variants
+        except SQLAlchemyError:
+            db.rollback()
+            for line, row in valid:
+                try:
+                    products, variants, change = _write_batch(db, [(line, row)])
+                    db.commit()
+                except SQLAlchemyError as exc:
+                    db.rollback()
+                    record_error(line, str(getattr(exc, "orig", exc)))
+                    continue
+                events.publish(events.PRODUCT_CHANGED, change)
+                rows_imported += 1
+                products_upserted += products
+                variants_upserted += variants
+
+    elapsed = time.perf_counter() - started
+    return {
+        "rows_total": rows_total,
+        "rows_imported": rows_imported,
+        "products_upserted": products_upserted,
+        "variants_upserted": variants_upserted,
+        "error_count": error_count,
+        "errors": errors,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "rows_per_second": round(rows_total / elapsed, 1) if elapsed else 0.0,
+    }
@@ -0,0 +1,168 @@
+"""Append-only catalog change log read by the change feed and by feed generation.
+
+Versions come from an autoincrement key, so they are allocated when `record`
+runs, not when the transaction commits: a higher version can become visible
+while a lower one is still in flight. Readers therefore stop before the first
+missing version whose successor was written less than
+CHANGE_FEED_MAX_TRANSACTION_SECONDS ago by the database clock. A gap older than
+that belongs to a transaction that rolled back and is skipped.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.orm import Session, aliased, selectinload
+from app.config import settings
+from app.models.catalog_change import CatalogChange
+from app.models.category import Category
+from app.models.product import Product
+
+PRODUCT = "product"
+CATEGORY = "category"
+UPSERT = "upsert"
+DELETE = "delete"
+
+class ChangesExpired(Exception):
+    """`since` is older than the retained log; the consumer must resync in full"""
+
+def record(db: Session, entity: str, upserts: Iterable = (), deletes: Iterable = ()) -> None:
+    """Append changes in the caller's transaction, stamped with the database clock"""
+    rows = [
+        {"entity": entity, "entity_id": str(entity_id), "op": UPSERT}
+        for entity_id in upserts
+    ] + [
+        {"entity": entity, "entity_id": str(entity_id), "op": DELETE}
+        for entity_id in deletes
+    ]
+    if rows:
+        db.execute(CatalogChange.__table__.insert().values(changed_at=func.now()), rows)
+
+def _payloads(db: Session, entity: str, ids: List[str]) -> Dict[str, dict]:
+    from app.schemas import CategoryResponse, ProductResponse
+
+    if not ids:
+        return {}
+    if entity == PRODUCT:
+        products = db.execute(
+            select(Product).where(Product.id.in_(ids)).options(selectinload(Product.variants))
+        ).scalars()
+        return {
+            product.id: ProductResponse.model_validate(product).model_dump(mode="json", exclude={"in_wishlist"})
+            for product in products
+        }
+    categories = db.execute(select(Category).where(Category.id.in_([int(i) for i in ids]))).scalars()
+    return {
+        str(category.id): CategoryResponse.model_validate(category).model_dump(mode="json")
+        for category in categories
+    }
+
+def _db_now(db: Session) -> datetime:
+    return db.execute(select(func.now())).scalar()
+
+def _visible_below(db: Session, since: int) -> Optional[int]:
+    """First version after `since` that may have uncommitted versions before it, or None.
+
+    That is the lowest logged version whose predecessor is missing and which was
+    written within CHANGE_FEED_MAX_TRANSACTION_SECONDS; every version below it
+    is either committed or rolled back for good.
+    """
+    previous = aliased(CatalogChange)
+    cutoff = _db_now(db) - timedelta(seconds=settings.CHANGE_FEED_MAX_TRANSACTION_SECONDS)
+    return db.execute(
+        select(func.min(CatalogChange.version))
+        .select_from(CatalogChange)
+        .outerjoin(previous, previous.version == CatalogChange.version - 1)
+        .where(
+            CatalogChange.version > since + 1,
+            CatalogChange.changed_at > cutoff,
+            previous.version.is_(None),
+        )
+    ).scalar()
+
+def _visible(db: Session, since: int):
+    """Filter for the versions after `since` a reader may consume"""
+    below = _visible_below(db, since)
+    if below is None:
+        return CatalogChange.version > since
+    return and_(CatalogChange.version > since, CatalogChange.version < below)
+
+def _check_retained(db: Session, since: int) -> None:
+    oldest = db.execute(select(func.min(CatalogChange.version))).scalar()
+    if oldest is not None and since < oldest - 1:
+        raise ChangesExpired()
+
+def changes_since(db: Session, since: int, limit: int) -> dict:
+    """One page of collapsed changes after version `since`.
+
+    The page ends before any version that may still be committing (see the
+    module docstring), so a consumer at the head never skips a slow commit.
+    """
+    _check_retained(db, since)
+    rows: List[Tuple[int, str, str, str]] = db.execute(
+        select(CatalogChange.version, CatalogChange.entity, CatalogChange.entity_id, CatalogChange.op)
+        .where(_visible(db, since))
+        .order_by(CatalogChange.version)
+        .limit(limit)
+    ).all()
+
+    # Collapse repeats: the last change per entity in this page wins
+    latest: Dict[Tuple[str, str], Tuple[int, str]] = {}
+    for version, entity, entity_id, op in rows:
+        latest.pop((entity, entity_id), None)
+        latest[(entity, entity_id)] = (version, op)
+
+    upserted = {PRODUCT: [], CATEGORY: []}
+    for (entity, entity_id), (_, op) in latest.items():
+        if op == UPSERT:
+            upserted[entity].append(entity_id)
+    payloads = {entity: _payloads(db, entity, ids) for entity, ids in upserted.items()}
+
+    changes = []
+    for (entity, entity_id), (version, op) in latest.items():
+        data: Optional[dict] = None
+        if op == UPSERT:
+            data = payloads[entity].get(entity_id)
+            if data is None:
+                # Deleted after this change was logged; a later tombstone follows
+                op = DELETE
+        changes.append({"version": version, "entity": entity, "id": entity_id, "op": op, "data": data})
+
+    return {
+        "changes": changes,
+        "next_since": rows[-1][0] if rows else since,
+        "has_more": len(rows) == limit,
+    }
+
+def changed_ids(db: Session, since: int) -> Tuple[Dict[str, Set[str]], int]:
+    """Ids per entity changed after `since` and the version they run up to.
+
+    For consumers that regenerate derived data themselves; stops before the same
+    in-flight versions as `changes_since`.
+    """
+    _check_retained(db, since)
+    ids: Dict[str, Set[str]] = {PRODUCT: set(), CATEGORY: set()}
+    version = since
+    for entity, entity_id, last in db.execute(
+        select(CatalogChange.entity, CatalogChange.entity_id, func.max(CatalogChange.version))
+        .where(_visible(db, since))
+        .group_by(CatalogChange.entity, CatalogChange.entity_id)
+    ):
+        ids[entity].add(entity_id)
+        version = max(version, last)
+    return ids, version
+
+def latest_version(db: Session, settled: bool = False) -> int:
+    """Newest logged version; with `settled`, the newest one no in-flight version precedes"""
+    query = select(func.max(CatalogChange.version))
+    if settled:
+        query = query.where(_visible(db, 0))
+    return db.execute(query).scalar() or 0
+
+def prune(db: Session, older_than_days: int) -> int:
+    """Drop log entries older than the retention window, always keeping the newest one"""
+    cutoff = _db_now(db) - timedelta(days=older_than_days)
+    newest = latest_version(db)
+    result = db.execute(
+        delete(CatalogChange).where(CatalogChange.changed_at < cutoff, CatalogChange.version < newest)
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import threading
+from typing import Dict, Iterable, List, Set
+from sqlalchemy import case, delete, distinct, func, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app import events
+from app.config import settings
+from app.database import SessionLocal, get_engine
+from app.models.category import Category
+from app.models.facet import CategoryFacet
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+
+ALL_CATEGORIES = 0
+UNCATEGORIZED = -1  # Products without a category; only feeds the ALL_CATEGORIES sums
+IN_STOCK = "in_stock"
+
+logger = logging.getLogger(__name__)
+
+def price_band_labels(bands: List[int]) -> List[str]:
+    edges = [0] + list(bands)
+    labels = [f"{low}-{high}" for low, high in zip(edges, edges[1:])]
+    return labels + [f"{edges[-1]}+"]
+
+def _price_band(bands: List[int]):
+    labels = price_band_labels(bands)
+    return case(
+        *((Product.base_price < high, labels[i]) for i, high in enumerate(bands)),
+        else_=labels[-1],
+    )
+
+def _count_rows(db: Session, category_id: int) -> List[dict]:
+    """Facet counts for one category, each the number of active products the matching
+    `GET /api/products` filter returns: size and color over every variant (the filter
+    ignores stock unless `in_stock=true`), availability over variants in stock."""
+    scope = [Product.is_active == True]  # noqa: E712
+    if category_id == UNCATEGORIZED:
+        scope.append(Product.category_id.is_(None))
+    else:
+        scope.append(Product.category_id == category_id)
+    products = func.count(distinct(Product.id))
+
+    rows = []
+    for facet, column in (("size", ProductVariant.size), ("color", ProductVariant.color)):
+        for value, count in db.execute(
+            select(column, products).join(ProductVariant, ProductVariant.product_id == Product.id)
+            .where(*scope).group_by(column)
+        ):
+            rows.append({"facet": facet, "value": value, "product_count": count})
+
+    band = _price_band(settings.FACET_PRICE_BANDS)
+    for value, count in db.execute(select(band, func.count()).where(*scope).group_by(band)):
+        rows.append({"facet": "price", "value": value, "product_count": count})
+
+    available = db.execute(
+        select(products).join(ProductVariant, ProductVariant.product_id == Product.id)
+        .where(*scope, ProductVariant.stock_quantity > 0)
+    ).scalar()
+    rows.append({"facet": "availability", "value": IN_STOCK, "product_count": available or 0})
+
+    for row in rows:
+        row["category_id"] = category_id
+    return rows
+
+def _derive_all(db: Session) -> None:
+    """Rewrite the ALL_CATEGORIES rows as sums of the per-category rows.
+
+    A product sits in exactly one category (or UNCATEGORIZED), so the sums are
+    exact and cost a scan of the facet table rather than of the catalog.
+    """
+    table = CategoryFacet.__table__
+    db.execute(delete(table).where(table.c.category_id == ALL_CATEGORIES))
+    rows = [
+        {"category_id": ALL_CATEGORIES, "facet": facet, "value": value, "product_count": int(count)}
+        for facet, value, count in db.execute(
+            select(table.c.facet, table.c.value, func.sum(table.c.product_count))
+            .where(table.c.category_id != ALL_CATEGORIES)
+            .group_by(table.c.facet, table.c.value)
+        )
+    ]
+    if rows:
+        db.execute(table.insert(), rows)
+
+def refresh(db: Session, category_ids: Iterable[int]) -> None:
+    """Recompute the facet rows of the given categories, then the whole-catalog sums, in one transaction"""
+    for category_id in category_ids:
+        if category_id == ALL_CATEGORIES:
+            continue
+        db.execute(delete(CategoryFacet).where(CategoryFacet.category_id == category_id))
+        rows = _count_rows(db, category_id)
+        if rows:
+            db.execute(CategoryFacet.__table__.insert(), rows)
+    _derive_all(db)
+    db.commit()
+
+def rebuild_all(db: Session) -> int:
+    category_ids = [UNCATEGORIZED] + list(db.execute(select(Category.id)).scalars())
+    # Rows of categories that no longer exist would otherwise linger in the sums
+    db.execute(delete(CategoryFacet).where(CategoryFacet.category_id.notin_(category_ids)))
+    refresh(db, category_ids)
+    return len(category_ids)
+
+def get_facets(db: Session, category_id: int) -> Dict[str, List[dict]]:
+    """Facet counts for a listing page, read straight from the precomputed table"""
+    facets: Dict[str, List[dict]] = {"size": [], "color": [], "price": [], "availability": []}
+    for facet, value, count in db.execute(
+        select(CategoryFacet.facet, CategoryFacet.value, CategoryFacet.product_count)
+        .where(CategoryFacet.category_id == category_id, CategoryFacet.product_count > 0)
+    ):
+        facets.setdefault(facet, []).append({"value": value, "count": count})
+    order = price_band_labels(settings.FACET_PRICE_BANDS)
+    facets["price"].sort(key=lambda item: order.index(item["value"]) if item["value"] in order else len(order))
+    for facet in ("size", "color"):
+        facets[facet].sort(key=lambda item: item["value"])
+    return facets
+
+class FacetIndexer:
+    """Collects categories touched by product and stock writes and refreshes them in the background.
+
+    Writes only mark categories dirty; the counts are recomputed at most once
+    per FACET_REFRESH_INTERVAL_SECONDS, so a burst of checkouts costs one refresh.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._products: Set[str] = set()
+        self._categories: Set[int] = set()
+        self._stopping = asyncio.Event()
+
+    def mark(self, payload: dict) -> None:
+        with self._lock:
+            self._products.update(payload.get("product_ids") or ())
+            self._categories.update(
+                UNCATEGORIZED if c is None else c for c in payload.get("category_ids") or ()
+            )
+
+    def _flush(self) -> int:
+        with self._lock:
+            products, categories = self._products, self._categories
+            self._products, self._categories = set(), set()
+        if not products and not categories:
+            return 0
+
+        db = SessionLocal()
+        try:
+            for start in range(0, len(products), 1000):
+                chunk = list(products)[start:start + 1000]
+                categories.update(
+                    UNCATEGORIZED if c is None else c for c in db.execute(
+                        select(Product.category_id).distinct().where(Product.id.in_(chunk))
+                    ).scalars()
+                )
+            refresh(db, sorted(categories))
+        except Exception:
+            db.rollback()
+            # Put the work back so the next tick retries it
+            with self._lock:
+                self._products.update(products)
+                self._categories.update(categories)
+            raise
+        finally:
+            db.close()
+        return len(categories)
+
+    async def run(self) -> None:
+        get_engine()
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), settings.FACET_REFRESH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await run_in_threadpool(self._flush)
+            except Exception:
+                logger.exception("Facet refresh failed")
+
+    async def stop(self) -> None:
+        self._stopping.set()
+
+indexer = FacetIndexer()
+events.subscribe(events.PRODUCT_CHANGED, indexer.mark)
+events.subscribe(events.STOCK_CHANGED, indexer.mark)
@@ -0,0 +1,356 @@
+"""Product feed (Google Merchant / Meta RSS) and sitemap generation.
+
+Active products are read in id order, in keyset pages of STREAM_BATCH_SIZE, and
+written into numbered chunks, each a gzipped sitemap plus a gzipped feed:
+
+    sitemap.xml                      sitemap index pointing at every chunk
+    sitemap-products-0001.xml.gz     one <url> per product
+    feed-products-0001.xml.gz        one <item> per variant (g: namespace)
+    manifest.json                    chunk boundaries and change log version
+
+A chunk covers a fixed id range, so an incremental run only rewrites the chunks
+holding products changed since the manifest's version.
+"""
+import gzip
+import json
+import logging
+import os
+import tempfile
+import time
+from bisect import bisect_left
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+from sqlalchemy import Row, select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.category import Category
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.services import changelog
+
+logger = logging.getLogger(__name__)
+
+# sitemaps.org protocol limits per sitemap file
+SITEMAP_MAX_URLS = 50_000
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024  # uncompressed
+MAX_ADDITIONAL_IMAGES = 10
+STREAM_BATCH_SIZE = 500
+
+MANIFEST = "manifest.json"
+SITEMAP_INDEX = "sitemap.xml"
+
+SITEMAP_HEADER = b'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+SITEMAP_FOOTER = b"</urlset>\n"
+FEED_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<rss version="2.0" xmlns:g="http://base.google.com/ns/1.0">\n<channel>\n'
+    "<title>{title}</title>\n<link>{link}</link>\n<description>{title} product feed</description>\n"
+)
+FEED_FOOTER = b"</channel>\n</rss>\n"
+
+class _ChunkOverflow(Exception):
+    """A rewritten chunk no longer fits the protocol limits"""
+
+class _GzipOutput:
+    """Gzipped file written next to its final path and renamed into place on commit"""
+
+    def __init__(self, directory: str, name: str):
+        self.path = os.path.join(directory, name)
+        fd, self._tmp_path = tempfile.mkstemp(dir=directory, prefix=".feed-", suffix=".tmp")
+        self._raw = os.fdopen(fd, "wb")
+        # mtime=0 keeps unchanged chunks byte-identical between runs
+        self._gzip = gzip.GzipFile(fileobj=self._raw, mode="wb", mtime=0)
+        self.bytes = 0
+
+    def write(self, data: bytes) -> None:
+        self._gzip.write(data)
+        self.bytes += len(data)
+
+    def commit(self) -> None:
+        self._gzip.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        self._gzip.close()
+        self._raw.close()
+        os.unlink(self._tmp_path)
+
+def _chunk_names(number: int) -> Dict[str, str]:
+    return {
+        "sitemap": f"sitemap-products-{number:04d}.xml.gz",
+        "feed": f"feed-products-{number:04d}.xml.gz",
+    }
+
+def _tag(name: str, value) -> str:
+    return f"<{name}>{escape(str(value))}</{name}>"
+
+def _product_url(product: Row) -> str:
+    return settings.FEED_PRODUCT_URL.format(slug=product.slug)
+
+def _sitemap_entry(product: Row) -> bytes:
+    lastmod = (product.updated_at or product.created_at or datetime.utcnow()).strftime("%Y-%m-%d")
+    return f"<url>{_tag('loc', _product_url(product))}{_tag('lastmod', lastmod)}</url>\n".encode()
+
+def _feed_entries(product: Row, variants: List[Row], categories: Dict[int, str]) -> bytes:
+    url = _product_url(product)
+    product_images = [image for variant in variants for image in (variant.images or [])]
+    entries = []
+    for variant in variants:
+        images = list(dict.fromkeys((variant.images or []) + product_images))
+        # Same unit price checkout charges, so the feed never disagrees with the landing page
+        price = Decimal(variant.price_override or product.base_price).quantize(Decimal("0.01"))
+        fields = [
+            _tag("g:id", variant.sku),
+            _tag("g:item_group_id", product.id),
+            _tag("g:title", product.name),
+            _tag("g:description", product.description or product.name),
+            _tag("g:link", url),
+            _tag("g:price", f"{price} {settings.FEED_CURRENCY}"),
+            _tag("g:availability", "in_stock" if variant.stock_quantity > 0 else "out_of_stock"),
+            _tag("g:condition", "new"),
+            _tag("g:brand", settings.FEED_BRAND),
+            _tag("g:size", variant.size),
+            _tag("g:color", variant.color),
+        ]
+        if images:
+            fields.append(_tag("g:image_link", images[0]))
+            fields.extend(_tag("g:additional_image_link", image) for image in images[1:1 + MAX_ADDITIONAL_IMAGES])
+        if product.category_id in categories:
+            fields.append(_tag("g:product_type", categories[product.category_id]))
+        entries.append("<item>" + "".join(fields) + "</item>\n")
+    return "".join(entries).encode()
+
+class _Chunk:
+    def __init__(self, directory: str, number: int):
+        self.number = number
+        self.names = _chunk_names(number)
+        self.products = 0
+        self.items = 0
+        self.last_id: Optional[str] = None
+        self._sitemap = _GzipOutput(directory, self.names["sitemap"])
+        self._feed = _GzipOutput(directory, self.names["feed"])
+        self._sitemap.write(SITEMAP_HEADER)
+        self._feed.write(FEED_HEADER.format(
+            title=escape(settings.FEED_BRAND), link=escape(settings.FRONTEND_URL)
+        ).encode())
+
+    def add(self, product: Row, variants: List[Row], categories: Dict[int, str]) -> bool:
+        """Append a product; False (and nothing written) when the chunk is full"""
+        url = _sitemap_entry(product)
+        if self.products and (
+            self.products >= settings.FEED_CHUNK_PRODUCTS
+            or self.products + 1 > SITEMAP_MAX_URLS
+            or self._sitemap.bytes + len(url) + len(SITEMAP_FOOTER) > SITEMAP_MAX_BYTES
+        ):
+            return False
+        self._sitemap.write(url)
+        self._feed.write(_feed_entries(product, variants, categories))
+        self.products += 1
+        self.items += len(variants)
+        self.last_id = product.id
+        return True
+
+    def commit(self) -> dict:
+        self._sitemap.write(SITEMAP_FOOTER)
+        self._feed.write(FEED_FOOTER)
+        self._sitemap.commit()
+        self._feed.commit()
+        return {
+            "number": self.number,
+            "last_id": self.last_id,
+            "products": self.products,
+            "items": self.items,
+            **self.names,
+            "generated_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        }
+
+    def abort(self) -> None:
+        self._sitemap.abort()
+        self._feed.abort()
+
+def _products(db: Session, after: Optional[str] = None, upto: Optional[str] = None
+              ) -> Iterator[Tuple[Row, List[Row]]]:
+    """Active products with their variants in id order, `after` < id <= `upto`.
+
+    Read in keyset pages of STREAM_BATCH_SIZE products, one products query and one
+    variants query each: the MySQL driver buffers whole result sets, so paging is
+    what keeps the catalog out of memory.
+    """
+    products = Product.__table__
+    variants = ProductVariant.__table__
+    while True:
+        query = (
+            select(
+                products.c.id, products.c.slug, products.c.name, products.c.description,
+                products.c.base_price, products.c.category_id, products.c.created_at, products.c.updated_at,
+            )
+            .where(products.c.is_active == True)
+            .order_by(products.c.id)
+            .limit(STREAM_BATCH_SIZE)
+        )
+        if after is not None:
+            query = query.where(products.c.id > after)
+        if upto is not None:
+            query = query.where(products.c.id <= upto)
+        page = db.execute(query).all()
+        if not page:
+            return
+
+        grouped: Dict[str, List[Row]] = {}
+        for variant in db.execute(
+            select(
+                variants.c.product_id, variants.c.id, variants.c.sku, variants.c.size, variants.c.color,
+                variants.c.stock_quantity, variants.c.price_override, variants.c.images,
+            )
+            .where(variants.c.product_id.in_([product.id for product in page]))
+            .order_by(variants.c.product_id, variants.c.id)
+        ):
+            grouped.setdefault(variant.product_id, []).append(variant)
+        for product in page:
+            yield product, grouped.get(product.id, [])
+
+        if len(page) < STREAM_BATCH_SIZE:
+            return
+        after = page[-1].id
+
+def _categories(db: Session) -> Dict[int, str]:
+    return dict(db.execute(select(Category.id, Category.name)).all())
+
+def _load_manifest(directory: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(directory, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_atomic(directory: str, name: str, data: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".feed-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(directory, name))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def _sitemap_index(chunks: List[dict]) -> bytes:
+    base = settings.FEED_FILES_URL.rstrip("/")
+    entries = "".join(
+        f"<sitemap>{_tag('loc', base + '/' + chunk['sitemap'])}{_tag('lastmod', chunk['generated_at'])}</sitemap>\n"
+        for chunk in chunks
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        f"{entries}</sitemapindex>\n"
+    ).encode()
+
+def _generate_full(db: Session, directory: str, categories: Dict[int, str]) -> List[dict]:
+    chunks: List[dict] = []
+    chunk = _Chunk(directory, 1)
+    try:
+        for product, variants in _products(db):
+            if not chunk.add(product, variants, categories):
+                chunks.append(chunk.commit())
+                chunk = _Chunk(directory, len(chunks) + 1)
+                chunk.add(product, variants, categories)
+    except BaseException:
+        chunk.abort()
+        raise
+    chunks.append(chunk.commit())
+
+    # Chunks left over from a larger catalog
+    number = len(chunks) + 1
+    while True:
+        stale = [os.path.join(directory, name) for name in _chunk_names(number).values()]
+        if not any(os.path.exists(path) for path in stale):
+            break
+        for path in stale:
+            if os.path.exists(path):
+                os.unlink(path)
+        number += 1
+    return chunks
+
+def _rewrite_chunk(db: Session, directory: str, chunks: List[dict], index: int, categories: Dict[int, str]) -> dict:
+    after = chunks[index - 1]["last_id"] if index else None
+    upto = chunks[index]["last_id"] if index < len(chunks) - 1 else None
+    chunk = _Chunk(directory, index + 1)
+    try:
+        for product, variants in _products(db, after, upto):
+            if not chunk.add(product, variants, categories):
+                raise _ChunkOverflow()
+    except BaseException:
+        chunk.abort()
+        raise
+    # Keep the boundary even if its product is gone, so neighbouring ranges don't shift
+    written = chunk.commit()
+    if index < len(chunks) - 1:
+        written["last_id"] = chunks[index]["last_id"]
+    return written
+
+def generate(db: Session, directory: Optional[str] = None, full: bool = False) -> dict:
+    """Bring the feeds and sitemaps in `directory` up to date.
+
+    Falls back to a full run when there is no manifest, the change log no longer
+    covers its version, categories changed (they appear in every item) or a
+    rewritten chunk outgrew the limits.
+    """
+    started = time.perf_counter()
+    directory = directory or settings.FEED_OUTPUT_DIR
+    os.makedirs(directory, exist_ok=True)
+    categories = _categories(db)
+    manifest = None if full else _load_manifest(directory)
+
+    rewritten: Optional[List[int]] = None
+    if manifest is not None:
+        try:
+            changed, version = changelog.changed_ids(db, manifest["version"])
+        except changelog.ChangesExpired:
+            changed = None
+        if changed is not None and not changed[changelog.CATEGORY]:
+            chunks = manifest["chunks"]
+            bounds = [chunk["last_id"] for chunk in chunks[:-1]]
+            indexes = sorted({bisect_left(bounds, product_id) for product_id in changed[changelog.PRODUCT]})
+            try:
+                for index in indexes:
+                    chunks[index] = _rewrite_chunk(db, directory, chunks, index, categories)
+                rewritten = [index + 1 for index in indexes]
+            except _ChunkOverflow:
+                logger.info("A feed chunk outgrew its limits; regenerating every chunk")
+
+    if rewritten is None:
+        # Taken before streaming, so changes made during the run are picked up next time
+        version = changelog.latest_version(db, settled=True)
+        chunks = _generate_full(db, directory, categories)
+        rewritten = [chunk["number"] for chunk in chunks]
+
+    if rewritten or manifest is None or version != manifest["version"]:
+        _write_atomic(directory, SITEMAP_INDEX, _sitemap_index(chunks))
+        _write_atomic(directory, MANIFEST, json.dumps({
+            "version": version,
+            "generated_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "chunks": chunks,
+        }, indent=2).encode())
+
+    return {
+        "version": version,
+        "chunks": len(chunks),
+        "rewritten": rewritten,
+        "products": sum(chunk["products"] for chunk in chunks),
+        "items": sum(chunk["items"] for chunk in chunks),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+def is_feed_file(name: str) -> bool:
+    """Names the feed directory may serve: the sitemap index and chunk files"""
+    if name == SITEMAP_INDEX:
+        return True
+    prefix, _, rest = name.partition("-products-")
+    return prefix in ("sitemap", "feed") and len(rest) == 11 and rest[:4].isdigit() and rest[4:] == ".xml.gz"
@@ -0,0 +1,86 @@
+import time
+from typing import Iterable, List, Tuple
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+from app import events
+from app.services import catalog
+from app.models.product_variant import ProductVariant
+
+MAX_REPORTED_UNKNOWN = 500
+
+def _chunks(items: list, size: int) -> Iterable[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def sync_stock(db: Session, items: List[Tuple[str, int]], mode: str, chunk_size: int) -> dict:
+    """Apply a warehouse stock feed in one transaction, writing only rows that change.
+    
+    `mode` is "absolute" (quantity is the new stock level) or "delta" (quantity is
+    added to the current level, floored at zero). SKUs are mapped to ids, current
+    stock is then read per chunk with row locks taken in id order (like checkout),
+    the diff is computed in memory and the changed rows are written with batched
+    executemany updates.
+    """
+    started = time.perf_counter()
+    
+    # Collapse repeated SKUs: the last absolute value wins, deltas accumulate
+    wanted = {}
+    for sku, quantity in items:
+        if mode == "delta":
+            wanted[sku] = wanted.get(sku, 0) + quantity
+        else:
+            wanted[sku] = quantity
+    
+    variants = ProductVariant.__table__
+    found = set()
+    changes = []
+    product_ids = set()
+    
+    ids = []
+    for chunk in _chunks(list(wanted), chunk_size):
+        ids.extend(db.execute(select(variants.c.id).where(variants.c.sku.in_(chunk))).scalars())
+    ids.sort()
+
+    for chunk in _chunks(ids, chunk_size):
+        current = db.execute(
+            select(variants.c.id, variants.c.product_id, variants.c.sku, variants.c.stock_quantity)
+            .where(variants.c.id.in_(chunk))
+            .order_by(variants.c.id)
+            .with_for_update()
+        ).all()
+        for variant_id, product_id, sku, stock in current:
+            found.add(sku)
+            if mode == "delta":
+                new_stock = max(stock + wanted[sku], 0)
+            else:
+                new_stock = wanted[sku]
+            if new_stock != stock:
+                changes.append({"b_id": variant_id, "b_stock": new_stock})
+                product_ids.add(product_id)
+    
+    stmt = (
+        update(variants)
+        .where(variants.c.id == bindparam("b_id"))
+        .values(stock_quantity=bindparam("b_stock"))
+    )
+    for chunk in _chunks(changes, chunk_size):
+        db.execute(stmt, chunk)
+    catalog.stock_changed(db, product_ids)
+    
+    db.commit()
+    
+    if changes:
+        events.publish(events.STOCK_CHANGED, {
+            "variant_ids": [change["b_id"] for change in changes],
+            "product_ids": sorted(product_ids),
+        })
+    
+    unknown = [sku for sku in wanted if sku not in found]
+    return {
+        "received": len(items),
+        "checked": len(found),
+        "changed": len(changes),
+        "unknown_count": len(unknown),
+        "unknown_skus": unknown[:MAX_REPORTED_UNKNOWN],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
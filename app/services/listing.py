@@ -0,0 +1,113 @@
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import delete, exists, func, select, update
+from sqlalchemy.orm import Session, selectinload
+from app.models.category import Category
+from app.models.listing import ProductListing
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+
+# Category trees are shallow; the cap only guards against a parent cycle
+MAX_CATEGORY_DEPTH = 10
+MAX_SWATCHES = 12
+
+def _category_paths(db: Session) -> Dict[int, str]:
+    categories: Dict[int, Tuple[str, Optional[int]]] = {
+        category_id: (name, parent_id)
+        for category_id, name, parent_id in db.execute(
+            select(Category.id, Category.name, Category.parent_id)
+        )
+    }
+    paths = {}
+    for category_id in categories:
+        names = []
+        current = category_id
+        while current in categories and len(names) < MAX_CATEGORY_DEPTH:
+            name, current = categories[current]
+            names.append(name)
+        paths[category_id] = " / ".join(reversed(names))
+    return paths
+
+def _listing_row(product: Product, paths: Dict[int, str]) -> dict:
+    variants = sorted(product.variants, key=lambda variant: variant.id)
+    prices = [variant.price_override or product.base_price for variant in variants]
+    image_url = next((variant.images[0] for variant in variants if variant.images), None)
+    swatches = list(dict.fromkeys(variant.color for variant in variants))[:MAX_SWATCHES]
+    return {
+        "product_id": product.id,
+        "category_id": product.category_id,
+        "name": product.name,
+        "slug": product.slug,
+        "min_price": min(prices) if prices else product.base_price,
+        "discount_percentage": product.discount_percentage or 0,
+        "total_stock": sum(variant.stock_quantity for variant in variants),
+        "image_url": image_url,
+        "category_path": paths.get(product.category_id),
+        "color_swatches": ",".join(swatches),
+        "is_active": product.is_active,
+        "created_at": product.created_at,
+    }
+
+def refresh(db: Session, product_ids: Iterable[str], paths: Optional[Dict[int, str]] = None) -> Set[str]:
+    """Rewrite the listing rows of the given products inside the caller's transaction.
+
+    Products that no longer exist lose their row. Returns the ids that still exist.
+    """
+    product_ids = list(set(product_ids))
+    if not product_ids:
+        return set()
+    db.flush()
+    if paths is None:
+        paths = _category_paths(db)
+    products = db.execute(
+        select(Product).where(Product.id.in_(product_ids))
+        .options(selectinload(Product.variants))
+        .execution_options(populate_existing=True)
+    ).scalars().all()
+
+    db.execute(delete(ProductListing).where(ProductListing.product_id.in_(product_ids)))
+    if products:
+        db.execute(ProductListing.__table__.insert(), [_listing_row(p, paths) for p in products])
+    return {product.id for product in products}
+
+def refresh_stock(db: Session, product_ids: Iterable[str]) -> None:
+    """Recompute only total_stock, for write paths that just move stock"""
+    product_ids = list(set(product_ids))
+    if not product_ids:
+        return
+    db.flush()
+    listing = ProductListing.__table__
+    variants = ProductVariant.__table__
+    total = (
+        select(func.coalesce(func.sum(variants.c.stock_quantity), 0))
+        .where(variants.c.product_id == listing.c.product_id)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(listing).where(listing.c.product_id.in_(product_ids)).values(total_stock=total)
+    )
+
+def rebuild(db: Session, chunk_size: int, progress: Optional[Callable[[int], None]] = None) -> int:
+    """Rebuild the whole read model, committing per chunk of products (keyset by id)"""
+    paths = _category_paths(db)
+    done = 0
+    last_id = ""
+    while True:
+        ids: List[str] = db.execute(
+            select(Product.id).where(Product.id > last_id).order_by(Product.id).limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            break
+        refresh(db, ids, paths)
+        db.commit()
+        db.expunge_all()
+        done += len(ids)
+        last_id = ids[-1]
+        if progress:
+            progress(done)
+
+    # Rows whose product was deleted outside the app
+    db.execute(delete(ProductListing).where(
+        ~exists().where(Product.id == ProductListing.product_id)
+    ))
+    db.commit()
+    return done
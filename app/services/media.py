@@ -0,0 +1,206 @@
+"""Admin image uploads: content-addressed originals plus resized WebP/AVIF derivatives.
+
+Files live under MEDIA_ROOT and are served at MEDIA_URL:
+
+    originals/ab/<sha256>.jpg
+    derived/ab/<sha256>-w640.webp
+
+Every derivative follows the `-w<width>.<format>` pattern, so a client can build
+a srcset from the one URL stored in a variant's images. Decoding and resizing
+run on a small process pool so they never hold the event loop or the GIL.
+"""
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app import events
+from app.config import settings
+from app.database import insert_ignore
+from app.models.media import MediaAsset
+from app.models.product_variant import ProductVariant
+from app.services import catalog
+
+READ_CHUNK = 1024 * 1024
+ACCEPTED_FORMATS = {"JPEG": ("jpg", "image/jpeg"), "PNG": ("png", "image/png"), "WEBP": ("webp", "image/webp")}
+SAVE_OPTIONS = {"webp": {"method": 4}, "avif": {"speed": 6}}
+
+class MediaError(ValueError):
+    """An upload that can't be stored; carries the HTTP status the route should return"""
+
+    def __init__(self, detail: str, status_code: int = 400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+    def __reduce__(self):
+        # Raised inside pool processes; keep the status code across pickling
+        return MediaError, (self.detail, self.status_code)
+
+def _shard(sha256: str) -> str:
+    return sha256[:2]
+
+def _url(relative: str) -> str:
+    return f"{settings.MEDIA_URL.rstrip('/')}/{relative}"
+
+def _spool(source: BinaryIO, root: str, max_bytes: int) -> Tuple[str, str]:
+    """Copy an upload to a temp file under `root`, hashing as it goes; (sha256, temp path)"""
+    directory = os.path.join(root, "tmp")
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".upload")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while chunk := source.read(READ_CHUNK):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise MediaError(f"Upload exceeds {max_bytes // (1024 * 1024)} MB", status_code=413)
+                digest.update(chunk)
+                f.write(chunk)
+        if not size:
+            raise MediaError("Empty upload")
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return digest.hexdigest(), tmp_path
+
+def _render(tmp_path: str, root: str, sha256: str, widths: List[int], formats: List[str], quality: int) -> dict:
+    """Validate the upload, move it into place and write every derivative (runs in a pool process)"""
+    from PIL import Image, ImageOps, features
+
+    try:
+        with Image.open(tmp_path) as probe:
+            probe.verify()
+        image = Image.open(tmp_path)
+        image.load()
+    except Exception as exc:
+        raise MediaError(f"Not a readable image: {exc}")
+    if image.format not in ACCEPTED_FORMATS:
+        raise MediaError(f"Unsupported image format {image.format}; use JPEG, PNG or WebP", status_code=415)
+    extension, content_type = ACCEPTED_FORMATS[image.format]
+
+    # Bake in the EXIF orientation; derivatives carry no metadata
+    image = ImageOps.exif_transpose(image)
+    image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+    width, height = image.size
+
+    formats = [name for name in formats if name != "avif" or features.check("avif")]
+    # Never upscale; an image narrower than every width gets one derivative at its own size
+    targets = sorted({target for target in widths if target < width} | ({width} if width <= max(widths) else set()))
+
+    shard = _shard(sha256)
+    derived_dir = os.path.join(root, "derived", shard)
+    os.makedirs(derived_dir, exist_ok=True)
+    derivatives = []
+    for target in targets:
+        resized = image if target == width else image.resize(
+            (target, max(1, round(height * target / width))), Image.LANCZOS
+        )
+        for name in formats:
+            relative = f"derived/{shard}/{sha256}-w{target}.{name}"
+            fd, part = tempfile.mkstemp(dir=derived_dir, suffix=".part")
+            with os.fdopen(fd, "wb") as f:
+                resized.save(f, format=name.upper(), quality=quality, **SAVE_OPTIONS.get(name, {}))
+            os.replace(part, os.path.join(root, relative))
+            derivatives.append({"width": target, "format": name, "path": relative})
+
+    original = f"originals/{shard}/{sha256}.{extension}"
+    os.makedirs(os.path.join(root, "originals", shard), exist_ok=True)
+    os.replace(tmp_path, os.path.join(root, original))
+    return {
+        "content_type": content_type,
+        "width": width,
+        "height": height,
+        "original": original,
+        "derivatives": derivatives,
+    }
+
+_executor: Optional[ProcessPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
+
+def _pool() -> Tuple[ProcessPoolExecutor, asyncio.Semaphore]:
+    """The per-worker pool, started on first upload. Spawned rather than forked:
+    the API process has threads running."""
+    global _executor, _slots
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.MEDIA_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+        # Uploads beyond this wait here instead of queueing inside the pool
+        _slots = asyncio.Semaphore(settings.MEDIA_WORKERS * 2)
+    return _executor, _slots
+
+def shutdown() -> None:
+    global _executor, _slots
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor, _slots = None, None
+
+def _primary(derivatives: List[dict]) -> dict:
+    """WebP closest to MEDIA_PRIMARY_WIDTH without going over (the smallest one otherwise)"""
+    candidates = [item for item in derivatives if item["format"] == "webp"] or derivatives
+    fitting = [item for item in candidates if item["width"] <= settings.MEDIA_PRIMARY_WIDTH]
+    if fitting:
+        return max(fitting, key=lambda item: item["width"])
+    return min(candidates, key=lambda item: item["width"])
+
+async def ingest(db: Session, source: BinaryIO) -> Tuple[MediaAsset, bool]:
+    """Store an upload and its derivatives; (asset, True) when the same bytes were uploaded before"""
+    root = settings.MEDIA_ROOT
+    sha256, tmp_path = await run_in_threadpool(_spool, source, root, settings.MEDIA_MAX_UPLOAD_BYTES)
+    try:
+        existing = db.get(MediaAsset, sha256)
+        if existing is not None:
+            return existing, True
+
+        executor, slots = _pool()
+        async with slots:
+            rendered = await asyncio.get_running_loop().run_in_executor(
+                executor, _render, tmp_path, root, sha256,
+                settings.MEDIA_WIDTHS, settings.MEDIA_FORMATS, settings.MEDIA_QUALITY,
+            )
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+    derivatives = [
+        {"width": item["width"], "format": item["format"], "url": _url(item["path"])}
+        for item in rendered["derivatives"]
+    ]
+    # A concurrent upload of the same bytes wrote identical files; the first row wins
+    insert_ignore(db, MediaAsset, [{
+        "sha256": sha256,
+        "content_type": rendered["content_type"],
+        "size_bytes": os.path.getsize(os.path.join(root, rendered["original"])),
+        "width": rendered["width"],
+        "height": rendered["height"],
+        "original_url": _url(rendered["original"]),
+        "primary_url": _primary(derivatives)["url"],
+        "derivatives": derivatives,
+    }])
+    db.commit()
+    return db.get(MediaAsset, sha256), False
+
+def attach(db: Session, asset: MediaAsset, variant_id: int) -> List[str]:
+    """Append the asset's primary derivative to a variant's images; returns the new list"""
+    variant = db.get(ProductVariant, variant_id)
+    if variant is None:
+        raise MediaError("Variant not found", status_code=404)
+    images = list(variant.images or [])
+    if asset.primary_url in images:
+        return images
+    images.append(asset.primary_url)
+    # Reassigned, not mutated: plain JSON columns don't track in-place changes
+    variant.images = images
+    catalog.products_changed(db, [variant.product_id])
+    db.commit()
+
+    events.publish(events.PRODUCT_CHANGED, {
+        "product_ids": [variant.product_id], "category_ids": [variant.product.category_id]
+    })
+    return images
@@ -0,0 +1,150 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterator, List, Optional
+from sqlalchemy import and_, or_, select
+from app.database import SessionLocal, get_engine
+from app.models.order import Order, OrderItem, OrderStatus
+
+ORDER_COLUMNS = [
+    "id", "order_number", "user_id", "status", "payment_status", "payment_method",
+    "payment_id", "subtotal", "shipping_cost", "tax_amount", "discount_amount",
+    "total_amount", "tracking_number", "created_at", "updated_at",
+]
+ITEM_COLUMNS = [
+    "item_id", "product_variant_id", "product_name", "variant_details",
+    "quantity", "unit_price", "total_price",
+]
+
+# Rows are buffered into chunks of roughly this many bytes before being sent
+FLUSH_BYTES = 64 * 1024
+
+def _order_page(start: Optional[datetime], end: Optional[datetime], statuses: List[OrderStatus],
+                after: Optional[tuple], limit: int):
+    """Up to `limit` orders after the (created_at, id) key `after`, in export order"""
+    orders = Order.__table__
+    stmt = (
+        select(*(orders.c[name] for name in ORDER_COLUMNS))
+        .order_by(orders.c.created_at, orders.c.id)
+        .limit(limit)
+    )
+    if start:
+        stmt = stmt.where(orders.c.created_at >= start)
+    if end:
+        stmt = stmt.where(orders.c.created_at < end)
+    if statuses:
+        stmt = stmt.where(orders.c.status.in_(statuses))
+    if after is not None:
+        created_at, order_id = after
+        stmt = stmt.where(or_(
+            orders.c.created_at > created_at,
+            and_(orders.c.created_at == created_at, orders.c.id > order_id),
+        ))
+    return stmt
+
+def _items_query(order_ids: List[str]):
+    items = OrderItem.__table__
+    return (
+        select(
+            items.c.order_id,
+            items.c.id.label("item_id"),
+            items.c.product_variant_id,
+            items.c.product_name,
+            items.c.variant_details,
+            items.c.quantity,
+            items.c.unit_price,
+            items.c.total_price,
+        )
+        .where(items.c.order_id.in_(order_ids))
+        .order_by(items.c.order_id, items.c.id)
+    )
+
+def _iter_rows(start, end, statuses, batch_size: int) -> Iterator[dict]:
+    """Joined order/item rows, read in keyset pages of `batch_size` orders on a dedicated session.
+
+    The MySQL driver buffers whole result sets, so paging on (created_at, id) is
+    what keeps memory bounded; each page is one orders query and one items query.
+    """
+    get_engine()
+    db = SessionLocal()
+    try:
+        after = None
+        while True:
+            orders = db.execute(_order_page(start, end, statuses, after, batch_size)).mappings().all()
+            if not orders:
+                break
+            items = {}
+            for item in db.execute(_items_query([order["id"] for order in orders])).mappings():
+                items.setdefault(item["order_id"], []).append(item)
+            for order in orders:
+                for item in items.get(order["id"]) or [None]:
+                    row = dict(order)
+                    row.update((name, item[name] if item else None) for name in ITEM_COLUMNS)
+                    yield row
+            if len(orders) < batch_size:
+                break
+            after = (orders[-1]["created_at"], orders[-1]["id"])
+    finally:
+        db.close()
+
+def _plain(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "value"):  # enums
+        return value.value
+    return value
+
+def export_csv(start, end, statuses, batch_size: int) -> Iterator[str]:
+    """One CSV line per order item (orders without items get one line with blank item columns)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ORDER_COLUMNS + ITEM_COLUMNS)
+    # Send the header straight away so the client sees bytes before the query runs
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    
+    for row in _iter_rows(start, end, statuses, batch_size):
+        writer.writerow([_plain(row[name]) for name in ORDER_COLUMNS + ITEM_COLUMNS])
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def export_ndjson(start, end, statuses, batch_size: int) -> Iterator[str]:
+    """One JSON object per order with its items nested"""
+    chunk = []
+    size = 0
+    current = None
+    
+    def finish(order):
+        return json.dumps(order, separators=(",", ":")) + "\n"
+    
+    for row in _iter_rows(start, end, statuses, batch_size):
+        if current is None or current["id"] != row["id"]:
+            if current is not None:
+                line = finish(current)
+                chunk.append(line)
+                size += len(line)
+                if size >= FLUSH_BYTES:
+                    yield "".join(chunk)
+                    chunk, size = [], 0
+            current = {name: _plain(row[name]) for name in ORDER_COLUMNS}
+            current["items"] = []
+        if row["item_id"] is not None:
+            current["items"].append({
+                "id": row["item_id"],
+                **{name: _plain(row[name]) for name in ITEM_COLUMNS[1:]},
+            })
+    
+    if current is not None:
+        chunk.append(finish(current))
+    if chunk:
+        yield "".join(chunk)
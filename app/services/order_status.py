@@ -0,0 +1,159 @@
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app import events
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.product_variant import ProductVariant
+from app.services import catalog, outbox, rollups
+
+# Allowed order status moves. Terminal states have no way out.
+ORDER_STATUS_TRANSITIONS = {
+    OrderStatus.PENDING: {OrderStatus.CONFIRMED, OrderStatus.CANCELLED},
+    OrderStatus.CONFIRMED: {OrderStatus.PROCESSING, OrderStatus.SHIPPED, OrderStatus.CANCELLED},
+    OrderStatus.PROCESSING: {OrderStatus.SHIPPED, OrderStatus.CANCELLED},
+    OrderStatus.SHIPPED: {OrderStatus.DELIVERED},
+    OrderStatus.DELIVERED: {OrderStatus.REFUNDED},
+    OrderStatus.CANCELLED: set(),
+    OrderStatus.REFUNDED: set(),
+}
+
+MAX_REPORTED_SKIPS = 500
+
+def can_transition(current: OrderStatus, target: OrderStatus) -> bool:
+    return target in ORDER_STATUS_TRANSITIONS[current]
+
+def restore_stock(db: Session, order_ids: List[str]) -> List[str]:
+    """Put the items of cancelled orders back into stock with one aggregated UPDATE ... JOIN.
+
+    The variant rows are locked in id order first, the order checkout, bulk orders,
+    reservations and stock sync lock them in, so a cancellation can't deadlock
+    against them. Returns the ids of the products whose stock changed.
+    """
+    if not order_ids:
+        return []
+    items = OrderItem.__table__
+    variants = ProductVariant.__table__
+    locked = db.execute(
+        select(variants.c.id, variants.c.product_id)
+        .where(variants.c.id.in_(
+            select(items.c.product_variant_id).where(items.c.order_id.in_(order_ids))
+        ))
+        .order_by(variants.c.id)
+        .with_for_update()
+    ).all()
+    if not locked:
+        return []
+
+    returned = (
+        select(
+            items.c.product_variant_id.label("variant_id"),
+            func.sum(items.c.quantity).label("quantity"),
+        )
+        .where(items.c.order_id.in_(order_ids), items.c.product_variant_id.isnot(None))
+        .group_by(items.c.product_variant_id)
+        .subquery()
+    )
+    db.execute(
+        update(variants)
+        .where(variants.c.id == returned.c.variant_id)
+        .values(stock_quantity=variants.c.stock_quantity + returned.c.quantity)
+    )
+    product_ids = sorted({product_id for _, product_id in locked})
+    catalog.stock_changed(db, product_ids)
+    return product_ids
+
+def bulk_transition(
+    db: Session,
+    requests: List[Tuple[str, Optional[str]]],
+    target: OrderStatus,
+    chunk_size: int,
+) -> dict:
+    """Move many orders to `target` in one transaction with set-based statements.
+
+    `requests` holds (order_id, tracking_number) pairs. Orders that don't exist or
+    can't make the move are skipped and reported; the rest are updated per chunk
+    with a handful of statements regardless of chunk size.
+    """
+    started = time.perf_counter()
+    tracking = {}
+    for order_id, tracking_number in requests:
+        if tracking_number or order_id not in tracking:
+            tracking[order_id] = tracking_number
+
+    orders = Order.__table__
+    ids = list(tracking)
+    updated = 0
+    skipped = []
+    skip_count = 0
+    stock_products = set()
+
+    def skip(order_id: str, reason: str):
+        nonlocal skip_count
+        skip_count += 1
+        if len(skipped) < MAX_REPORTED_SKIPS:
+            skipped.append({"order_id": order_id, "reason": reason})
+
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        current: Dict[str, OrderStatus] = dict(db.execute(
+            select(orders.c.id, orders.c.status).where(orders.c.id.in_(chunk)).with_for_update()
+        ).all())
+
+        movable = []
+        for order_id in chunk:
+            status = current.get(order_id)
+            if status is None:
+                skip(order_id, "Order not found")
+            elif not can_transition(status, target):
+                skip(order_id, f"Cannot move from {status.value} to {target.value}")
+            else:
+                movable.append(order_id)
+        if not movable:
+            continue
+
+        with rollups.track_orders(db, movable):
+            db.execute(
+                update(orders).where(orders.c.id.in_(movable))
+                .values(status=target, updated_at=datetime.utcnow())
+            )
+            with_tracking = [
+                {"b_id": order_id, "b_tracking": tracking[order_id]}
+                for order_id in movable if tracking[order_id]
+            ]
+            if with_tracking:
+                db.execute(
+                    update(orders).where(orders.c.id == bindparam("b_id"))
+                    .values(tracking_number=bindparam("b_tracking")),
+                    with_tracking,
+                )
+            if target == OrderStatus.CANCELLED:
+                stock_products.update(restore_stock(db, movable))
+
+        # Notifications need full order snapshots: load the chunk eagerly in a few queries
+        loaded = db.execute(
+            select(Order).where(Order.id.in_(movable))
+            .options(
+                selectinload(Order.items).joinedload(OrderItem.variant),
+                joinedload(Order.user),
+                joinedload(Order.shipping_address),
+            )
+            .execution_options(populate_existing=True)
+        ).unique().scalars()
+        for order in loaded:
+            outbox.enqueue_order_status(db, order)
+        updated += len(movable)
+
+    db.commit()
+
+    if stock_products:
+        events.publish(events.STOCK_CHANGED, {"product_ids": sorted(stock_products)})
+
+    return {
+        "requested": len(ids),
+        "updated": updated,
+        "skipped_count": skip_count,
+        "skipped": skipped,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
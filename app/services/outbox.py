@@ -0,0 +1,164 @@
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+from app import integrations
+from app.config import settings
+from app.integrations import PermanentTransportError
+from app.models.order import Order, OrderStatus
+from app.models.outbox import OutboxMessage, OutboxStatus
+
+def enqueue(db: Session, integration: str, kind: str, payload: dict) -> OutboxMessage:
+    """Add a message to the outbox in the caller's transaction (no commit)"""
+    message = OutboxMessage(integration=integration, kind=kind, payload=payload)
+    db.add(message)
+    return message
+
+def order_payload(order: Order) -> dict:
+    """Self-contained snapshot of an order so delivery never has to re-query it"""
+    user = order.user
+    address = order.shipping_address
+    return {
+        "order_id": order.id,
+        "order_number": order.order_number,
+        "status": order.status.value if hasattr(order.status, "value") else order.status,
+        "created_at": order.created_at.strftime("%Y-%m-%d %H:%M") if order.created_at else None,
+        "subtotal": float(order.subtotal),
+        "total_amount": float(order.total_amount),
+        "tracking_number": order.tracking_number,
+        "email": user.email if user else None,
+        "first_name": user.first_name if user else None,
+        "last_name": user.last_name if user else None,
+        "phone": user.phone if user else None,
+        "shipping_address": {
+            "address_line1": address.address_line1,
+            "address_line2": address.address_line2,
+            "city": address.city,
+            "state": address.state,
+            "pincode": address.pincode,
+            "country": address.country,
+        } if address else None,
+        "items": [
+            {
+                "name": item.product_name,
+                "sku": item.variant.sku if item.variant else "",
+                "quantity": item.quantity,
+                "unit_price": float(item.unit_price),
+            }
+            for item in order.items
+        ],
+    }
+
+def enqueue_order_placed(db: Session, order: Order) -> None:
+    payload = order_payload(order)
+    enqueue(db, integrations.EMAIL, "order_confirmation", payload)
+    if payload["phone"]:
+        enqueue(db, integrations.WHATSAPP, "order_confirmation", payload)
+
+def enqueue_order_status(db: Session, order: Order) -> None:
+    """Notifications and shipment booking triggered by a status change"""
+    payload = order_payload(order)
+    if order.status == OrderStatus.CONFIRMED:
+        enqueue(db, integrations.SHIPROCKET, "create_shipment", payload)
+    elif order.status == OrderStatus.SHIPPED:
+        enqueue(db, integrations.EMAIL, "order_shipped", payload)
+        if payload["phone"]:
+            enqueue(db, integrations.WHATSAPP, "order_shipped", payload)
+    elif order.status == OrderStatus.CANCELLED:
+        enqueue(db, integrations.EMAIL, "order_cancelled", payload)
+        if payload["phone"]:
+            enqueue(db, integrations.WHATSAPP, "order_cancelled", payload)
+    else:
+        enqueue(db, integrations.EMAIL, "order_status", payload)
+
+def claim(db: Session, limit: int, lease_seconds: int, integrations: List[str]) -> List[dict]:
+    """Lease up to `limit` due messages for `integrations` to this worker.
+
+    SKIP LOCKED lets several workers poll the same table without blocking on
+    each other. Messages whose lease ran out (crashed worker) are claimed again.
+    Messages for other integrations are left pending.
+    """
+    now = datetime.utcnow()
+    table = OutboxMessage.__table__
+    ids = db.execute(
+        select(table.c.id)
+        .where(
+            table.c.integration.in_(integrations),
+            or_(
+                and_(table.c.status == OutboxStatus.PENDING, table.c.available_at <= now),
+                and_(table.c.status == OutboxStatus.PROCESSING, table.c.locked_until < now),
+            ),
+        )
+        .order_by(table.c.available_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not ids:
+        db.commit()
+        return []
+
+    db.execute(
+        update(table)
+        .where(table.c.id.in_(ids))
+        .values(
+            status=OutboxStatus.PROCESSING,
+            locked_until=now + timedelta(seconds=lease_seconds),
+            attempts=table.c.attempts + 1,
+        )
+    )
+    rows = db.execute(
+        select(table.c.id, table.c.integration, table.c.kind, table.c.payload, table.c.attempts)
+        .where(table.c.id.in_(ids))
+    ).mappings().all()
+    db.commit()
+    return [dict(row) for row in rows]
+
+def backoff_seconds(attempts: int) -> float:
+    """Exponential backoff with full jitter"""
+    ceiling = min(settings.OUTBOX_BACKOFF_MAX_SECONDS, settings.OUTBOX_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+    return random.uniform(ceiling / 2, ceiling)
+
+def record_results(db: Session, messages: List[dict], results: List[Optional[Exception]]) -> Dict[str, int]:
+    """Mark delivered messages sent, reschedule retryable failures and dead-letter the rest"""
+    now = datetime.utcnow()
+    table = OutboxMessage.__table__
+    sent = [m["id"] for m, error in zip(messages, results) if error is None]
+    counts = {"sent": len(sent), "retried": 0, "dead": 0}
+
+    if sent:
+        db.execute(
+            update(table).where(table.c.id.in_(sent))
+            .values(status=OutboxStatus.SENT, sent_at=now, locked_until=None, last_error=None)
+        )
+    for message, error in zip(messages, results):
+        if error is None:
+            continue
+        dead = (
+            isinstance(error, PermanentTransportError)
+            or message["attempts"] >= settings.OUTBOX_MAX_ATTEMPTS
+        )
+        values = {"locked_until": None, "last_error": f"{type(error).__name__}: {error}"[:1000]}
+        if dead:
+            values["status"] = OutboxStatus.DEAD
+            counts["dead"] += 1
+        else:
+            values["status"] = OutboxStatus.PENDING
+            values["available_at"] = now + timedelta(seconds=backoff_seconds(message["attempts"]))
+            counts["retried"] += 1
+        db.execute(update(table).where(table.c.id == message["id"]).values(**values))
+    db.commit()
+    return counts
+
+def requeue_dead(db: Session, ids: Optional[List[int]] = None) -> int:
+    """Give dead-lettered messages a fresh set of attempts"""
+    table = OutboxMessage.__table__
+    stmt = (
+        update(table).where(table.c.status == OutboxStatus.DEAD)
+        .values(status=OutboxStatus.PENDING, attempts=0, available_at=datetime.utcnow())
+    )
+    if ids:
+        stmt = stmt.where(table.c.id.in_(ids))
+    count = db.execute(stmt).rowcount
+    db.commit()
+    return count
@@ -0,0 +1,272 @@
+import hashlib
+import hmac
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.order import Order, OrderStatus, PaymentStatus
+from app.models.payment_event import PaymentEvent, PaymentEventStatus
+from app.services import outbox, rollups
+
+RAZORPAY = "razorpay"
+STRIPE = "stripe"
+
+class SignatureError(ValueError):
+    """Webhook signature is missing, malformed or does not match"""
+
+class EventBatchError(Exception):
+    """Applying a claimed batch failed; `event_ids` are the events it had claimed"""
+
+    def __init__(self, event_ids: List[int], cause: Exception):
+        super().__init__(f"{type(cause).__name__}: {cause}")
+        self.event_ids = event_ids
+
+def verify_razorpay(body: bytes, signature: Optional[str]) -> None:
+    secret = settings.RAZORPAY_WEBHOOK_SECRET
+    if not secret or not signature:
+        raise SignatureError("Missing Razorpay signature or secret")
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(expected, signature):
+        raise SignatureError("Invalid Razorpay signature")
+
+def verify_stripe(body: bytes, header: Optional[str]) -> None:
+    secret = settings.STRIPE_WEBHOOK_SECRET
+    if not secret or not header:
+        raise SignatureError("Missing Stripe signature or secret")
+    timestamp = None
+    signatures = []
+    for part in header.split(","):
+        key, _, value = part.strip().partition("=")
+        if key == "t":
+            timestamp = value
+        elif key == "v1":
+            signatures.append(value)
+    if not timestamp or not signatures:
+        raise SignatureError("Malformed Stripe signature header")
+    try:
+        age = abs(time.time() - int(timestamp))
+    except ValueError:
+        raise SignatureError("Malformed Stripe timestamp")
+    if age > settings.STRIPE_WEBHOOK_TOLERANCE_SECONDS:
+        raise SignatureError("Stripe signature timestamp outside tolerance")
+    expected = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    if not any(hmac.compare_digest(expected, candidate) for candidate in signatures):
+        raise SignatureError("Invalid Stripe signature")
+
+class RecentEvents:
+    """Small LRU of event ids already accepted by this process.
+
+    Gateways retry aggressively; answering repeats from memory keeps them off
+    the database. The unique (provider, event_id) key is still the real guard.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        self._ids: OrderedDict = OrderedDict()
+
+    def seen(self, key: tuple) -> bool:
+        if key in self._ids:
+            self._ids.move_to_end(key)
+            return True
+        return False
+
+    def add(self, key: tuple) -> None:
+        self._ids[key] = None
+        if len(self._ids) > self.capacity:
+            self._ids.popitem(last=False)
+
+@dataclass
+class PaymentUpdate:
+    payment_status: PaymentStatus
+    order_id: Optional[str] = None
+    order_number: Optional[str] = None
+    gateway_ids: tuple = ()
+    payment_id: Optional[str] = None
+    amount: Optional[int] = None  # In the currency's minor unit (paise)
+    currency: Optional[str] = None
+
+RAZORPAY_STATUSES = {
+    "payment.captured": PaymentStatus.COMPLETED,
+    "order.paid": PaymentStatus.COMPLETED,
+    "payment.failed": PaymentStatus.FAILED,
+    "refund.processed": PaymentStatus.REFUNDED,
+}
+
+STRIPE_STATUSES = {
+    "payment_intent.succeeded": PaymentStatus.COMPLETED,
+    "checkout.session.completed": PaymentStatus.COMPLETED,
+    "payment_intent.payment_failed": PaymentStatus.FAILED,
+    "charge.refunded": PaymentStatus.REFUNDED,
+}
+
+def parse_event(provider: str, event_type: str, payload: dict) -> Optional[PaymentUpdate]:
+    """Turn a gateway event into the payment transition it implies, if any"""
+    if provider == RAZORPAY:
+        new_status = RAZORPAY_STATUSES.get(event_type)
+        if new_status is None:
+            return None
+        body = payload.get("payload", {})
+        payment = body.get("payment", {}).get("entity", {})
+        refund = body.get("refund", {}).get("entity", {})
+        notes = payment.get("notes") or refund.get("notes") or {}
+        payment_id = payment.get("id") or refund.get("payment_id")
+        return PaymentUpdate(
+            payment_status=new_status,
+            order_id=notes.get("order_id"),
+            order_number=notes.get("order_number"),
+            gateway_ids=tuple(i for i in (payment.get("order_id"), payment_id) if i),
+            payment_id=payment_id,
+            amount=payment.get("amount"),
+            currency=payment.get("currency"),
+        )
+
+    new_status = STRIPE_STATUSES.get(event_type)
+    if new_status is None:
+        return None
+    obj = payload.get("data", {}).get("object", {})
+    if event_type == "checkout.session.completed" and obj.get("payment_status") != "paid":
+        return None
+    metadata = obj.get("metadata") or {}
+    payment_id = obj.get("payment_intent") if obj.get("object") in ("charge", "checkout.session") else obj.get("id")
+    # Sessions report amount_total, intents amount_received (falling back to amount)
+    amount = next((obj[key] for key in ("amount_total", "amount_received", "amount") if obj.get(key) is not None), None)
+    return PaymentUpdate(
+        payment_status=new_status,
+        order_id=metadata.get("order_id"),
+        order_number=metadata.get("order_number"),
+        gateway_ids=tuple(i for i in (obj.get("id"), obj.get("payment_intent")) if i),
+        payment_id=payment_id,
+        amount=amount,
+        currency=obj.get("currency"),
+    )
+
+def amount_mismatch(change: PaymentUpdate, order: Order) -> Optional[str]:
+    """Why a capture doesn't pay for `order` exactly, or None if it does"""
+    expected = int(Decimal(order.total_amount) * 100)
+    currency = (change.currency or "").upper()
+    if change.amount != expected or currency != settings.PAYMENT_CURRENCY.upper():
+        return (
+            f"Captured {change.amount} {currency or '?'} but order total is "
+            f"{expected} {settings.PAYMENT_CURRENCY.upper()} (minor units)"
+        )
+    return None
+
+# Payment status moves allowed by webhooks; anything else is a stale or out-of-order event
+PAYMENT_TRANSITIONS = {
+    PaymentStatus.PENDING: {PaymentStatus.COMPLETED, PaymentStatus.FAILED},
+    PaymentStatus.FAILED: {PaymentStatus.COMPLETED},
+    PaymentStatus.COMPLETED: {PaymentStatus.REFUNDED},
+    PaymentStatus.REFUNDED: set(),
+}
+
+def claim_events(db: Session, limit: int) -> List[PaymentEvent]:
+    """Lock a batch of pending events for this worker (SKIP LOCKED)"""
+    return db.execute(
+        select(PaymentEvent)
+        .where(PaymentEvent.status == PaymentEventStatus.PENDING)
+        .order_by(PaymentEvent.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+
+def _load_orders(db: Session, updates: List[PaymentUpdate]) -> Dict[str, Order]:
+    """Fetch every order referenced by a batch in one query, indexed by each reference"""
+    ids = {u.order_id for u in updates if u.order_id}
+    numbers = {u.order_number for u in updates if u.order_number}
+    gateway_ids = {g for u in updates for g in u.gateway_ids}
+    conditions = []
+    if ids:
+        conditions.append(Order.id.in_(ids))
+    if numbers:
+        conditions.append(Order.order_number.in_(numbers))
+    if gateway_ids:
+        conditions.append(Order.payment_id.in_(gateway_ids))
+    if not conditions:
+        return {}
+
+    index = {}
+    for order in db.execute(select(Order).where(or_(*conditions))).scalars():
+        index[order.id] = order
+        index[order.order_number] = order
+        if order.payment_id:
+            index[order.payment_id] = order
+    return index
+
+def process_batch(db: Session, limit: int) -> int:
+    """Apply one batch of queued webhook events to orders in a single transaction.
+
+    A failure after the claim is raised as EventBatchError naming the claimed
+    events; the caller rolls back.
+    """
+    events = claim_events(db, limit)
+    if not events:
+        db.commit()
+        return 0
+    event_ids = [event.id for event in events]
+    try:
+        _apply_events(db, events)
+        db.commit()
+    except Exception as exc:
+        raise EventBatchError(event_ids, exc) from exc
+    return len(events)
+
+def _apply_events(db: Session, events: List[PaymentEvent]) -> None:
+    """Apply events in claim order, each judged against its order's status after the ones before it"""
+    parsed = [(event, parse_event(event.provider, event.event_type, event.payload)) for event in events]
+    orders = _load_orders(db, [u for _, u in parsed if u])
+    now = datetime.utcnow()
+
+    matched = []
+    for event, change in parsed:
+        order = None
+        if change:
+            for ref in (change.order_id, change.order_number, *change.gateway_ids):
+                if ref and ref in orders:
+                    order = orders[ref]
+                    break
+        if order is None:
+            event.status = PaymentEventStatus.IGNORED
+            event.error = None if change is None else "No matching order"
+            event.processed_at = now
+        else:
+            matched.append((event, change, order))
+
+    touched = list({order.id: order for _, _, order in matched})
+    with rollups.track_orders(db, touched):
+        for event, change, order in matched:
+            event.order_id = order.id
+            event.processed_at = now
+            # order.payment_status already reflects earlier events for this order in the batch
+            if change.payment_status not in PAYMENT_TRANSITIONS[order.payment_status]:
+                event.status = PaymentEventStatus.IGNORED
+                event.error = f"{order.payment_status.value} -> {change.payment_status.value} not allowed"
+                continue
+            mismatch = amount_mismatch(change, order) if change.payment_status == PaymentStatus.COMPLETED else None
+            if mismatch:
+                # Underpaid or wrong-currency capture: leave the order unpaid for someone to review
+                event.status = PaymentEventStatus.FAILED
+                event.error = mismatch[:500]
+                continue
+
+            event.status = PaymentEventStatus.PROCESSED
+            order.payment_status = change.payment_status
+            order.payment_method = order.payment_method or event.provider
+            if change.payment_id:
+                order.payment_id = change.payment_id
+            if change.payment_status == PaymentStatus.COMPLETED and order.status == OrderStatus.PENDING:
+                order.status = OrderStatus.CONFIRMED
+                outbox.enqueue_order_status(db, order)
+
+def mark_failed(db: Session, event_ids: List[int], error: str) -> None:
+    """Fail events that are still pending (another worker may have taken them since)"""
+    db.execute(
+        update(PaymentEvent)
+        .where(PaymentEvent.id.in_(event_ids), PaymentEvent.status == PaymentEventStatus.PENDING)
+        .values(status=PaymentEventStatus.FAILED, error=error[:500], processed_at=datetime.utcnow())
+    )
+    db.commit()
@@ -0,0 +1,273 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, List, Optional, Tuple
+from jose import JWTError, jwt
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session, joinedload
+from app import events
+from app.cache import TTLCache
+from app.config import settings
+from app.models.address import Address
+from app.models.cart import Cart
+from app.models.coupon import Coupon, DiscountType
+from app.models.product_variant import ProductVariant
+from app.services import reservations, shipping_rules
+
+CENT = Decimal("0.01")
+
+# (user_id, cart hash) -> quote response. Short-lived and dropped on any product
+# change, so a cached quote never outlives the prices it was computed from by much.
+_quotes = TTLCache(maxsize=50_000, ttl=60)
+
+class PricingError(ValueError):
+    """A cart that can't be priced; carries the HTTP status the route should return"""
+
+    def __init__(self, detail: str, status_code: int = 400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+def _money(value) -> Decimal:
+    return Decimal(str(value)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+def cart_items(db: Session, user_id: str) -> List[Tuple[int, int]]:
+    return [
+        (variant_id, quantity)
+        for variant_id, quantity in db.execute(
+            select(Cart.product_variant_id, Cart.quantity).where(Cart.user_id == user_id)
+        )
+    ]
+
+def load_lines(db: Session, items: List[Tuple[int, int]], lock: bool = False,
+               user_id: Optional[str] = None) -> List[dict]:
+    """Variants for (variant_id, quantity) pairs in one query, with stock checked.
+
+    Stock held by other shoppers' checkouts (anyone but `user_id`) isn't available.
+    """
+    quantities: Dict[int, int] = {}
+    for variant_id, quantity in items:
+        if quantity <= 0:
+            raise PricingError(f"Quantity for variant {variant_id} must be positive")
+        quantities[variant_id] = quantities.get(variant_id, 0) + quantity
+    if not quantities:
+        raise PricingError("No items to price")
+
+    query = (
+        select(ProductVariant).where(ProductVariant.id.in_(quantities))
+        .options(joinedload(ProductVariant.product))
+    )
+    if lock:
+        # Same id order as reservations.hold and bulk orders, so lockers can't deadlock
+        query = query.order_by(ProductVariant.id).with_for_update(of=ProductVariant)
+    variants = {variant.id: variant for variant in db.execute(query).unique().scalars()}
+    others = reservations.held(db, variants, exclude_user_id=user_id)
+
+    lines = []
+    for variant_id, quantity in quantities.items():
+        variant = variants.get(variant_id)
+        if variant is None:
+            raise PricingError(f"Variant {variant_id} not found", status_code=404)
+        if variant.stock_quantity - others.get(variant_id, 0) < quantity:
+            raise PricingError(f"Insufficient stock for {variant.sku}")
+        unit_price = _money(variant.price_override or variant.product.base_price)
+        lines.append({
+            "variant": variant,
+            "quantity": quantity,
+            "unit_price": unit_price,
+            "total_price": unit_price * quantity,
+        })
+    return lines
+
+def coupon_discount(db: Session, code: Optional[str], subtotal: Decimal) -> Decimal:
+    """Discount for a coupon code; unknown, inactive or unmet coupons give zero"""
+    if not code:
+        return Decimal("0")
+    coupon = db.execute(select(Coupon).where(Coupon.code == code)).scalar_one_or_none()
+    now = datetime.utcnow()
+    if not coupon or not coupon.is_active or not (coupon.valid_from <= now <= coupon.valid_until):
+        return Decimal("0")
+    if coupon.usage_limit is not None and (coupon.used_count or 0) >= coupon.usage_limit:
+        return Decimal("0")
+    if subtotal < (coupon.min_order_value or 0):
+        return Decimal("0")
+    if coupon.discount_type == DiscountType.PERCENTAGE:
+        discount = subtotal * coupon.discount_value / 100
+        if coupon.max_discount:
+            discount = min(discount, coupon.max_discount)
+    else:
+        discount = coupon.discount_value
+    return _money(min(discount, subtotal))
+
+def use_coupon(db: Session, code: str) -> None:
+    """Count one use of `code` by an order being placed; the caller commits.
+
+    The usage limit is re-checked in the UPDATE itself, so concurrent orders
+    can't take more uses than the coupon allows.
+    """
+    used_count = func.coalesce(Coupon.used_count, 0)
+    result = db.execute(
+        update(Coupon)
+        .where(Coupon.code == code, or_(Coupon.usage_limit.is_(None), used_count < Coupon.usage_limit))
+        .values(used_count=used_count + 1)
+    )
+    if result.rowcount != 1:
+        raise PricingError(f"Coupon {code} has been fully redeemed", status_code=409)
+
+def destination(db: Session, user_id: str, address_id: Optional[int]) -> Optional[Address]:
+    """The user's own address to price shipping and tax for"""
+    if address_id is None:
+        return None
+    address = db.execute(
+        select(Address).where(Address.id == address_id, Address.user_id == user_id)
+    ).scalar_one_or_none()
+    if address is None:
+        raise PricingError("Shipping address not found", status_code=404)
+    return address
+
+def zone_shipping_cost(zone: Optional[shipping_rules.Zone], subtotal: Decimal) -> Decimal:
+    """A zone's rate, or the flat rate for pincodes outside every zone"""
+    if zone is None:
+        if subtotal > settings.FREE_SHIPPING_THRESHOLD:
+            return Decimal("0")
+        return _money(settings.FLAT_SHIPPING_COST)
+    if zone.free_above is not None and subtotal > zone.free_above:
+        return Decimal("0")
+    return _money(zone.rate)
+
+def shipping_cost(db: Session, subtotal: Decimal, address: Optional[Address] = None) -> Decimal:
+    zone = shipping_rules.current(db).zone(address.pincode) if address is not None else None
+    if zone is not None and not zone.is_serviceable:
+        raise PricingError(f"We don't deliver to pincode {address.pincode} yet", status_code=422)
+    return zone_shipping_cost(zone, subtotal)
+
+def tax_amount(db: Session, lines: List[dict], subtotal: Decimal, discount: Decimal,
+               address: Optional[Address] = None) -> Decimal:
+    """GST per line at the rate for its unit price and the destination state, on the
+    line's share of the discounted subtotal; GST_RATE where no rule applies"""
+    if not subtotal:
+        return Decimal("0")
+    rules = shipping_rules.current(db)
+    state = address.state if address is not None else None
+    default_rate = Decimal(str(settings.GST_RATE))
+    taxable_share = (subtotal - discount) / subtotal
+    tax = Decimal("0")
+    for line in lines:
+        rate = rules.tax_rate(state, line["unit_price"])
+        tax += line["total_price"] * taxable_share * (default_rate if rate is None else rate)
+    return _money(tax)
+
+def totals(db: Session, lines: List[dict], coupon_code: Optional[str], address: Optional[Address] = None) -> dict:
+    """The one place order totals are computed: quotes and orders both use it"""
+    subtotal = sum((line["total_price"] for line in lines), Decimal("0"))
+    discount = coupon_discount(db, coupon_code, subtotal)
+    tax = tax_amount(db, lines, subtotal, discount, address)
+    shipping = shipping_cost(db, subtotal, address)
+    return {
+        "subtotal": subtotal,
+        "discount_amount": discount,
+        "tax_amount": tax,
+        "shipping_cost": shipping,
+        "total_amount": subtotal + tax + shipping - discount,
+    }
+
+def cart_hash(items: List[Tuple[int, int]], coupon_code: Optional[str], address: Optional[Address] = None) -> str:
+    """Version of a priced cart: same items, quantities, coupon and destination give the same hash"""
+    quantities: Dict[int, int] = {}
+    for variant_id, quantity in items:
+        if quantity <= 0:
+            raise PricingError(f"Quantity for variant {variant_id} must be positive")
+        quantities[variant_id] = quantities.get(variant_id, 0) + quantity
+    place = [address.pincode, shipping_rules.normalize_state(address.state)] if address is not None else None
+    canonical = json.dumps([sorted(quantities.items()), coupon_code or "", place], separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def _issue_token(user_id: str, version: str, rules_version: str, lines: List[dict], amounts: dict,
+                 coupon_code: Optional[str], expires_at: datetime) -> str:
+    claims = {
+        "type": "quote",
+        "sub": user_id,
+        "cart": version,
+        "rules": rules_version,
+        "coupon": coupon_code,
+        "lines": [[line["variant"].id, line["quantity"], str(line["unit_price"])] for line in lines],
+        "amounts": {name: str(value) for name, value in amounts.items()},
+        "exp": expires_at,
+    }
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+def quote(db: Session, user_id: str, items: List[Tuple[int, int]], coupon_code: Optional[str],
+          address: Optional[Address] = None) -> dict:
+    """Price items with coupon, shipping and tax and hold their stock until `reserved_until`.
+
+    Every call renews the holds; the pricing of an unchanged cart comes from the cache.
+    """
+    version = cart_hash(items, coupon_code, address)
+    try:
+        reserved_until = reservations.hold(db, user_id, items)
+    except reservations.ReservationError as exc:
+        raise PricingError(exc.detail, status_code=exc.status_code)
+    db.commit()
+    cached = _quotes.get((user_id, version))
+    if cached is not None:
+        return {**cached, "reserved_until": reserved_until}
+
+    lines = load_lines(db, items, user_id=user_id)
+    amounts = totals(db, lines, coupon_code, address)
+    expires_at = datetime.utcnow() + timedelta(seconds=settings.QUOTE_TTL_SECONDS)
+    result = {
+        "lines": [
+            {
+                "product_variant_id": line["variant"].id,
+                "sku": line["variant"].sku,
+                "product_name": line["variant"].product.name,
+                "quantity": line["quantity"],
+                "unit_price": line["unit_price"],
+                "total_price": line["total_price"],
+            }
+            for line in lines
+        ],
+        **amounts,
+        "coupon_code": coupon_code,
+        "cart_version": version,
+        "quote_token": _issue_token(
+            user_id, version, shipping_rules.current(db).version, lines, amounts, coupon_code, expires_at
+        ),
+        "expires_at": expires_at,
+    }
+    _quotes.set((user_id, version), result)
+    return {**result, "reserved_until": reserved_until}
+
+def redeem(db: Session, token: str, user_id: str, lines: List[dict], coupon_code: Optional[str],
+           address: Optional[Address] = None) -> Optional[dict]:
+    """Totals from a quote token if it still matches the order exactly, else None.
+
+    The order's lines must be loaded (and stock-checked) by the caller; a token is
+    only honoured when the items, coupon (and its discount), destination, current
+    unit prices and the shipping/tax rules are unchanged.
+    """
+    try:
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    if claims.get("type") != "quote" or claims.get("sub") != user_id:
+        return None
+    items = [(line["variant"].id, line["quantity"]) for line in lines]
+    if claims.get("cart") != cart_hash(items, coupon_code, address):
+        return None
+    if claims.get("rules") != shipping_rules.current(db).version:
+        return None
+    quoted = {variant_id: Decimal(price) for variant_id, _, price in claims["lines"]}
+    if any(quoted.get(line["variant"].id) != line["unit_price"] for line in lines):
+        return None
+    amounts = {name: Decimal(value) for name, value in claims["amounts"].items()}
+    # The coupon may have been deactivated, expired or used up since the quote
+    if coupon_discount(db, coupon_code, amounts["subtotal"]) != amounts["discount_amount"]:
+        return None
+    return amounts
+
+@events.subscribe(events.SHIPPING_RULES_CHANGED, remote=True)
+@events.subscribe(events.PRODUCT_CHANGED, remote=True)
+def _drop_quotes(payload: dict) -> None:
+    _quotes.clear()
@@ -0,0 +1,102 @@
+"""Soft stock holds taken when a shopper starts checkout.
+
+Available stock is `stock_quantity` minus other shoppers' unexpired holds. A
+hold never touches `stock_quantity`: placing the order decrements stock and
+drops the holds in the same transaction, and a hold nobody converts simply
+stops counting once `expires_at` passes. Expired rows are only garbage, which
+the sweeper deletes in batches off the expiry index.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.product_variant import ProductVariant
+from app.models.reservation import StockReservation
+
+class ReservationError(ValueError):
+    """Not enough unheld stock; carries the HTTP status the route should return"""
+
+    def __init__(self, detail: str, status_code: int = 409):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+def held(db: Session, variant_ids: Iterable[int], exclude_user_id: Optional[str] = None) -> Dict[int, int]:
+    """Units under live holds per variant, leaving out `exclude_user_id`'s own"""
+    variant_ids = list(set(variant_ids))
+    if not variant_ids:
+        return {}
+    query = (
+        select(StockReservation.product_variant_id, func.sum(StockReservation.quantity))
+        .where(
+            StockReservation.product_variant_id.in_(variant_ids),
+            StockReservation.expires_at > datetime.utcnow(),
+        )
+        .group_by(StockReservation.product_variant_id)
+    )
+    if exclude_user_id is not None:
+        query = query.where(StockReservation.user_id != exclude_user_id)
+    return {variant_id: int(units) for variant_id, units in db.execute(query)}
+
+def hold(db: Session, user_id: str, items: List[Tuple[int, int]]) -> datetime:
+    """Replace the user's holds with (variant_id, quantity) for RESERVATION_TTL_SECONDS.
+
+    Variant rows are locked in id order while availability is checked, so two
+    shoppers can't both hold the last unit. The caller commits.
+    """
+    quantities: Dict[int, int] = {}
+    for variant_id, quantity in items:
+        if quantity <= 0:
+            raise ReservationError(f"Quantity for variant {variant_id} must be positive", status_code=400)
+        quantities[variant_id] = quantities.get(variant_id, 0) + quantity
+    if not quantities:
+        raise ReservationError("No items to reserve", status_code=400)
+
+    stock = {
+        variant_id: (sku, stock_quantity)
+        for variant_id, sku, stock_quantity in db.execute(
+            select(ProductVariant.id, ProductVariant.sku, ProductVariant.stock_quantity)
+            .where(ProductVariant.id.in_(quantities))
+            .order_by(ProductVariant.id)
+            .with_for_update()
+        )
+    }
+    others = held(db, quantities, exclude_user_id=user_id)
+    for variant_id, quantity in sorted(quantities.items()):
+        if variant_id not in stock:
+            raise ReservationError(f"Variant {variant_id} not found", status_code=404)
+        sku, stock_quantity = stock[variant_id]
+        available = stock_quantity - others.get(variant_id, 0)
+        if available < quantity:
+            raise ReservationError(f"Only {max(available, 0)} of {sku} available")
+
+    expires_at = datetime.utcnow() + timedelta(seconds=settings.RESERVATION_TTL_SECONDS)
+    release(db, user_id)
+    db.execute(StockReservation.__table__.insert(), [
+        {"user_id": user_id, "product_variant_id": variant_id, "quantity": quantity, "expires_at": expires_at}
+        for variant_id, quantity in quantities.items()
+    ])
+    return expires_at
+
+def release(db: Session, user_id: str) -> None:
+    """Drop all of a user's holds (order placed or checkout abandoned); the caller commits"""
+    db.execute(delete(StockReservation).where(StockReservation.user_id == user_id))
+
+def sweep(db: Session, batch_size: int) -> int:
+    """Delete expired holds in batches taken from the expiry index; returns the count"""
+    removed = 0
+    while True:
+        ids = db.execute(
+            select(StockReservation.id)
+            .where(StockReservation.expires_at <= datetime.utcnow())
+            .order_by(StockReservation.expires_at)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return removed
+        db.execute(delete(StockReservation).where(StockReservation.id.in_(ids)))
+        db.commit()
+        removed += len(ids)
+        if len(ids) < batch_size:
+            return removed
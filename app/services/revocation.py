@@ -0,0 +1,35 @@
+from datetime import datetime
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+from app.database import insert_ignore
+from app.models.token import RevokedToken
+from app.models.user import User
+
+def claim(db: Session, payload: dict) -> bool:
+    """Revoke a token by its jti; False if it was already revoked (i.e. replayed).
+
+    The primary key makes this atomic, so two concurrent refreshes with the same
+    token can't both succeed.
+    """
+    result = insert_ignore(db, RevokedToken, [{
+        "jti": payload["jti"],
+        "user_id": payload["sub"],
+        "expires_at": datetime.utcfromtimestamp(payload["exp"]),
+        "revoked_at": datetime.utcnow(),
+    }])
+    return result.rowcount == 1
+
+def revoke_all(db: Session, user: User) -> None:
+    """Invalidate every token issued to a user so far (logout, password change, reuse)"""
+    db.flush()
+    db.execute(
+        update(User).where(User.id == user.id)
+        .values(token_version=User.token_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.refresh(user)
+
+def purge_expired(db: Session) -> int:
+    result = db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+    db.commit()
+    return result.rowcount
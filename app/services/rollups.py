@@ -0,0 +1,173 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from app.database import upsert
+from app.models.analytics import DailySales, DailyVariantSales, DailyCategorySales
+from app.models.order import Order, OrderItem
+
+ORDER_CHUNK = 1000
+
+def _as_date(value) -> date:
+    # SQLite returns DATE() as text; MySQL returns a date
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+def _aggregate(db: Session, condition) -> tuple:
+    """Group the orders matching `condition` into rollup rows (one query per level).
+
+    Items are bucketed by the variant and category recorded on them when the
+    order was placed, so removing an order subtracts exactly what adding it
+    counted even if the product has since moved category.
+    """
+    orders = Order.__table__
+    items = OrderItem.__table__
+    day = func.date(orders.c.created_at)
+
+    daily = {}
+    for row_day, status, payment_status, count, revenue in db.execute(
+        select(day, orders.c.status, orders.c.payment_status, func.count(), func.sum(orders.c.total_amount))
+        .where(condition)
+        .group_by(day, orders.c.status, orders.c.payment_status)
+    ):
+        key = (_as_date(row_day), status, payment_status)
+        daily[key] = {"orders_count": count, "units": 0, "revenue": revenue or Decimal(0)}
+
+    variant_rows = defaultdict(lambda: {"units": 0, "revenue": Decimal(0)})
+    category_rows = defaultdict(lambda: {"units": 0, "revenue": Decimal(0)})
+    variant_id = func.coalesce(items.c.product_variant_id, 0)
+    category_id = func.coalesce(items.c.category_id, 0)
+    for row_day, status, payment_status, v_id, c_id, units, revenue in db.execute(
+        select(
+            day, orders.c.status, orders.c.payment_status, variant_id, category_id,
+            func.sum(items.c.quantity), func.sum(items.c.total_price),
+        )
+        .select_from(items.join(orders, items.c.order_id == orders.c.id))
+        .where(condition)
+        .group_by(day, orders.c.status, orders.c.payment_status, variant_id, category_id)
+    ):
+        row_day = _as_date(row_day)
+        units = units or 0
+        revenue = revenue or Decimal(0)
+        daily[(row_day, status, payment_status)]["units"] += units
+        for bucket in (variant_rows[(row_day, v_id, status, payment_status)],
+                       category_rows[(row_day, c_id, status, payment_status)]):
+            bucket["units"] += units
+            bucket["revenue"] += revenue
+
+    return daily, variant_rows, category_rows
+
+def _apply(db: Session, condition, sign: int) -> None:
+    daily, variant_rows, category_rows = _aggregate(db, condition)
+
+    upsert(db, DailySales, [
+        {"day": d, "status": s, "payment_status": p,
+         "orders_count": sign * v["orders_count"], "units": sign * v["units"], "revenue": sign * v["revenue"]}
+        for (d, s, p), v in daily.items()
+    ], ["orders_count", "units", "revenue"], increment=True)
+    upsert(db, DailyVariantSales, [
+        {"day": d, "product_variant_id": k, "status": s, "payment_status": p,
+         "units": sign * v["units"], "revenue": sign * v["revenue"]}
+        for (d, k, s, p), v in variant_rows.items()
+    ], ["units", "revenue"], increment=True)
+    upsert(db, DailyCategorySales, [
+        {"day": d, "category_id": k, "status": s, "payment_status": p,
+         "units": sign * v["units"], "revenue": sign * v["revenue"]}
+        for (d, k, s, p), v in category_rows.items()
+    ], ["units", "revenue"], increment=True)
+
+def add_orders(db: Session, order_ids: Iterable[str]) -> None:
+    """Count orders into the rollups using their current (flushed) state"""
+    ids = list(order_ids)
+    for start in range(0, len(ids), ORDER_CHUNK):
+        _apply(db, Order.__table__.c.id.in_(ids[start:start + ORDER_CHUNK]), 1)
+
+def remove_orders(db: Session, order_ids: Iterable[str]) -> None:
+    """Take orders out of the rollups using their current (flushed) state"""
+    ids = list(order_ids)
+    for start in range(0, len(ids), ORDER_CHUNK):
+        _apply(db, Order.__table__.c.id.in_(ids[start:start + ORDER_CHUNK]), -1)
+
+@contextmanager
+def track_orders(db: Session, order_ids: Iterable[str]):
+    """Move orders between rollup buckets around a status change.
+
+    The orders are subtracted before the block runs and added back afterwards,
+    all inside the caller's transaction.
+    """
+    ids = list(order_ids)
+    remove_orders(db, ids)
+    yield
+    db.flush()
+    add_orders(db, ids)
+
+def rebuild(db: Session, chunk_days: int = 7, progress=None) -> int:
+    """Recompute every rollup from orders, committing one window of days at a time.
+
+    Run while order writes are quiet: orders changed during the rebuild may be
+    counted in both the old and new state.
+    """
+    for model in (DailySales, DailyVariantSales, DailyCategorySales):
+        db.execute(delete(model))
+    db.commit()
+
+    first, last = db.execute(select(func.min(Order.created_at), func.max(Order.created_at))).one()
+    if first is None:
+        return 0
+
+    windows = 0
+    created_at = Order.__table__.c.created_at
+    window_start = datetime.combine(first.date(), datetime.min.time())
+    while window_start <= last:
+        window_end = window_start + timedelta(days=chunk_days)
+        _apply(db, (created_at >= window_start) & (created_at < window_end), 1)
+        db.commit()
+        windows += 1
+        if progress:
+            progress(window_start, window_end)
+        window_start = window_end
+    return windows
+
+def sales_by_day(db: Session, start: date, end: date, statuses=None, payment_statuses=None) -> list:
+    query = (
+        select(
+            DailySales.day,
+            func.sum(DailySales.orders_count),
+            func.sum(DailySales.units),
+            func.sum(DailySales.revenue),
+        )
+        .where(DailySales.day >= start, DailySales.day <= end)
+        .group_by(DailySales.day)
+        .order_by(DailySales.day)
+    )
+    query = _filter_statuses(query, DailySales, statuses, payment_statuses)
+    return [
+        {"day": day, "orders": orders or 0, "units": units or 0, "revenue": float(revenue or 0)}
+        for day, orders, units, revenue in db.execute(query)
+    ]
+
+def top_items(db: Session, model, key_column: str, start: date, end: date, limit: int,
+              statuses=None, payment_statuses=None) -> list:
+    key = getattr(model, key_column)
+    units = func.sum(model.units)
+    query = (
+        select(key, units, func.sum(model.revenue))
+        .where(model.day >= start, model.day <= end)
+        .group_by(key)
+        .order_by(units.desc())
+        .limit(limit)
+    )
+    query = _filter_statuses(query, model, statuses, payment_statuses)
+    return [
+        {"id": item_id, "units": item_units or 0, "revenue": float(revenue or 0)}
+        for item_id, item_units, revenue in db.execute(query)
+    ]
+
+def _filter_statuses(query, model, statuses: Optional[list], payment_statuses: Optional[list]):
+    if statuses:
+        query = query.where(model.status.in_(statuses))
+    if payment_statuses:
+        query = query.where(model.payment_status.in_(payment_statuses))
+    return query
@@ -0,0 +1,185 @@
+"""Shipping zones and tax rules compiled into an in-memory index per worker.
+
+Zone prefixes go into one dict, so a lookup probes the pincode's first 6, 5, ...
+1 digits and costs at most six dict hits however many rules exist. Tax rules are
+sorted price bands per state searched with bisect. A compiled index is never
+modified: a reload builds a new one and swaps it in with a single assignment.
+
+Each prefix is also a row of `shipping_zone_prefixes`, whose primary key stops
+two zones from claiming it even when admins save them at the same time.
+"""
+import hashlib
+import logging
+import threading
+import time
+from bisect import bisect_right
+from decimal import Decimal
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import events
+from app.config import settings
+from app.models.shipping import ShippingZone, ShippingZonePrefix, TaxRule
+from app.warmup import register_warmup
+
+logger = logging.getLogger(__name__)
+
+PINCODE_LENGTH = 6
+
+class Zone(NamedTuple):
+    id: int
+    name: str
+    rate: Decimal
+    free_above: Optional[Decimal]
+    delivery_days: Optional[int]
+    cod_available: bool
+    is_serviceable: bool
+
+class PrefixConflict(ValueError):
+    """A pincode prefix is claimed by more than one zone"""
+
+def normalize_pincode(pincode: str) -> str:
+    return "".join(char for char in str(pincode or "") if char.isdigit())[:PINCODE_LENGTH]
+
+def normalize_state(state: Optional[str]) -> Optional[str]:
+    return " ".join(state.split()).casefold() if state and state.strip() else None
+
+def check_prefixes(prefixes: Iterable[str]) -> List[str]:
+    """Validated, de-duplicated prefixes of 1-6 digits"""
+    cleaned = []
+    for prefix in prefixes:
+        prefix = str(prefix).strip()
+        if not prefix.isdigit() or len(prefix) > PINCODE_LENGTH:
+            raise ValueError(f"Pincode prefix '{prefix}' must be 1-{PINCODE_LENGTH} digits")
+        cleaned.append(prefix)
+    return sorted(set(cleaned))
+
+class RuleIndex:
+    def __init__(self, zones: List[Tuple[List[str], Zone]], taxes: List[Tuple[Optional[str], Decimal, Decimal]]):
+        self._zones: Dict[str, Zone] = {}
+        for prefixes, zone in zones:
+            for prefix in prefixes:
+                other = self._zones.get(prefix)
+                if other is not None and other.id != zone.id:
+                    raise PrefixConflict(f"Prefix {prefix} belongs to both '{other.name}' and '{zone.name}'")
+                self._zones[prefix] = zone
+
+        bands: Dict[Optional[str], List[Tuple[Decimal, Decimal]]] = {}
+        for state, min_unit_price, rate in taxes:
+            bands.setdefault(normalize_state(state), []).append((min_unit_price, rate))
+        self._taxes = {
+            state: ([low for low, _ in sorted(entries)], [rate for _, rate in sorted(entries)])
+            for state, entries in bands.items()
+        }
+
+        # Same rules give the same version in every worker, so quote tokens can carry it
+        canonical = repr((sorted((prefix, tuple(zone)) for prefix, zone in self._zones.items()),
+                          sorted(self._taxes.items(), key=lambda item: item[0] or "")))
+        self.version = hashlib.sha256(canonical.encode()).hexdigest()[:16]
+        self.zone_count = len({zone.id for zone in self._zones.values()})
+        self.prefix_count = len(self._zones)
+
+    def zone(self, pincode: str) -> Optional[Zone]:
+        """Zone with the longest prefix of `pincode`, or None when no zone covers it"""
+        pincode = normalize_pincode(pincode)
+        for length in range(len(pincode), 0, -1):
+            zone = self._zones.get(pincode[:length])
+            if zone is not None:
+                return zone
+        return None
+
+    def tax_rate(self, state: Optional[str], unit_price: Decimal) -> Optional[Decimal]:
+        """Rate of the highest price band at or below `unit_price`; the state's rules before
+        the all-states ones, None when neither has a band"""
+        for key in (normalize_state(state), None):
+            bands = self._taxes.get(key)
+            if bands:
+                position = bisect_right(bands[0], unit_price) - 1
+                if position >= 0:
+                    return bands[1][position]
+        return None
+
+def set_zone_prefixes(db: Session, zone_id: int, prefixes: Iterable[str]) -> None:
+    """Make `prefixes` exactly the ones owned by the zone; PrefixConflict if another zone has one.
+
+    The caller commits, or rolls back on PrefixConflict.
+    """
+    prefixes = check_prefixes(prefixes)
+    taken = db.execute(
+        select(ShippingZonePrefix.prefix, ShippingZone.name)
+        .join(ShippingZone, ShippingZone.id == ShippingZonePrefix.zone_id)
+        .where(ShippingZonePrefix.prefix.in_(prefixes), ShippingZonePrefix.zone_id != zone_id)
+        .order_by(ShippingZonePrefix.prefix)
+    ).first()
+    if taken is not None:
+        raise PrefixConflict(f"Prefix {taken.prefix} already belongs to '{taken.name}'")
+
+    db.execute(delete(ShippingZonePrefix).where(ShippingZonePrefix.zone_id == zone_id))
+    if prefixes:
+        try:
+            db.execute(insert(ShippingZonePrefix), [{"prefix": prefix, "zone_id": zone_id} for prefix in prefixes])
+        except IntegrityError as exc:
+            # Another zone claimed one of them since the check above
+            raise PrefixConflict("A pincode prefix was just claimed by another zone") from exc
+
+def compile_rules(db: Session) -> RuleIndex:
+    owned: Dict[int, List[str]] = {}
+    for prefix, zone_id in db.execute(select(ShippingZonePrefix.prefix, ShippingZonePrefix.zone_id)):
+        owned.setdefault(zone_id, []).append(prefix)
+    zones = [
+        (
+            sorted(owned.get(zone.id, [])),
+            Zone(
+                zone.id, zone.name, Decimal(str(zone.rate)),
+                Decimal(str(zone.free_above)) if zone.free_above is not None else None,
+                zone.delivery_days, bool(zone.cod_available), bool(zone.is_serviceable),
+            ),
+        )
+        for zone in db.execute(select(ShippingZone).order_by(ShippingZone.id)).scalars()
+    ]
+    taxes = [
+        (state, Decimal(str(min_unit_price)), Decimal(str(rate)))
+        for state, min_unit_price, rate in db.execute(
+            select(TaxRule.state, TaxRule.min_unit_price, TaxRule.rate)
+        )
+    ]
+    return RuleIndex(zones, taxes)
+
+_index: Optional[RuleIndex] = None
+_loaded_at = 0.0
+_stale = False
+_lock = threading.Lock()
+
+@register_warmup
+def current(db: Session) -> RuleIndex:
+    """This worker's index, recompiled after a rule change or every SHIPPING_RULES_RESYNC_SECONDS.
+
+    Rules that don't compile are logged and the last good index keeps serving
+    until the next resync; only a worker with no index yet raises.
+    """
+    global _index, _loaded_at, _stale
+    now = time.monotonic()
+    if _index is not None and not _stale and now - _loaded_at < settings.SHIPPING_RULES_RESYNC_SECONDS:
+        return _index
+    with _lock:
+        if _index is None or _stale or now - _loaded_at >= settings.SHIPPING_RULES_RESYNC_SECONDS:
+            _stale = False
+            try:
+                index = compile_rules(db)
+            except PrefixConflict:
+                if _index is None:
+                    raise
+                logger.exception("Shipping rules didn't compile; keeping version %s", _index.version)
+                index = _index
+            _index, _loaded_at = index, now
+    return _index
+
+def announce() -> None:
+    """Call after committing a zone or tax rule change"""
+    events.publish(events.SHIPPING_RULES_CHANGED, {})
+
+@events.subscribe(events.SHIPPING_RULES_CHANGED, remote=True)
+def _invalidate(payload: dict) -> None:
+    global _stale
+    _stale = True
@@ -0,0 +1,409 @@
+"""Search-as-you-type suggestions from an in-memory prefix index per worker.
+
+Product names, category names and popular storefront searches are normalized
+and stored under every word start ("Linen Shirt" under "linen shirt" and
+"shirt") in one sorted array. A prefix is answered with two bisects over that
+array; prefixes matching more than SCAN_LIMIT keys have their best results
+precomputed, so no lookup ranks more than SCAN_LIMIT entries. Entries are
+weighted by units sold (searches, for queries) over SUGGEST_WINDOW_DAYS.
+
+An index is never modified: catalog changes build a new one from the old
+arrays plus the re-read rows and swap it in with a single assignment.
+"""
+import asyncio
+import heapq
+import logging
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from datetime import date, timedelta
+from operator import itemgetter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app import events
+from app.config import settings
+from app.database import SessionLocal, get_engine, upsert
+from app.models.analytics import DailyCategorySales, DailyVariantSales
+from app.models.category import Category
+from app.models.order import OrderStatus
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.models.search import SearchQuery
+
+PRODUCT = "product"
+CATEGORY = "category"
+QUERY = "query"
+
+MAX_RESULTS = 20
+MAX_WORDS = 8
+MAX_KEY_LENGTH = 64
+MAX_QUERY_LENGTH = 100
+SCAN_LIMIT = 256
+LOAD_CHUNK = 1000
+# Sorts after every character a normalized key can contain
+_KEY_END = "\U0010ffff"
+_NOT_SOLD = (OrderStatus.CANCELLED, OrderStatus.REFUNDED)
+
+logger = logging.getLogger(__name__)
+
+class Suggestion(NamedTuple):
+    kind: str
+    id: Optional[object]  # Product id or category id; None for queries
+    text: str
+    slug: Optional[str]
+    weight: int
+
+def normalize(text: str) -> str:
+    """Casefolded, accents stripped, punctuation turned into single spaces"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    cleaned = "".join(
+        char if char.isalnum() else " " for char in decomposed if not unicodedata.combining(char)
+    )
+    return " ".join(cleaned.casefold().split())
+
+def _keys(text: str) -> Set[str]:
+    words = normalize(text).split()[:MAX_WORDS]
+    return {" ".join(words[start:])[:MAX_KEY_LENGTH] for start in range(len(words))}
+
+def _ref(suggestion: Suggestion) -> Tuple[str, object]:
+    return suggestion.kind, suggestion.text if suggestion.id is None else suggestion.id
+
+def _rank(suggestion: Suggestion) -> Tuple[int, int]:
+    # Heavier first; on a tie the shorter text, which is closer to what was typed
+    return suggestion.weight, -len(suggestion.text)
+
+def _best(entries: List[Suggestion], lo: int, hi: int, limit: int) -> Tuple[Suggestion, ...]:
+    """Top `limit` distinct entries of entries[lo:hi]; one entry can sit under several keys"""
+    distinct: Dict[Tuple[str, object], Suggestion] = {}
+    for position in range(lo, hi):
+        entry = entries[position]
+        distinct[_ref(entry)] = entry
+    return tuple(heapq.nlargest(limit, distinct.values(), key=_rank))
+
+def _pairs(suggestions: Iterable[Suggestion]) -> List[Tuple[str, Suggestion]]:
+    return sorted(
+        ((key, suggestion) for suggestion in suggestions for key in _keys(suggestion.text)),
+        key=itemgetter(0),
+    )
+
+class SuggestIndex:
+    def __init__(self, keys: List[str], entries: List[Suggestion], top: Dict[str, Tuple[Suggestion, ...]],
+                 keys_of: Dict[Tuple[str, object], Set[str]]):
+        self._keys = keys
+        self._entries = entries
+        self._top = top
+        self._keys_of = keys_of
+        self.key_count = len(keys)
+        self.precomputed = len(top)
+
+    @classmethod
+    def build(cls, suggestions: Iterable[Suggestion]) -> "SuggestIndex":
+        pairs = _pairs(suggestions)
+        keys = [key for key, _ in pairs]
+        entries = [entry for _, entry in pairs]
+        keys_of: Dict[Tuple[str, object], Set[str]] = {}
+        for key, entry in pairs:
+            keys_of.setdefault(_ref(entry), set()).add(key)
+        top: Dict[str, Tuple[Suggestion, ...]] = {}
+        # Split each oversized range by its next character until every range fits SCAN_LIMIT
+        stack = [(0, len(keys), 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            while lo < hi and len(keys[lo]) == depth:
+                lo += 1
+            while lo < hi:
+                prefix = keys[lo][:depth + 1]
+                end = bisect_left(keys, prefix + _KEY_END, lo, hi)
+                if end - lo > SCAN_LIMIT:
+                    top[prefix] = _best(entries, lo, end, MAX_RESULTS)
+                    stack.append((lo, end, depth + 1))
+                lo = end
+        return cls(keys, entries, top, keys_of)
+
+    def apply(self, removed: Set[Tuple[str, object]], added: List[Suggestion]) -> "SuggestIndex":
+        """A new index without the `removed` refs and with `added` (which replace any entry
+        with the same ref); only the touched prefixes are re-ranked"""
+        removed = set(removed) | {_ref(entry) for entry in added}
+        removed &= self._keys_of.keys()
+        fresh = _pairs(added)
+        keys_of = dict(self._keys_of)
+        touched: Set[str] = set()
+        for ref in removed:
+            touched.update(keys_of.pop(ref))
+        for key, entry in fresh:
+            keys_of.setdefault(_ref(entry), set()).add(key)
+        fresh_keys = [key for key, _ in fresh]
+        fresh_entries = [entry for _, entry in fresh]
+
+        if len(touched) + len(fresh) <= SCAN_LIMIT:
+            # A few edits: memmoves on copies beat re-merging the whole array
+            keys, entries = list(self._keys), list(self._entries)
+            positions = []
+            for ref in removed:
+                for key in self._keys_of[ref]:
+                    position = bisect_left(keys, key)
+                    while _ref(entries[position]) != ref:
+                        position += 1
+                    positions.append(position)
+            for position in sorted(positions, reverse=True):
+                del keys[position]
+                del entries[position]
+            for key, entry in fresh:
+                position = bisect_left(keys, key)
+                keys.insert(position, key)
+                entries.insert(position, entry)
+        else:
+            kept = [(key, entry) for key, entry in zip(self._keys, self._entries) if _ref(entry) not in removed]
+            pairs = list(heapq.merge(kept, fresh, key=itemgetter(0)))
+            keys = [key for key, _ in pairs]
+            entries = [entry for _, entry in pairs]
+        touched.update(fresh_keys)
+
+        top = dict(self._top)
+        seen: Set[str] = set()
+        for key in touched:
+            for length in range(1, len(key) + 1):
+                prefix = key[:length]
+                if prefix in seen:
+                    continue
+                seen.add(prefix)
+                lo = bisect_left(keys, prefix)
+                hi = bisect_left(keys, prefix + _KEY_END, lo)
+                previous = top.get(prefix)
+                if hi - lo > SCAN_LIMIT and previous is not None and not any(
+                    _ref(entry) in removed for entry in previous
+                ):
+                    # Nothing left the old top results, so only the added entries can displace them
+                    fresh_lo = bisect_left(fresh_keys, prefix)
+                    fresh_hi = bisect_left(fresh_keys, prefix + _KEY_END, fresh_lo)
+                    candidates = list(previous) + fresh_entries[fresh_lo:fresh_hi]
+                    top[prefix] = _best(candidates, 0, len(candidates), MAX_RESULTS)
+                elif hi - lo > SCAN_LIMIT:
+                    top[prefix] = _best(entries, lo, hi, MAX_RESULTS)
+                elif top.pop(prefix, None) is None:
+                    # Nothing precomputed here means nothing below it either
+                    break
+        return SuggestIndex(keys, entries, top, keys_of)
+
+    def lookup(self, query: str, limit: int = 10) -> List[Suggestion]:
+        prefix = normalize(query)[:MAX_KEY_LENGTH]
+        if not prefix:
+            return []
+        precomputed = self._top.get(prefix)
+        if precomputed is not None:
+            return list(precomputed[:limit])
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + _KEY_END, lo)
+        return list(_best(self._entries, lo, hi, limit))
+
+def _window_start() -> date:
+    return date.today() - timedelta(days=settings.SUGGEST_WINDOW_DAYS)
+
+def _products(db: Session, product_ids: Optional[List[str]] = None) -> List[Suggestion]:
+    """Active products weighted by units sold in the window (all of them, or just `product_ids`)"""
+    sold = (
+        select(ProductVariant.product_id, func.sum(DailyVariantSales.units).label("units"))
+        .select_from(DailyVariantSales)
+        .join(ProductVariant, ProductVariant.id == DailyVariantSales.product_variant_id)
+        .where(DailyVariantSales.day >= _window_start(), DailyVariantSales.status.notin_(_NOT_SOLD))
+        .group_by(ProductVariant.product_id)
+    )
+    if product_ids is not None:
+        sold = sold.where(ProductVariant.product_id.in_(product_ids))
+    sold = sold.subquery()
+    statement = (
+        select(Product.id, Product.name, Product.slug, sold.c.units)
+        .select_from(Product.__table__.outerjoin(sold, sold.c.product_id == Product.id))
+        .where(Product.is_active == True)  # noqa: E712
+    )
+    if product_ids is not None:
+        statement = statement.where(Product.id.in_(product_ids))
+    return [
+        Suggestion(PRODUCT, product_id, name, slug, 1 + max(int(units or 0), 0))
+        for product_id, name, slug, units in db.execute(statement)
+    ]
+
+def _categories(db: Session, category_ids: Optional[List[int]] = None) -> List[Suggestion]:
+    sold = (
+        select(DailyCategorySales.category_id, func.sum(DailyCategorySales.units).label("units"))
+        .where(DailyCategorySales.day >= _window_start(), DailyCategorySales.status.notin_(_NOT_SOLD))
+        .group_by(DailyCategorySales.category_id)
+        .subquery()
+    )
+    statement = select(Category.id, Category.name, Category.slug, sold.c.units).select_from(
+        Category.__table__.outerjoin(sold, sold.c.category_id == Category.id)
+    )
+    if category_ids is not None:
+        statement = statement.where(Category.id.in_(category_ids))
+    return [
+        Suggestion(CATEGORY, category_id, name, slug, 1 + max(int(units or 0), 0))
+        for category_id, name, slug, units in db.execute(statement)
+    ]
+
+def _queries(db: Session) -> List[Suggestion]:
+    searches = func.sum(SearchQuery.searches)
+    return [
+        Suggestion(QUERY, None, query, None, int(count))
+        for query, count in db.execute(
+            select(SearchQuery.query, searches)
+            .where(SearchQuery.day >= _window_start())
+            .group_by(SearchQuery.query)
+            .having(searches >= settings.SUGGEST_QUERY_MIN_SEARCHES)
+            .order_by(searches.desc())
+            .limit(settings.SUGGEST_MAX_QUERIES)
+        )
+    ]
+
+def build_index(db: Session) -> SuggestIndex:
+    products = []
+    last_id = ""
+    while True:
+        ids = db.execute(
+            select(Product.id).where(Product.id > last_id).order_by(Product.id).limit(LOAD_CHUNK)
+        ).scalars().all()
+        if not ids:
+            break
+        products.extend(_products(db, ids))
+        last_id = ids[-1]
+    categories = _categories(db)
+    # A search that is exactly a product or category name adds nothing over the linked entry
+    names = {normalize(entry.text) for entry in products + categories}
+    queries = [entry for entry in _queries(db) if entry.text not in names]
+    return SuggestIndex.build(products + categories + queries)
+
+class Suggester:
+    """Keeps this worker's index current and records searches for the popular-query list.
+
+    Product and category events only mark ids dirty; every
+    SUGGEST_REFRESH_INTERVAL_SECONDS the dirty rows are re-read and applied to the
+    index. A full rebuild every SUGGEST_RESYNC_SECONDS picks up new sales weights
+    and popular searches.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._products: Set[str] = set()
+        self._categories: Set[int] = set()
+        self._searches: Counter = Counter()
+        self._index: Optional[SuggestIndex] = None
+        self._built_at = 0.0
+        self._pruned_on: Optional[date] = None
+        self._stopping = asyncio.Event()
+
+    def suggest(self, query: str, limit: int) -> List[Suggestion]:
+        """Best matches for a typed prefix; empty until the first build finishes"""
+        index = self._index
+        return index.lookup(query, limit) if index is not None else []
+
+    def record_search(self, query: str) -> None:
+        query = normalize(query)
+        if 2 <= len(query) <= MAX_QUERY_LENGTH:
+            with self._lock:
+                self._searches[query] += 1
+
+    def mark_products(self, payload: dict) -> None:
+        with self._lock:
+            self._products.update(payload.get("product_ids") or ())
+
+    def mark_categories(self, payload: dict) -> None:
+        with self._lock:
+            self._categories.update(c for c in payload.get("category_ids") or () if c is not None)
+
+    def _flush_searches(self, db: Session) -> None:
+        with self._lock:
+            searches, self._searches = self._searches, Counter()
+        today = date.today()
+        if not searches and self._pruned_on == today:
+            return
+        try:
+            upsert(db, SearchQuery, [
+                {"day": today, "query": query, "searches": count} for query, count in searches.items()
+            ], ["searches"], increment=True)
+            if self._pruned_on != today:
+                db.execute(delete(SearchQuery).where(SearchQuery.day < _window_start()))
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._searches.update(searches)
+            raise
+        self._pruned_on = today
+
+    def _apply_dirty(self, db: Session) -> None:
+        with self._lock:
+            products, categories = self._products, self._categories
+            self._products, self._categories = set(), set()
+        if not products and not categories:
+            return
+        try:
+            product_ids = sorted(products)
+            added = []
+            for start in range(0, len(product_ids), LOAD_CHUNK):
+                added.extend(_products(db, product_ids[start:start + LOAD_CHUNK]))
+            if categories:
+                added.extend(_categories(db, sorted(categories)))
+        except Exception:
+            # Put the work back so the next tick retries it
+            with self._lock:
+                self._products.update(products)
+                self._categories.update(categories)
+            raise
+        removed = {(PRODUCT, product_id) for product_id in products}
+        removed.update((CATEGORY, category_id) for category_id in categories)
+        self._index = self._index.apply(removed, added)
+
+    def _save_searches(self) -> None:
+        db = SessionLocal()
+        try:
+            self._flush_searches(db)
+        finally:
+            db.close()
+
+    def _refresh(self) -> None:
+        db = SessionLocal()
+        try:
+            self._flush_searches(db)
+            now = time.monotonic()
+            if self._index is None or now - self._built_at >= settings.SUGGEST_RESYNC_SECONDS:
+                # Marks arriving during the build are applied on the next tick
+                with self._lock:
+                    self._products, self._categories = set(), set()
+                started = time.perf_counter()
+                self._index, self._built_at = build_index(db), now
+                logger.info(
+                    "Built search suggestions: %d keys in %.1f ms",
+                    self._index.key_count, (time.perf_counter() - started) * 1000,
+                )
+            else:
+                self._apply_dirty(db)
+        finally:
+            db.close()
+
+    async def run(self) -> None:
+        get_engine()
+        while not self._stopping.is_set():
+            try:
+                await run_in_threadpool(self._refresh)
+            except Exception:
+                logger.exception("Search suggestion refresh failed")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), settings.SUGGEST_REFRESH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+        # Keep the searches counted since the last tick
+        try:
+            await run_in_threadpool(self._save_searches)
+        except Exception:
+            logger.exception("Saving search counts failed")
+
+    async def stop(self) -> None:
+        self._stopping.set()
+
+suggester = Suggester()
+# Every worker keeps its own index, so the marks also come from other workers
+events.subscribe(events.PRODUCT_CHANGED, suggester.mark_products, remote=True)
+events.subscribe(events.CATEGORY_CHANGED, suggester.mark_categories, remote=True)
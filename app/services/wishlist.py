@@ -0,0 +1,27 @@
+from typing import FrozenSet
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app import events
+from app.cache import TTLCache
+from app.models.cart import Wishlist
+
+# user_id -> frozenset of wishlisted product ids. Entries are dropped on every
+# change; the TTL only bounds staleness if an invalidation is ever missed.
+_membership = TTLCache(maxsize=100_000, ttl=300)
+
+def membership(db: Session, user_id: str) -> FrozenSet[str]:
+    """Product ids on a user's wishlist, served from cache after the first lookup"""
+    return _membership.get_or_load(
+        user_id,
+        lambda: frozenset(
+            db.execute(select(Wishlist.product_id).where(Wishlist.user_id == user_id)).scalars()
+        ),
+    )
+
+@events.subscribe(events.WISHLIST_CHANGED, remote=True)
+def _invalidate(payload: dict) -> None:
+    _membership.delete(payload["user_id"])
+
+def changed(user_id: str) -> None:
+    """Announce a committed wishlist change so cached memberships are dropped"""
+    events.publish(events.WISHLIST_CHANGED, {"user_id": user_id})
@@ -0,0 +1,277 @@
+"""Read-only catalog snapshot shared by every worker process through mmap.
+
+Layout (little endian):
+    header | blob (slugs + pre-serialized product JSON + categories JSON)
+           | slug index | id index
+
+Every index is a sorted array of fixed-size entries, so lookups are a binary
+search over the mapped pages and nothing is decoded until a record is served.
+The OS page cache holds one copy of the file for all workers.
+
+Only product detail and categories are served from it. Stock and `is_active`
+change with every order and admin toggle, so they are left out of the file and
+read from the database per request (see `with_live_fields`); stock changes
+therefore never trigger a rebuild.
+"""
+import asyncio
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+from starlette.concurrency import run_in_threadpool
+from app import events
+from app.config import settings
+from app.database import SessionLocal, get_engine
+from app.warmup import register_warmup
+from app.models.category import Category
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"JORACAT2"
+# magic, version, built_at, products, categories offset/length, slug/id index offsets
+HEADER = struct.Struct("<8sQdIQIQQ")
+SLUG_ENTRY = struct.Struct("<QIQI")  # slug offset/length, product JSON offset/length
+ID_ENTRY = struct.Struct("<36sQI")  # product id, product JSON offset/length
+# Left out of product JSON; with_live_fields fills them in from the database
+VOLATILE_FIELDS = {"is_active": True, "variants": {"__all__": {"stock_quantity"}}}
+
+class CatalogSnapshot:
+    """One mapped snapshot file. Lookups return memoryviews into the mapping."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            stat = os.fstat(f.fileno())
+        self.identity = (stat.st_ino, stat.st_mtime_ns)
+        self._view = memoryview(self._mm)
+        (magic, self.version, self.built_at, self.products,
+         self._categories_off, self._categories_len,
+         self._slug_off, self._id_off) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+
+    def _search(self, entry: struct.Struct, base: int, count: int, key_of, key):
+        low, high = 0, count
+        while low < high:
+            mid = (low + high) // 2
+            fields = entry.unpack_from(self._mm, base + mid * entry.size)
+            current = key_of(fields)
+            if current == key:
+                return fields
+            if current < key:
+                low = mid + 1
+            else:
+                high = mid
+        return None
+
+    def product_by_slug(self, slug: str) -> Optional[memoryview]:
+        found = self._search(
+            SLUG_ENTRY, self._slug_off, self.products,
+            lambda fields: self._mm[fields[0]:fields[0] + fields[1]], slug.encode(),
+        )
+        return self._view[found[2]:found[2] + found[3]] if found else None
+
+    def slugs(self) -> Iterator[str]:
+        for i in range(self.products):
+            offset, length, _, _ = SLUG_ENTRY.unpack_from(self._mm, self._slug_off + i * SLUG_ENTRY.size)
+            yield self._mm[offset:offset + length].decode()
+
+    def product_by_id(self, product_id: str) -> Optional[memoryview]:
+        found = self._search(
+            ID_ENTRY, self._id_off, self.products, lambda fields: fields[0], product_id.encode(),
+        )
+        return self._view[found[1]:found[1] + found[2]] if found else None
+
+    def categories(self) -> memoryview:
+        return self._view[self._categories_off:self._categories_off + self._categories_len]
+
+def build(db: Session, path: str) -> dict:
+    """Write a new snapshot next to `path` and atomically replace it"""
+    from app.schemas import CategoryResponse, ProductResponse
+
+    started = time.perf_counter()
+    blob = bytearray()
+    slugs: List[Tuple[bytes, int, int]] = []
+    ids: List[Tuple[bytes, int, int]] = []
+
+    def append(data: bytes) -> int:
+        offset = HEADER.size + len(blob)
+        blob.extend(data)
+        return offset
+
+    products = db.execute(
+        select(Product).options(selectinload(Product.variants)).order_by(Product.id)
+        .execution_options(yield_per=500)
+    ).scalars()
+    for product in products:
+        data = ProductResponse.model_validate(product).model_dump_json(exclude=VOLATILE_FIELDS).encode()
+        offset = append(data)
+        slugs.append((product.slug.encode(), offset, len(data)))
+        ids.append((product.id.encode(), offset, len(data)))
+
+    categories = db.execute(select(Category).order_by(Category.display_order)).scalars().all()
+    categories_data = b"[" + b",".join(
+        CategoryResponse.model_validate(category).model_dump_json().encode() for category in categories
+    ) + b"]"
+    categories_off = append(categories_data)
+
+    slug_offsets = {}
+    for slug, _, _ in slugs:
+        slug_offsets[slug] = append(slug)
+
+    index = bytearray()
+    slug_off = HEADER.size + len(blob)
+    for slug, offset, length in sorted(slugs):
+        index += SLUG_ENTRY.pack(slug_offsets[slug], len(slug), offset, length)
+    id_off = slug_off + len(index)
+    for product_id, offset, length in sorted(ids):
+        index += ID_ENTRY.pack(product_id, offset, length)
+
+    version = time.time_ns()
+    header = HEADER.pack(
+        MAGIC, version, time.time(), len(ids),
+        categories_off, len(categories_data), slug_off, id_off,
+    )
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".catalog-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(blob)
+            f.write(index)
+            f.flush()
+            os.fsync(f.fileno())
+        # Readers still holding the old mapping keep the old inode until they swap
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    return {
+        "version": version,
+        "products": len(ids),
+        "bytes": len(header) + len(blob) + len(index),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+def with_live_fields(db: Session, data: memoryview) -> Optional[dict]:
+    """Snapshot product JSON with `is_active` and per-variant stock from the database.
+
+    Variants deleted since the build are dropped; None when the product itself is gone.
+    """
+    product = json.loads(bytes(data))
+    products = Product.__table__
+    variants = ProductVariant.__table__
+    rows = db.execute(
+        select(products.c.is_active, variants.c.id, variants.c.stock_quantity)
+        .select_from(products.outerjoin(variants, variants.c.product_id == products.c.id))
+        .where(products.c.id == product["id"])
+    ).all()
+    if not rows:
+        return None
+    stock = {variant_id: quantity for _, variant_id, quantity in rows if variant_id is not None}
+    product["is_active"] = bool(rows[0].is_active)
+    product["variants"] = [
+        {**variant, "stock_quantity": stock[variant["id"]]}
+        for variant in product["variants"] if variant["id"] in stock
+    ]
+    return product
+
+_current: Optional[CatalogSnapshot] = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+def current() -> Optional[CatalogSnapshot]:
+    """The newest published snapshot, or None when disabled or not built yet.
+
+    The file is re-stat'ed at most once per SNAPSHOT_CHECK_INTERVAL_SECONDS; a new
+    inode means another process published a new version.
+    """
+    global _current, _checked_at
+    if not settings.SNAPSHOT_ENABLED:
+        return None
+    now = time.monotonic()
+    if now - _checked_at < settings.SNAPSHOT_CHECK_INTERVAL_SECONDS:
+        return _current
+    with _lock:
+        if now - _checked_at < settings.SNAPSHOT_CHECK_INTERVAL_SECONDS:
+            return _current
+        _checked_at = now
+        try:
+            stat = os.stat(settings.SNAPSHOT_PATH)
+        except FileNotFoundError:
+            _current = None
+            return None
+        if _current is None or _current.identity != (stat.st_ino, stat.st_mtime_ns):
+            try:
+                _current = CatalogSnapshot(settings.SNAPSHOT_PATH)
+            except (OSError, ValueError, struct.error):
+                logger.exception("Could not map catalog snapshot %s", settings.SNAPSHOT_PATH)
+    return _current
+
+@register_warmup
+def _map_snapshot(db: Session) -> None:
+    current()
+
+def invalidate() -> None:
+    """Force the next lookup to re-check the file (after publishing in this process)"""
+    global _checked_at
+    _checked_at = 0.0
+
+class SnapshotPublisher:
+    """Rebuilds the snapshot in the background after product and category writes.
+
+    Writes only mark it dirty; at most one rebuild runs per
+    SNAPSHOT_REBUILD_INTERVAL_SECONDS, in whichever worker saw the write.
+    """
+
+    def __init__(self):
+        self._dirty = threading.Event()
+        self._stopping = asyncio.Event()
+
+    def mark(self, payload: dict) -> None:
+        self._dirty.set()
+
+    def _publish(self) -> None:
+        db = SessionLocal()
+        try:
+            stats = build(db, settings.SNAPSHOT_PATH)
+        finally:
+            db.close()
+        invalidate()
+        logger.info("Published catalog snapshot %(version)s: %(products)s products in %(elapsed_ms)s ms", stats)
+
+    async def run(self) -> None:
+        get_engine()
+        if not os.path.exists(settings.SNAPSHOT_PATH):
+            self._dirty.set()
+        while not self._stopping.is_set():
+            if self._dirty.is_set():
+                self._dirty.clear()
+                try:
+                    await run_in_threadpool(self._publish)
+                except Exception:
+                    self._dirty.set()
+                    logger.exception("Catalog snapshot rebuild failed")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), settings.SNAPSHOT_REBUILD_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self) -> None:
+        self._stopping.set()
+
+publisher = SnapshotPublisher()
+events.subscribe(events.PRODUCT_CHANGED, publisher.mark)
+events.subscribe(events.CATEGORY_CHANGED, publisher.mark)
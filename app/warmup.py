@@ -0,0 +1,52 @@
+import logging
+import time
+from typing import Callable, List
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal, get_engine
+
+logger = logging.getLogger(__name__)
+
+WarmupHook = Callable[[Session], None]
+
+_hooks: List[WarmupHook] = []
+
+def register_warmup(hook: WarmupHook) -> WarmupHook:
+    """Register a function that pre-populates a cache during startup warm-up"""
+    _hooks.append(hook)
+    return hook
+
+def warm_pool(connections: int) -> None:
+    """Open pool connections up front so the first requests don't pay for them"""
+    engine = get_engine()
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = engine.connect()
+            conn.execute(text("SELECT 1"))
+            opened.append(conn)
+    finally:
+        for conn in opened:
+            conn.close()
+
+def run_warmup() -> None:
+    """Warm the connection pool and run every registered cache hook"""
+    warm_pool(settings.WARMUP_POOL_CONNECTIONS)
+    
+    db = SessionLocal()
+    try:
+        for hook in _hooks:
+            started = time.perf_counter()
+            try:
+                hook(db)
+            except Exception:
+                logger.exception("Warm-up hook %s failed", hook.__name__)
+                db.rollback()
+                continue
+            logger.info(
+                "Warm-up hook %s finished in %.1f ms",
+                hook.__name__, (time.perf_counter() - started) * 1000
+            )
+    finally:
+        db.close()
@@ -0,0 +1 @@
+# Empty __init__.py for workers package
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import SessionLocal, get_engine
+from app.integrations import Transport, TransportError, build_transports
+from app.services import outbox
+
+logger = logging.getLogger(__name__)
+
+def _claim(limit: int, integrations: List[str]) -> List[dict]:
+    db = SessionLocal()
+    try:
+        return outbox.claim(db, limit, settings.OUTBOX_LEASE_SECONDS, integrations)
+    finally:
+        db.close()
+
+def _record(messages: List[dict], results: List[Optional[Exception]]) -> Dict[str, int]:
+    db = SessionLocal()
+    try:
+        return outbox.record_results(db, messages, results)
+    finally:
+        db.close()
+
+class OutboxDispatcher:
+    """Drains the outbox with bounded concurrency per integration.
+    
+    Each poll claims a batch of due messages, groups them by integration, splits
+    each group into transport-sized batches and sends them concurrently, with at
+    most OUTBOX_CONCURRENCY[integration] batches in flight per integration.
+    Only integrations with a transport are claimed. Transports are closed when
+    `run` returns, after the last in-flight batch.
+    """
+    
+    def __init__(self, transports: Optional[Dict[str, Transport]] = None):
+        self.transports = build_transports() if transports is None else transports
+        self._limits = {
+            name: asyncio.Semaphore(settings.OUTBOX_CONCURRENCY.get(name, 1))
+            for name in self.transports
+        }
+        self._stopping = asyncio.Event()
+    
+    async def _deliver(self, transport: Transport, batch: List[dict]) -> None:
+        async with self._limits[transport.name]:
+            try:
+                results = await transport.send_batch(batch)
+            except Exception as exc:
+                logger.warning("%s batch of %d failed: %s", transport.name, len(batch), exc)
+                results = [exc if isinstance(exc, TransportError) else TransportError(str(exc))] * len(batch)
+        counts = await run_in_threadpool(_record, batch, results)
+        if counts["dead"]:
+            logger.error("%s: %d message(s) dead-lettered", transport.name, counts["dead"])
+    
+    async def run_once(self) -> int:
+        """Claim and deliver one batch; returns the number of messages handled"""
+        messages = await run_in_threadpool(_claim, settings.OUTBOX_BATCH_SIZE, list(self.transports))
+        groups = defaultdict(list)
+        for message in messages:
+            groups[message["integration"]].append(message)
+        
+        tasks = []
+        for name, group in groups.items():
+            transport = self.transports[name]
+            for start in range(0, len(group), transport.max_batch):
+                tasks.append(self._deliver(transport, group[start:start + transport.max_batch]))
+        await asyncio.gather(*tasks)
+        return len(messages)
+    
+    async def run(self) -> None:
+        get_engine()
+        try:
+            while not self._stopping.is_set():
+                try:
+                    handled = await self.run_once()
+                except Exception:
+                    logger.exception("Outbox poll failed")
+                    handled = 0
+                if handled < settings.OUTBOX_BATCH_SIZE:
+                    # Queue drained: wait for the next poll (or shutdown)
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), settings.OUTBOX_POLL_INTERVAL_SECONDS)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            for transport in self.transports.values():
+                await transport.close()
+    
+    async def stop(self) -> None:
+        """Ask `run` to finish; it closes the transports once the current batch is recorded"""
+        self._stopping.set()
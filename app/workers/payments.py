@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import SessionLocal, get_engine, insert_ignore
+from app.models.payment_event import PaymentEvent
+from app.services import payments
+
+logger = logging.getLogger(__name__)
+
+def _insert_events(rows: List[dict]) -> None:
+    db = SessionLocal()
+    try:
+        insert_ignore(db, PaymentEvent, rows)
+        db.commit()
+    finally:
+        db.close()
+
+class WebhookIngestor:
+    """Group-commits webhook events so a burst becomes a few multi-row inserts.
+    
+    Each request waits only until its batch is durable (a few milliseconds),
+    then acknowledges the gateway. Duplicates are dropped by the unique key.
+    """
+    
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        get_engine()
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+    
+    async def submit(self, row: dict) -> None:
+        """Persist one event; raises if the batch could not be written"""
+        if self._queue is None:
+            # Ingestor not running (e.g. a script importing the app): write directly
+            await run_in_threadpool(_insert_events, [row])
+            return
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        await future
+    
+    async def _run(self) -> None:
+        max_batch = settings.WEBHOOK_INGEST_MAX_BATCH
+        max_delay = settings.WEBHOOK_INGEST_MAX_DELAY_MS / 1000
+        while True:
+            batch: List[Tuple[dict, asyncio.Future]] = [await self._queue.get()]
+            if batch[0] is None:
+                return
+            deadline = asyncio.get_running_loop().time() + max_delay
+            while len(batch) < max_batch:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    self._queue.put_nowait(None)
+                    break
+                batch.append(item)
+            
+            try:
+                await run_in_threadpool(_insert_events, [row for row, _ in batch])
+            except Exception as exc:
+                logger.exception("Failed to persist %d webhook event(s)", len(batch))
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+    
+    async def stop(self) -> None:
+        if self._task is not None:
+            await self._queue.put(None)
+            await self._task
+            self._queue = self._task = None
+
+def _process(limit: int) -> int:
+    db = SessionLocal()
+    try:
+        try:
+            return payments.process_batch(db, limit)
+        except Exception:
+            db.rollback()
+            logger.exception("Payment event batch failed; retrying events one by one")
+        
+        handled = 0
+        for _ in range(limit):
+            try:
+                count = payments.process_batch(db, 1)
+            except payments.EventBatchError as exc:
+                db.rollback()
+                # Only the event this attempt claimed; others may be another worker's
+                payments.mark_failed(db, exc.event_ids, str(exc))
+                count = len(exc.event_ids)
+            if not count:
+                break
+            handled += count
+        return handled
+    finally:
+        db.close()
+
+class PaymentEventProcessor:
+    """Applies queued webhook events to orders in batches"""
+    
+    def __init__(self):
+        self._stopping = asyncio.Event()
+    
+    async def run(self) -> None:
+        get_engine()
+        while not self._stopping.is_set():
+            try:
+                handled = await run_in_threadpool(_process, settings.PAYMENT_EVENT_BATCH_SIZE)
+            except Exception:
+                logger.exception("Payment event processing failed")
+                handled = 0
+            if handled < settings.PAYMENT_EVENT_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), settings.PAYMENT_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+    
+    async def stop(self) -> None:
+        self._stopping.set()
+
+ingestor = WebhookIngestor()
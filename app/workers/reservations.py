@@ -0,0 +1,43 @@
+import asyncio
+import logging
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import SessionLocal, get_engine
+from app.services import reservations
+
+logger = logging.getLogger(__name__)
+
+def _sweep() -> int:
+    db = SessionLocal()
+    try:
+        return reservations.sweep(db, settings.RESERVATION_SWEEP_BATCH_SIZE)
+    finally:
+        db.close()
+
+class ReservationSweeper:
+    """Deletes expired stock holds every RESERVATION_SWEEP_INTERVAL_SECONDS.
+    
+    Expired holds already stop counting against stock when they expire, so the
+    sweep only keeps the table small; each pass is a range scan of the expiry
+    index, however many holds are live.
+    """
+    
+    def __init__(self):
+        self._stopping = asyncio.Event()
+    
+    async def run(self) -> None:
+        get_engine()
+        while not self._stopping.is_set():
+            try:
+                removed = await run_in_threadpool(_sweep)
+                if removed:
+                    logger.info("Swept %d expired stock hold(s)", removed)
+            except Exception:
+                logger.exception("Stock hold sweep failed")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), settings.RESERVATION_SWEEP_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def stop(self) -> None:
+        self._stopping.set()
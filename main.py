@@ -1,20 +1,104 @@
+import time
+
+# Taken before any other import so the figure covers router/model imports too
+_import_started = time.perf_counter()
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
+from app import bus
 from app.config import settings
-from app.database import Base, engine
-from app.routes import auth, products, cart, orders, categories, b2b
+from app.database import get_engine
+from app.ratelimit import RateLimitMiddleware
+from app.concurrency import LoadShedMiddleware, build_limiter
+from app.compression import CompressionMiddleware
+from app.warmup import run_warmup
+from app.workers.outbox import OutboxDispatcher
+from app.workers.payments import PaymentEventProcessor, ingestor
+from app.workers.reservations import ReservationSweeper
+from app.services.facets import indexer as facet_indexer
+from app.snapshot import publisher as snapshot_publisher
+from app.services import media
+from app.services.suggest import suggester
+from app.routes import auth, products, catalog, search, cart, checkout, orders, categories, b2b, admin, webhooks, wishlist
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger("jora")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialise resources when a worker starts and release them on shutdown.
+    
+    Schema changes are applied with Alembic (`alembic upgrade head`), never at boot.
+    """
+    engine = get_engine()
+    
+    if settings.WARMUP_ON_STARTUP:
+        await run_in_threadpool(run_warmup)
+    
+    startup_ms = (time.perf_counter() - _import_started) * 1000
+    app.state.startup_ms = round(startup_ms, 1)
+    if startup_ms > settings.STARTUP_TIME_TARGET_MS:
+        logger.warning(
+            "Startup took %.1f ms (target %d ms)", startup_ms, settings.STARTUP_TIME_TARGET_MS
+        )
+    else:
+        logger.info("Startup took %.1f ms", startup_ms)
+    
+    bus.start()
+    ingestor.start()
+    
+    background = []
+    if settings.OUTBOX_WORKER_ENABLED:
+        dispatcher = OutboxDispatcher()
+        background.append((dispatcher, asyncio.create_task(dispatcher.run())))
+    if settings.PAYMENT_WORKER_ENABLED:
+        processor = PaymentEventProcessor()
+        background.append((processor, asyncio.create_task(processor.run())))
+    if settings.RESERVATION_SWEEPER_ENABLED:
+        sweeper = ReservationSweeper()
+        background.append((sweeper, asyncio.create_task(sweeper.run())))
+    background.append((facet_indexer, asyncio.create_task(facet_indexer.run())))
+    background.append((suggester, asyncio.create_task(suggester.run())))
+    if settings.SNAPSHOT_ENABLED:
+        background.append((snapshot_publisher, asyncio.create_task(snapshot_publisher.run())))
+    
+    yield
+    
+    bus.stop()
+    await ingestor.stop()
+    await run_in_threadpool(media.shutdown)
+    for worker, task in background:
+        await worker.stop()
+        await task
+    engine.dispose()
 
 app = FastAPI(
     title="JORA E-commerce API",
     description="Luxury clothing brand e-commerce platform",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    lifespan=lifespan
 )
 
+# Load shedding sits innermost: only requests that pass rate limiting count as in flight
+if settings.LOAD_SHED_ENABLED:
+    app.state.limiter = build_limiter()
+    app.add_middleware(LoadShedMiddleware, limiter=app.state.limiter)
+
+# Rate limiting runs before routing, so throttled requests never open a DB session.
+# Added before CORS so that 429 responses still carry CORS headers.
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
+# Compression wraps everything below it, including 429/503 bodies
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -27,10 +111,20 @@ app.add_middleware(
 # Include routers
 app.include_router(auth.router)
 app.include_router(products.router)
+app.include_router(catalog.router)
+app.include_router(search.router)
 app.include_router(cart.router)
+app.include_router(wishlist.router)
+app.include_router(checkout.router)
 app.include_router(orders.router)
 app.include_router(categories.router)
 app.include_router(b2b.router)
+app.include_router(admin.router)
+app.include_router(webhooks.router)
+
+# Uploaded media is content addressed, so a file at a given URL never changes
+if settings.MEDIA_URL.startswith("/"):
+    app.mount(settings.MEDIA_URL, StaticFiles(directory=settings.MEDIA_ROOT, check_dir=False), name="media")
 
 @app.get("/")
 async def root():
@@ -38,8 +132,13 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    limiter = getattr(app.state, "limiter", None)
+    return {
+        "status": "healthy",
+        "startup_ms": getattr(app.state, "startup_ms", None),
+        "concurrency": limiter.snapshot() if limiter else None,
+    }
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    from app.server import serve
+    serve(host="0.0.0.0", port=8000)
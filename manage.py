@@ -0,0 +1,482 @@
+"""Operational commands: python manage.py <command> [options]"""
+import argparse
+from app.database import SessionLocal, get_engine
+import app.models  # noqa: F401  Register every model before running queries
+
+def serve(args):
+    from app.server import serve as run_server
+    
+    run_server(host=args.host, port=args.port, workers=args.workers)
+
+def backfill_rollups(args):
+    from app.services import rollups
+    
+    get_engine()
+    db = SessionLocal()
+    try:
+        windows = rollups.rebuild(
+            db,
+            chunk_days=args.chunk_days,
+            progress=lambda start, end: print(f"Rolled up {start:%Y-%m-%d} .. {end:%Y-%m-%d}")
+        )
+    finally:
+        db.close()
+    print(f"Rebuilt sales rollups in {windows} chunk(s)")
+
+def rebuild_facets(args):
+    from app.services import facets
+    
+    get_engine()
+    db = SessionLocal()
+    try:
+        count = facets.rebuild_all(db)
+    finally:
+        db.close()
+    print(f"Rebuilt facet counts for {count} categories (including the whole catalog)")
+
+def rebuild_listing(args):
+    from app.services import listing
+    
+    get_engine()
+    db = SessionLocal()
+    try:
+        count = listing.rebuild(
+            db,
+            chunk_size=args.chunk_size,
+            progress=lambda done: print(f"Refreshed {done} products")
+        )
+    finally:
+        db.close()
+    print(f"Rebuilt the product listing for {count} products")
+
+def build_snapshot(args):
+    from app import snapshot
+    from app.config import settings
+    
+    get_engine()
+    db = SessionLocal()
+    try:
+        stats = snapshot.build(db, args.path or settings.SNAPSHOT_PATH)
+    finally:
+        db.close()
+    print(
+        f"Published snapshot {stats['version']}: {stats['products']} products, "
+        f"{stats['bytes'] / 1024:.0f} KiB in {stats['elapsed_ms']} ms"
+    )
+
+def import_bench(args):
+    import io
+    from app.config import settings
+    from app.services.catalog_import import import_catalog
+    
+    sizes = ["S", "M", "L", "XL"]
+    lines = ["slug,name,base_price,sku,size,color,stock_quantity"]
+    for i in range(args.rows):
+        product, size = divmod(i, len(sizes))
+        size = sizes[size]
+        lines.append(f"bench-{product},Bench product {product},999,BENCH-{product}-{size},{size},Black,{i % 50}")
+    upload = "\n".join(lines).encode()
+    
+    get_engine()
+    db = SessionLocal()
+    try:
+        # The second pass hits existing slugs/skus, i.e. the update path
+        for label in ("insert", "update"):
+            report = import_catalog(db, io.BytesIO(upload), "csv", args.batch_size or settings.IMPORT_BATCH_SIZE)
+            print(
+                f"{label}: {report['rows_imported']}/{report['rows_total']} rows in {report['elapsed_ms']:.0f} ms, "
+                f"{report['rows_per_second']:.0f} rows/s, {report['error_count']} error(s)"
+            )
+    finally:
+        db.close()
+
+def _proportional_rss_kib() -> int:
+    # Pss splits shared pages between the processes mapping them
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                return int(line.split()[1])
+    return 0
+
+def _bench_worker(mode: str, path: str, rounds: int, results):
+    import json
+    from app.snapshot import CatalogSnapshot
+    
+    baseline = _proportional_rss_kib()
+    snap = CatalogSnapshot(path)
+    slugs = list(snap.slugs())
+    if mode == "dict":
+        # What each worker holds today with a per-process catalog cache
+        cache = {slug: json.loads(bytes(snap.product_by_slug(slug))) for slug in slugs}
+        lookup = cache.__getitem__
+    else:
+        lookup = snap.product_by_slug
+    for _ in range(rounds):
+        for slug in slugs:
+            lookup(slug)
+    results.put(_proportional_rss_kib() - baseline)
+
+def snapshot_bench(args):
+    import multiprocessing
+    from app.config import settings
+    
+    path = args.path or settings.SNAPSHOT_PATH
+    context = multiprocessing.get_context("fork")
+    for mode in ("dict", "mmap"):
+        results = context.Queue()
+        workers = [
+            context.Process(target=_bench_worker, args=(mode, path, args.rounds, results))
+            for _ in range(args.workers)
+        ]
+        for worker in workers:
+            worker.start()
+        growth = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        print(
+            f"{mode:>4}: {args.workers} workers, catalog memory per worker "
+            f"{sum(growth) / len(growth) / 1024:.1f} MiB (Pss), total {sum(growth) / 1024:.1f} MiB"
+        )
+
+def _bench_pincodes(path):
+    if path:
+        # Any file with one pincode per line, e.g. the India Post directory exported as CSV
+        with open(path) as f:
+            found = (
+                "".join(char for char in line.split(",")[0] if char.isdigit())
+                for line in f
+            )
+            return sorted({pincode for pincode in found if len(pincode) == 6})
+    # ~19k pincodes spread over the allocated range (110001-855999)
+    step = (855999 - 110001) / 19000
+    return [str(int(110001 + i * step)) for i in range(19000)]
+
+def shipping_bench(args):
+    import time
+    from decimal import Decimal
+    from app.services import shipping_rules
+    
+    get_engine()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        index = shipping_rules.compile_rules(db)
+        compile_ms = (time.perf_counter() - started) * 1000
+    finally:
+        db.close()
+    
+    pincodes = _bench_pincodes(args.pincodes)
+    price = Decimal("1499.00")
+    timings = []
+    covered = 0
+    for _ in range(args.rounds):
+        for pincode in pincodes:
+            started = time.perf_counter_ns()
+            zone = index.zone(pincode)
+            index.tax_rate("Maharashtra", price)
+            timings.append(time.perf_counter_ns() - started)
+            covered += zone is not None
+    timings.sort()
+    print(
+        f"Compiled {index.zone_count} zones / {index.prefix_count} prefixes in {compile_ms:.1f} ms; "
+        f"{len(pincodes)} pincodes x {args.rounds} rounds, {covered / len(timings):.1%} in a zone"
+    )
+    print(
+        f"zone + tax lookup: p50 {timings[len(timings) // 2] / 1000:.2f} us, "
+        f"p99 {timings[int(len(timings) * 0.99)] / 1000:.2f} us, max {timings[-1] / 1000:.2f} us"
+    )
+
+def suggest_bench(args):
+    import random
+    import time
+    from sqlalchemy import select
+    from app.models import Product
+    from app.services import suggest
+    
+    if args.synthetic:
+        # Made-up catalog of three-word names with long-tailed sales
+        rng = random.Random(7)
+        words = ["linen", "silk", "cotton", "wool", "denim", "velvet", "satin", "cashmere", "classic",
+                 "slim", "relaxed", "cropped", "pleated", "wrap", "midi", "maxi", "oversized", "tailored"]
+        garments = ["shirt", "dress", "kurta", "saree", "blazer", "trousers", "skirt", "jacket", "top",
+                    "shorts", "coat", "jumpsuit", "lehenga", "sherwani", "scarf", "tunic"]
+        entries = [
+            suggest.Suggestion(
+                suggest.PRODUCT, f"p{i}", f"{rng.choice(words).title()} {rng.choice(words).title()} "
+                f"{rng.choice(garments).title()} {i}", f"p-{i}", 1 + int(rng.paretovariate(1.2))
+            )
+            for i in range(args.synthetic)
+        ]
+        started = time.perf_counter()
+        index = suggest.SuggestIndex.build(entries)
+        build_ms = (time.perf_counter() - started) * 1000
+        names = [entry.text for entry in entries]
+    else:
+        get_engine()
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            index = suggest.build_index(db)
+            build_ms = (time.perf_counter() - started) * 1000
+            names = db.execute(select(Product.name).where(Product.is_active == True)).scalars().all()  # noqa: E712
+        finally:
+            db.close()
+    
+    # What a shopper types on the way to each name: every prefix up to 12 characters
+    prefixes = [name[:length] for name in names for length in range(1, min(len(name), 12) + 1)]
+    if not prefixes:
+        print("Nothing to suggest; the catalog is empty (try --synthetic 50000)")
+        return
+    timings = []
+    for _ in range(args.rounds):
+        for prefix in prefixes:
+            started = time.perf_counter_ns()
+            index.lookup(prefix, args.limit)
+            timings.append(time.perf_counter_ns() - started)
+    timings.sort()
+    print(
+        f"Built {index.key_count} keys ({index.precomputed} precomputed prefixes) in {build_ms:.1f} ms; "
+        f"{len(prefixes)} prefixes x {args.rounds} rounds"
+    )
+    print(
+        f"suggest lookup: p50 {timings[len(timings) // 2] / 1000:.2f} us, "
+        f"p99 {timings[int(len(timings) * 0.99)] / 1000:.2f} us, max {timings[-1] / 1000:.2f} us"
+    )
+
+def purge_revoked(args):
+    from app.services import revocation
+    
+    get_engine()
+    db = SessionLocal()
+    try:
+        count = revocation.purge_expired(db)
+    finally:
+        db.close()
+    print(f"Purged {count} expired revoked-token row(s)")
+
+def prune_changes(args):
+    from app.config import settings
+    from app.services import changelog
+    
+    get_engine()
+    db = SessionLocal()
+    try:
+        count = changelog.prune(db, args.days or settings.CHANGE_FEED_RETENTION_DAYS)
+    finally:
+        db.close()
+    print(f"Pruned {count} catalog change(s)")
+
+def generate_feeds(args):
+    from app.services import feeds
+    
+    get_engine()
+    db = SessionLocal()
+    try:
+        stats = feeds.generate(db, args.output, full=args.full)
+    finally:
+        db.close()
+    print(
+        f"Feeds at change version {stats['version']}: rewrote {len(stats['rewritten'])} of {stats['chunks']} "
+        f"chunk(s), {stats['products']} products / {stats['items']} items in {stats['elapsed_ms']} ms"
+    )
+
+def outbox_worker(args):
+    import asyncio
+    import logging
+    from app.workers.outbox import OutboxDispatcher
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    try:
+        # run() closes the transports however it exits (Ctrl-C cancels it)
+        asyncio.run(OutboxDispatcher().run())
+    except KeyboardInterrupt:
+        pass
+
+def requeue_dead(args):
+    from app.services import outbox
+    
+    get_engine()
+    db = SessionLocal()
+    try:
+        count = outbox.requeue_dead(db, args.ids or None)
+    finally:
+        db.close()
+    print(f"Requeued {count} dead-lettered message(s)")
+
+def webhook_burst(args):
+    import asyncio
+    import random
+    import time
+    import httpx
+    from app.integrations import webhook_samples
+    
+    order_ids = args.order_id or ["00000000-0000-0000-0000-000000000000"]
+    deliveries = []
+    for _ in range(args.events):
+        order_id = random.choice(order_ids)
+        if args.provider == "razorpay":
+            delivery = webhook_samples.signed_razorpay(
+                webhook_samples.razorpay_event("payment.captured", order_id)
+            )
+        else:
+            delivery = webhook_samples.signed_stripe(
+                webhook_samples.stripe_event("payment_intent.succeeded", order_id)
+            )
+        deliveries.append(delivery)
+        # Gateways redeliver the same event when they don't see a fast 2xx
+        if random.random() < args.duplicate_rate:
+            deliveries.append(delivery)
+    random.shuffle(deliveries)
+    
+    url = f"{args.base_url.rstrip('/')}/api/webhooks/{args.provider}"
+    latencies = []
+    statuses = {}
+    
+    async def run():
+        limit = asyncio.Semaphore(args.concurrency)
+        async with httpx.AsyncClient(timeout=30) as client:
+            async def send(body, headers):
+                async with limit:
+                    started = time.perf_counter()
+                    response = await client.post(url, content=body, headers=headers)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            await asyncio.gather(*(send(body, headers) for body, headers in deliveries))
+    
+    started = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+    print(f"Sent {len(deliveries)} deliveries in {elapsed:.2f}s ({len(deliveries) / elapsed:.0f}/s)")
+    print(f"Status codes: {statuses}")
+    print(f"Latency ms: p50={pct(0.5):.1f} p95={pct(0.95):.1f} p99={pct(0.99):.1f} max={latencies[-1]:.1f}")
+
+def payload_bench(args):
+    import statistics
+    import time
+    import httpx
+    from app.compression import brotli
+    
+    page = {"limit": args.limit}
+    variants = {
+        "full": page,
+        "sparse": {
+            **page,
+            "fields": "name,slug,base_price,discount_percentage",
+            "include": "variants.price_override,variants.images",
+        },
+    }
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+    
+    print(f"{'payload':<8} {'encoding':<9} {'bytes':>9} {'p50 ms':>8} {'est. ms @ ' + str(args.mbps) + ' Mbps':>18}")
+    with httpx.Client(base_url=args.base_url) as client:
+        for name, params in variants.items():
+            for encoding in encodings:
+                sizes, latencies = [], []
+                for _ in range(args.requests):
+                    started = time.perf_counter()
+                    response = client.get("/api/products", params=params, headers={"Accept-Encoding": encoding})
+                    response.read()
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    sizes.append(response.num_bytes_downloaded)
+                size = statistics.median(sizes)
+                p50 = statistics.median(latencies)
+                # Transfer time dominates on slow mobile links
+                mobile = p50 + size * 8 / (args.mbps * 1000)
+                print(f"{name:<8} {encoding:<9} {size:>9.0f} {p50:>8.1f} {mobile:>18.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="JORA backend management commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    serve_parser = commands.add_parser("serve", help="Run the API with one pre-forked worker per CPU")
+    serve_parser.add_argument("--host", default="0.0.0.0")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument("--workers", type=int, default=0, help="Defaults to SERVER_WORKERS or the CPU count")
+    serve_parser.set_defaults(handler=serve)
+    
+    rollup_parser = commands.add_parser("backfill-rollups", help="Rebuild sales rollup tables from orders")
+    rollup_parser.add_argument("--chunk-days", type=int, default=7, help="Days aggregated per commit")
+    rollup_parser.set_defaults(handler=backfill_rollups)
+    
+    facets_parser = commands.add_parser("rebuild-facets", help="Recompute facet counts for every category")
+    facets_parser.set_defaults(handler=rebuild_facets)
+    
+    listing_parser = commands.add_parser("rebuild-listing", help="Rebuild the denormalized product listing table")
+    listing_parser.add_argument("--chunk-size", type=int, default=1000, help="Products refreshed per commit")
+    listing_parser.set_defaults(handler=rebuild_listing)
+    
+    snapshot_parser = commands.add_parser("build-snapshot", help="Publish a new catalog snapshot file")
+    snapshot_parser.add_argument("--path", help="Defaults to SNAPSHOT_PATH")
+    snapshot_parser.set_defaults(handler=build_snapshot)
+    
+    import_bench_parser = commands.add_parser(
+        "import-bench", help="Time a synthetic catalog import (writes bench-* products to the database)"
+    )
+    import_bench_parser.add_argument("--rows", type=int, default=20000)
+    import_bench_parser.add_argument("--batch-size", type=int, help="Defaults to IMPORT_BATCH_SIZE")
+    import_bench_parser.set_defaults(handler=import_bench)
+    
+    bench_parser = commands.add_parser(
+        "snapshot-bench", help="Compare per-worker memory of a dict catalog cache vs the mmap snapshot (Linux)"
+    )
+    bench_parser.add_argument("--path", help="Defaults to SNAPSHOT_PATH")
+    bench_parser.add_argument("--workers", type=int, default=4)
+    bench_parser.add_argument("--rounds", type=int, default=3, help="Full passes over every slug per worker")
+    bench_parser.set_defaults(handler=snapshot_bench)
+    
+    shipping_parser = commands.add_parser("shipping-bench", help="Time zone and tax lookups over every pincode")
+    shipping_parser.add_argument("--pincodes", help="File with one pincode per line (default: ~19k synthetic)")
+    shipping_parser.add_argument("--rounds", type=int, default=5)
+    shipping_parser.set_defaults(handler=shipping_bench)
+    
+    suggest_parser = commands.add_parser("suggest-bench", help="Time search suggestions for every typed prefix")
+    suggest_parser.add_argument("--synthetic", type=int, help="Use this many made-up products instead of the catalog")
+    suggest_parser.add_argument("--limit", type=int, default=8)
+    suggest_parser.add_argument("--rounds", type=int, default=3)
+    suggest_parser.set_defaults(handler=suggest_bench)
+    
+    purge_parser = commands.add_parser("purge-revoked-tokens", help="Delete revocations of already expired tokens")
+    purge_parser.set_defaults(handler=purge_revoked)
+    
+    changes_parser = commands.add_parser("prune-catalog-changes", help="Drop change feed entries past retention")
+    changes_parser.add_argument("--days", type=int, help="Defaults to CHANGE_FEED_RETENTION_DAYS")
+    changes_parser.set_defaults(handler=prune_changes)
+    
+    feeds_parser = commands.add_parser("generate-feeds", help="Update product feeds and sitemaps")
+    feeds_parser.add_argument("--output", help="Defaults to FEED_OUTPUT_DIR")
+    feeds_parser.add_argument("--full", action="store_true", help="Regenerate every chunk")
+    feeds_parser.set_defaults(handler=generate_feeds)
+    
+    outbox_parser = commands.add_parser("outbox-worker", help="Drain the notification/shipping outbox")
+    outbox_parser.set_defaults(handler=outbox_worker)
+    
+    requeue_parser = commands.add_parser("outbox-requeue", help="Retry dead-lettered outbox messages")
+    requeue_parser.add_argument("ids", nargs="*", type=int, help="Message ids (default: all dead messages)")
+    requeue_parser.set_defaults(handler=requeue_dead)
+    
+    burst_parser = commands.add_parser("webhook-burst", help="Replay a burst of signed payment webhooks")
+    burst_parser.add_argument("--base-url", default="http://localhost:8000")
+    burst_parser.add_argument("--provider", choices=["razorpay", "stripe"], default="razorpay")
+    burst_parser.add_argument("--events", type=int, default=1000)
+    burst_parser.add_argument("--concurrency", type=int, default=100)
+    burst_parser.add_argument("--duplicate-rate", type=float, default=0.2, help="Share of events delivered twice")
+    burst_parser.add_argument("--order-id", action="append", help="Order ids to reference (repeatable)")
+    burst_parser.set_defaults(handler=webhook_burst)
+    
+    payload_parser = commands.add_parser(
+        "payload-bench", help="Compare full vs sparse product pages, with and without compression"
+    )
+    payload_parser.add_argument("--base-url", default="http://localhost:8000")
+    payload_parser.add_argument("--limit", type=int, default=20, help="Products per page (mobile listings use ~20)")
+    payload_parser.add_argument("--requests", type=int, default=20, help="Requests per combination")
+    payload_parser.add_argument("--mbps", type=float, default=1.6, help="Link speed for the estimated mobile time")
+    payload_parser.set_defaults(handler=payload_bench)
+    
+    args = parser.parse_args()
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
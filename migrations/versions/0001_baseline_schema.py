@@ -0,0 +1,221 @@
+"""baseline schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 19:15:04.961466
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('categories',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('slug', sa.String(length=150), nullable=False),
+    sa.Column('parent_id', sa.Integer(), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('image_url', sa.String(length=500), nullable=True),
+    sa.Column('display_order', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['parent_id'], ['categories.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('categories', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_categories_slug'), ['slug'], unique=True)
+
+    op.create_table('coupons',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('code', sa.String(length=50), nullable=False),
+    sa.Column('discount_type', sa.Enum('PERCENTAGE', 'FIXED', name='discounttype'), nullable=False),
+    sa.Column('discount_value', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('min_order_value', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('max_discount', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('valid_from', sa.DateTime(), nullable=False),
+    sa.Column('valid_until', sa.DateTime(), nullable=False),
+    sa.Column('usage_limit', sa.Integer(), nullable=True),
+    sa.Column('used_count', sa.Integer(), nullable=True),
+    sa.Column('is_active', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('coupons', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_coupons_code'), ['code'], unique=True)
+
+    op.create_table('users',
+    sa.Column('id', mysql.CHAR(length=36), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('first_name', sa.String(length=100), nullable=False),
+    sa.Column('last_name', sa.String(length=100), nullable=False),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('role', sa.Enum('CUSTOMER', 'B2B', 'ADMIN', name='userrole'), nullable=False),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=True)
+
+    op.create_table('addresses',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', mysql.CHAR(length=36), nullable=False),
+    sa.Column('type', sa.Enum('SHIPPING', 'BILLING', name='addresstype'), nullable=False),
+    sa.Column('address_line1', sa.String(length=255), nullable=False),
+    sa.Column('address_line2', sa.String(length=255), nullable=True),
+    sa.Column('city', sa.String(length=100), nullable=False),
+    sa.Column('state', sa.String(length=100), nullable=False),
+    sa.Column('pincode', sa.String(length=10), nullable=False),
+    sa.Column('country', sa.String(length=100), nullable=False),
+    sa.Column('is_default', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('b2b_customers',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', mysql.CHAR(length=36), nullable=False),
+    sa.Column('business_name', sa.String(length=255), nullable=False),
+    sa.Column('gst_number', sa.String(length=20), nullable=True),
+    sa.Column('approval_status', sa.Enum('PENDING', 'APPROVED', 'REJECTED', name='approvalstatus'), nullable=False),
+    sa.Column('discount_tier', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('moq_requirement', sa.Integer(), nullable=True),
+    sa.Column('credit_limit', sa.Numeric(precision=12, scale=2), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('gst_number'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_table('products',
+    sa.Column('id', mysql.CHAR(length=36), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('slug', sa.String(length=300), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('fabric_details', sa.Text(), nullable=True),
+    sa.Column('care_instructions', sa.Text(), nullable=True),
+    sa.Column('base_price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('discount_percentage', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_products_slug'), ['slug'], unique=True)
+
+    op.create_table('orders',
+    sa.Column('id', mysql.CHAR(length=36), nullable=False),
+    sa.Column('order_number', sa.String(length=50), nullable=False),
+    sa.Column('user_id', mysql.CHAR(length=36), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'CONFIRMED', 'PROCESSING', 'SHIPPED', 'DELIVERED', 'CANCELLED', 'REFUNDED', name='orderstatus'), nullable=False),
+    sa.Column('payment_status', sa.Enum('PENDING', 'COMPLETED', 'FAILED', 'REFUNDED', name='paymentstatus'), nullable=False),
+    sa.Column('payment_method', sa.String(length=50), nullable=True),
+    sa.Column('payment_id', sa.String(length=255), nullable=True),
+    sa.Column('subtotal', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('shipping_cost', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('tax_amount', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('discount_amount', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('total_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('shipping_address_id', sa.Integer(), nullable=True),
+    sa.Column('billing_address_id', sa.Integer(), nullable=True),
+    sa.Column('tracking_number', sa.String(length=100), nullable=True),
+    sa.Column('notes', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['billing_address_id'], ['addresses.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['shipping_address_id'], ['addresses.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_orders_order_number'), ['order_number'], unique=True)
+
+    op.create_table('product_variants',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('product_id', mysql.CHAR(length=36), nullable=False),
+    sa.Column('sku', sa.String(length=100), nullable=False),
+    sa.Column('size', sa.String(length=20), nullable=False),
+    sa.Column('color', sa.String(length=50), nullable=False),
+    sa.Column('stock_quantity', sa.Integer(), nullable=False),
+    sa.Column('price_override', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('images', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('product_variants', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_product_variants_sku'), ['sku'], unique=True)
+
+    op.create_table('wishlist',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', mysql.CHAR(length=36), nullable=False),
+    sa.Column('product_id', mysql.CHAR(length=36), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('cart',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', mysql.CHAR(length=36), nullable=False),
+    sa.Column('product_variant_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_variant_id'], ['product_variants.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('order_items',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('order_id', mysql.CHAR(length=36), nullable=False),
+    sa.Column('product_variant_id', sa.Integer(), nullable=True),
+    sa.Column('product_name', sa.String(length=255), nullable=False),
+    sa.Column('variant_details', sa.String(length=255), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('total_price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['product_variant_id'], ['product_variants.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+def downgrade() -> None:
+    op.drop_table('order_items')
+    op.drop_table('cart')
+    op.drop_table('wishlist')
+    with op.batch_alter_table('product_variants', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_product_variants_sku'))
+
+    op.drop_table('product_variants')
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_orders_order_number'))
+
+    op.drop_table('orders')
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_products_slug'))
+
+    op.drop_table('products')
+    op.drop_table('b2b_customers')
+    op.drop_table('addresses')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+
+    op.drop_table('users')
+    with op.batch_alter_table('coupons', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_coupons_code'))
+
+    op.drop_table('coupons')
+    with op.batch_alter_table('categories', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_categories_slug'))
+
+    op.drop_table('categories')
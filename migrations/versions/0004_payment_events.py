@@ -0,0 +1,44 @@
+"""payment events
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 19:15:12.668329
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('payment_events',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('provider', sa.String(length=20), nullable=False),
+    sa.Column('event_id', sa.String(length=255), nullable=False),
+    sa.Column('event_type', sa.String(length=100), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'PROCESSED', 'IGNORED', 'FAILED', name='paymenteventstatus'), nullable=False),
+    sa.Column('order_id', sa.String(length=36), nullable=True),
+    sa.Column('error', sa.String(length=500), nullable=True),
+    sa.Column('received_at', sa.DateTime(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('provider', 'event_id', name='uq_payment_events_provider_event')
+    )
+    with op.batch_alter_table('payment_events', schema=None) as batch_op:
+        batch_op.create_index('ix_payment_events_status', ['status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('payment_events', schema=None) as batch_op:
+        batch_op.drop_index('ix_payment_events_status')
+
+    op.drop_table('payment_events')
@@ -0,0 +1,35 @@
+"""unique wishlist item
+
+Duplicate wishlist rows are collapsed to the oldest one first.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 19:15:15.674114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the oldest row of any duplicate pair so the unique key can be added
+    op.execute(
+        "DELETE FROM wishlist WHERE id NOT IN ("
+        "SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM wishlist GROUP BY user_id, product_id) AS keepers)"
+    )
+    with op.batch_alter_table('wishlist', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_wishlist_user_product', ['user_id', 'product_id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('wishlist', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_wishlist_user_product', type_='unique')
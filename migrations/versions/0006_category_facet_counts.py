@@ -0,0 +1,33 @@
+"""category facet counts
+
+Run `python manage.py rebuild-facets` after upgrading to fill the counts.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 19:15:18.846946
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('category_facets',
+    sa.Column('category_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('facet', sa.String(length=20), nullable=False),
+    sa.Column('value', sa.String(length=50), nullable=False),
+    sa.Column('product_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('category_id', 'facet', 'value')
+    )
+
+def downgrade() -> None:
+    op.drop_table('category_facets')
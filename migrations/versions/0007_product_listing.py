@@ -0,0 +1,50 @@
+"""product listing
+
+Run `python manage.py rebuild-listing` after upgrading to fill the table.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 19:15:21.916975
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('product_listing',
+    sa.Column('product_id', mysql.CHAR(length=36), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('slug', sa.String(length=300), nullable=False),
+    sa.Column('min_price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('discount_percentage', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('total_stock', sa.Integer(), nullable=False),
+    sa.Column('image_url', sa.String(length=500), nullable=True),
+    sa.Column('category_path', sa.String(length=500), nullable=True),
+    sa.Column('color_swatches', sa.String(length=500), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    with op.batch_alter_table('product_listing', schema=None) as batch_op:
+        batch_op.create_index('ix_product_listing_browse', ['is_active', 'category_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_product_listing_price', ['is_active', 'min_price'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('product_listing', schema=None) as batch_op:
+        batch_op.drop_index('ix_product_listing_price')
+        batch_op.drop_index('ix_product_listing_browse')
+
+    op.drop_table('product_listing')
@@ -0,0 +1,38 @@
+"""catalog change log
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 19:15:27.616944
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('catalog_changes',
+    sa.Column('version', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.String(length=36), nullable=False),
+    sa.Column('op', sa.String(length=10), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('version')
+    )
+    with op.batch_alter_table('catalog_changes', schema=None) as batch_op:
+        batch_op.create_index('ix_catalog_changes_changed_at', ['changed_at'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('catalog_changes', schema=None) as batch_op:
+        batch_op.drop_index('ix_catalog_changes_changed_at')
+
+    op.drop_table('catalog_changes')
@@ -0,0 +1,36 @@
+"""media assets
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 19:15:30.115626
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('media_assets',
+    sa.Column('sha256', mysql.CHAR(length=64), nullable=False),
+    sa.Column('content_type', sa.String(length=50), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=False),
+    sa.Column('height', sa.Integer(), nullable=False),
+    sa.Column('original_url', sa.String(length=500), nullable=False),
+    sa.Column('primary_url', sa.String(length=500), nullable=False),
+    sa.Column('derivatives', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+
+def downgrade() -> None:
+    op.drop_table('media_assets')
@@ -0,0 +1,46 @@
+"""shipping zones and tax rules
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 19:15:33.504470
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('shipping_zones',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('pincode_prefixes', sa.JSON(), nullable=False),
+    sa.Column('rate', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('free_above', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('delivery_days', sa.Integer(), nullable=True),
+    sa.Column('cod_available', sa.Boolean(), nullable=True),
+    sa.Column('is_serviceable', sa.Boolean(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('tax_rules',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('state', sa.String(length=100), nullable=True),
+    sa.Column('min_unit_price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('rate', sa.Numeric(precision=5, scale=4), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+def downgrade() -> None:
+    op.drop_table('tax_rules')
+    op.drop_table('shipping_zones')
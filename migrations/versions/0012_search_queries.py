@@ -0,0 +1,30 @@
+"""search queries
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 19:15:36.872717
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('search_queries',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('query', sa.String(length=100), nullable=False),
+    sa.Column('searches', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'query')
+    )
+
+def downgrade() -> None:
+    op.drop_table('search_queries')
@@ -0,0 +1,45 @@
+"""stock reservations
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19 19:15:39.966855
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '0013'
+down_revision: Union[str, None] = '0012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stock_reservations',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', mysql.CHAR(length=36), nullable=False),
+    sa.Column('product_variant_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_variant_id'], ['product_variants.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('stock_reservations', schema=None) as batch_op:
+        batch_op.create_index('ix_stock_reservations_expires_at', ['expires_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_stock_reservations_user_id'), ['user_id'], unique=False)
+        batch_op.create_index('ix_stock_reservations_variant_expires', ['product_variant_id', 'expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('stock_reservations', schema=None) as batch_op:
+        batch_op.drop_index('ix_stock_reservations_variant_expires')
+        batch_op.drop_index(batch_op.f('ix_stock_reservations_user_id'))
+        batch_op.drop_index('ix_stock_reservations_expires_at')
+
+    op.drop_table('stock_reservations')
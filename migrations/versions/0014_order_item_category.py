@@ -0,0 +1,38 @@
+"""order item category
+
+Existing items take their product's current category, which is what the
+rollups attributed them to until now.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19 19:52:10.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0014'
+down_revision: Union[str, None] = '0013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('category_id', sa.Integer(), nullable=True))
+
+    op.execute(
+        "UPDATE order_items SET category_id = ("
+        "SELECT products.category_id FROM product_variants "
+        "JOIN products ON products.id = product_variants.product_id "
+        "WHERE product_variants.id = order_items.product_variant_id)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.drop_column('category_id')
@@ -0,0 +1,52 @@
+"""shipping zone prefixes
+
+Backfilled from each zone's pincode_prefixes. If two zones already share a
+prefix, the older zone (lower id) keeps it. The backfill reads rows, so it
+only runs online; an --sql script leaves the table empty.
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-19 21:04:37.160528
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0015'
+down_revision: Union[str, None] = '0014'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    prefixes = op.create_table('shipping_zone_prefixes',
+    sa.Column('prefix', sa.String(length=6), nullable=False),
+    sa.Column('zone_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['zone_id'], ['shipping_zones.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('prefix')
+    )
+    with op.batch_alter_table('shipping_zone_prefixes', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_shipping_zone_prefixes_zone_id'), ['zone_id'], unique=False)
+
+    if context.is_offline_mode():
+        return
+    zones = sa.table('shipping_zones', sa.column('id', sa.Integer()), sa.column('pincode_prefixes', sa.JSON()))
+    owners = {}
+    for zone_id, zone_prefixes in op.get_bind().execute(
+        sa.select(zones.c.id, zones.c.pincode_prefixes).order_by(zones.c.id)
+    ):
+        for prefix in zone_prefixes or []:
+            owners.setdefault(str(prefix).strip(), zone_id)
+    if owners:
+        op.bulk_insert(prefixes, [{'prefix': prefix, 'zone_id': zone_id} for prefix, zone_id in owners.items()])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('shipping_zone_prefixes', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_shipping_zone_prefixes_zone_id'))
+
+    op.drop_table('shipping_zone_prefixes')
@@ -0,0 +1,30 @@
+import os
+import sys
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Settings load on first use and DATABASE_URL/SECRET_KEY have no defaults, so set them
+# before any test touches settings or the engine; point at a throwaway SQLite database
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(ROOT, "var", "test.db"))
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Sessions on a fresh SQLite database with every table created"""
+    from app.database import Base
+    import app.models  # noqa: F401
+
+    engine = create_engine("sqlite:///" + str(tmp_path / "test.db"))
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
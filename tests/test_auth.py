@@ -0,0 +1,50 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.database import get_db
+from main import app
+
+@pytest.fixture
+def client(session_factory):
+    def override_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_db
+    # No `with`: the lifespan (workers, warm-up) isn't needed for these routes
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+def _login(client) -> dict:
+    user = {"email": "buyer@example.com", "password": "correct-horse", "first_name": "A", "last_name": "B"}
+    client.post("/api/auth/register", json=user)
+    response = client.post("/api/auth/login", json={"email": user["email"], "password": user["password"]})
+    assert response.status_code == 200
+    return response.json()
+
+def _me(client, tokens: dict) -> int:
+    """Status of an authenticated call; a wrong current password answers 400 once the token is accepted"""
+    response = client.post(
+        "/api/auth/change-password",
+        json={"current_password": "wrong", "new_password": "irrelevant-password"},
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    return response.status_code
+
+def test_refresh_token_works_once_and_reuse_revokes_everything(client):
+    first = _login(client)
+    second = client.post("/api/auth/refresh", json={"refresh_token": first["refresh_token"]})
+    assert second.status_code == 200
+
+    reused = client.post("/api/auth/refresh", json={"refresh_token": first["refresh_token"]})
+    assert reused.status_code == 401
+    assert _me(client, second.json()) == 401
+
+def test_logout_revokes_access_tokens(client):
+    tokens = _login(client)
+    assert _me(client, tokens) == 400
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.post("/api/auth/logout", headers=headers).status_code == 204
+    assert _me(client, tokens) == 401
@@ -0,0 +1,88 @@
+import io
+from decimal import Decimal
+import pytest
+from app.models.address import Address, AddressType
+from app.models.b2b import ApprovalStatus, B2BCustomer
+from app.models.order import Order, OrderItem, generate_order_number
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.models.user import User
+from app.services import b2b_orders, shipping_rules
+
+@pytest.fixture
+def buyer(db, monkeypatch):
+    monkeypatch.setattr(shipping_rules, "_index", None)
+    user = User(email="wholesale@example.com", password_hash="x", first_name="A", last_name="B")
+    db.add(user)
+    db.flush()
+    profile = B2BCustomer(user_id=user.id, business_name="Retail Co", approval_status=ApprovalStatus.APPROVED,
+                          discount_tier=Decimal("12.5"), moq_requirement=10)
+    address = Address(user_id=user.id, type=AddressType.SHIPPING, address_line1="1 Main St",
+                      city="Pune", state="Maharashtra", pincode="411001")
+    kurta = Product(name="Kurta", slug="kurta", base_price=999)
+    retired = Product(name="Old Kurta", slug="old-kurta", base_price=999, is_active=False)
+    db.add_all([profile, address, kurta, retired])
+    db.flush()
+    db.add_all([
+        ProductVariant(product_id=kurta.id, sku="K-M", size="M", color="Red", stock_quantity=100),
+        ProductVariant(product_id=kurta.id, sku="K-L", size="L", color="Red", stock_quantity=5),
+        ProductVariant(product_id=retired.id, sku="OLD-M", size="M", color="Red", stock_quantity=100),
+    ])
+    db.commit()
+    return user, profile, address
+
+def _place(db, user, address, csv_text: str) -> dict:
+    return b2b_orders.place_bulk_order(
+        db, user, io.BytesIO(csv_text.encode()), "csv", address.id, address.id, chunk_size=2, max_lines=100
+    )
+
+def test_every_bad_line_is_reported_and_nothing_is_written(db, buyer):
+    user, _, address = buyer
+    with pytest.raises(b2b_orders.BulkOrderError) as exc:
+        _place(db, user, address, (
+            "sku,quantity\n"
+            "K-M,6\n"      # 2: with line 7 makes 12, above the MOQ
+            "NOPE,20\n"    # 3
+            "K-L,12\n"     # 4: only 5 in stock
+            "OLD-M,20\n"   # 5: inactive product
+            "K-M,abc\n"    # 6
+            "K-M,6\n"      # 7
+        ))
+    db.rollback()
+    assert exc.value.status_code == 422
+    assert [(error["line"], error["sku"]) for error in exc.value.errors] == [
+        (3, "NOPE"), (4, "K-L"), (5, "OLD-M"), (6, "K-M"),
+    ]
+    assert exc.value.errors[1]["error"] == "Only 5 in stock"
+    assert db.query(Order).count() == 0
+    assert db.query(ProductVariant).filter_by(sku="K-M").one().stock_quantity == 100
+
+def test_below_moq_is_rejected_per_sku(db, buyer):
+    user, _, address = buyer
+    with pytest.raises(b2b_orders.BulkOrderError) as exc:
+        _place(db, user, address, "sku,quantity\nK-M,9\n")
+    assert exc.value.errors[0]["error"] == "Below the minimum order quantity of 10"
+
+def test_order_beyond_the_remaining_credit_is_refused(db, buyer):
+    user, profile, address = buyer
+    profile.credit_limit = 20000
+    db.add(Order(order_number=generate_order_number(), user_id=user.id, subtotal=15000, total_amount=15000))
+    db.commit()
+
+    with pytest.raises(b2b_orders.BulkOrderError) as exc:
+        _place(db, user, address, "sku,quantity\nK-M,10\n")
+    db.rollback()
+    assert exc.value.status_code == 402
+    assert db.query(Order).count() == 1
+
+def test_tier_price_is_applied_to_every_line(db, buyer):
+    user, _, address = buyer
+    report = _place(db, user, address, "sku,quantity\nK-M,10\nK-M,2\n")
+
+    # 999 less 12.5% is 874.125, rounded half up per unit
+    item = db.query(OrderItem).one()
+    assert item.unit_price == Decimal("874.13")
+    assert item.quantity == 12
+    assert report["subtotal"] == Decimal("874.13") * 12
+    assert report["lines"] == 1 and report["discount_tier"] == 12.5
+    assert db.query(ProductVariant).filter_by(sku="K-M").one().stock_quantity == 88
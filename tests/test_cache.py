@@ -0,0 +1,34 @@
+from app.cache import TTLCache
+
+def test_load_overlapping_an_invalidation_is_not_cached():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    def stale_load():
+        # The write this load raced with commits and invalidates mid-load
+        cache.delete("wishlist:1")
+        return {"old"}
+
+    assert cache.get_or_load("wishlist:1", stale_load) == {"old"}
+    assert cache.get_or_load("wishlist:1", lambda: {"new"}) == {"new"}
+    assert cache.get("wishlist:1") == {"new"}
+
+def test_invalidating_another_key_doesnt_stop_caching():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    def load():
+        cache.delete("wishlist:2")
+        return {"a"}
+
+    cache.get_or_load("wishlist:1", load)
+    assert cache.get("wishlist:1") == {"a"}
+
+def test_load_overlapping_clear_is_not_cached():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    def load():
+        cache.clear()
+        return {"old"}
+
+    cache.get_or_load("wishlist:1", load)
+    assert cache.get("wishlist:1") is None
+    assert not cache._loading
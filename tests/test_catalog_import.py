@@ -0,0 +1,36 @@
+import io
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.services.catalog_import import import_catalog
+
+def _import(db, text: str, fmt: str = "csv") -> dict:
+    return import_catalog(db, io.BytesIO(text.encode()), fmt, batch_size=100)
+
+def test_blank_and_missing_cells_keep_stored_values(db):
+    _import(db, (
+        "slug,name,base_price,description,sku,size,color,stock_quantity,price_override\n"
+        "kurta,Kurta,999,Cotton kurta,K-M-RED,M,Red,12,899\n"
+    ))
+    report = _import(db, (
+        "slug,name,base_price,description,sku,size,color,stock_quantity,price_override\n"
+        "kurta,Kurta,1099,,K-M-RED,M,Red,,\n"
+    ))
+    assert report["error_count"] == 0
+
+    product = db.query(Product).filter_by(slug="kurta").one()
+    variant = db.query(ProductVariant).filter_by(sku="K-M-RED").one()
+    assert float(product.base_price) == 1099
+    assert product.description == "Cotton kurta"
+    assert variant.stock_quantity == 12
+    assert float(variant.price_override) == 899
+
+def test_rows_for_one_slug_are_merged(db):
+    _import(db, (
+        '{"slug": "saree", "name": "Saree", "base_price": 1500, "description": "Silk", "sku": "S-1", "size": "F", "color": "Blue"}\n'
+        '{"slug": "saree", "name": "Saree", "base_price": 1500, "fabric_details": "Banarasi", "sku": "S-2", "size": "F", "color": "Green"}\n'
+    ), fmt="ndjson")
+
+    product = db.query(Product).filter_by(slug="saree").one()
+    assert product.description == "Silk"
+    assert product.fabric_details == "Banarasi"
+    assert db.query(ProductVariant).filter_by(product_id=product.id).count() == 2
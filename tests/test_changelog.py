@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import update
+from app.models.catalog_change import CatalogChange
+from app.models.product import Product
+from app.services import changelog
+
+@pytest.fixture
+def product(db):
+    product = Product(name="Kurta", slug="kurta", base_price=999)
+    db.add(product)
+    db.commit()
+    return product
+
+def _log(db, version: int, entity_id: str, changed_at: datetime = None) -> None:
+    """A change with an explicit version, as a transaction committing out of order would leave it"""
+    db.add(CatalogChange(version=version, entity=changelog.PRODUCT, entity_id=entity_id, op=changelog.UPSERT,
+                         changed_at=changed_at or datetime.utcnow()))
+    db.commit()
+
+def test_page_lists_each_entity_once_with_its_last_change(db, product):
+    changelog.record(db, changelog.PRODUCT, upserts=[product.id, "gone"])
+    changelog.record(db, changelog.PRODUCT, upserts=[product.id], deletes=["gone"])
+    db.commit()
+
+    page = changelog.changes_since(db, 0, 100)
+    assert [(change["id"], change["op"], change["version"]) for change in page["changes"]] == [
+        (product.id, changelog.UPSERT, 3), ("gone", changelog.DELETE, 4),
+    ]
+    assert page["changes"][0]["data"]["slug"] == "kurta"
+    assert page["next_since"] == 4
+    assert not page["has_more"]
+
+def test_upsert_of_a_deleted_product_reads_as_delete(db):
+    changelog.record(db, changelog.PRODUCT, upserts=["missing"])
+    db.commit()
+    [change] = changelog.changes_since(db, 0, 100)["changes"]
+    assert change["op"] == changelog.DELETE
+    assert change["data"] is None
+
+def test_page_stops_before_a_version_that_may_still_commit(db):
+    _log(db, 1, "a")
+    _log(db, 2, "b")
+    _log(db, 4, "d")  # 3 is allocated to a transaction that hasn't committed yet
+
+    page = changelog.changes_since(db, 0, 100)
+    assert [change["id"] for change in page["changes"]] == ["a", "b"]
+    assert page["next_since"] == 2
+    assert changelog.changed_ids(db, 0) == ({changelog.PRODUCT: {"a", "b"}, changelog.CATEGORY: set()}, 2)
+    assert changelog.latest_version(db, settled=True) == 2
+    assert changelog.latest_version(db) == 4
+
+    _log(db, 3, "c")
+    assert changelog.changes_since(db, 2, 100)["next_since"] == 4
+
+def test_old_gap_is_a_rolled_back_transaction(db):
+    _log(db, 1, "a")
+    _log(db, 3, "c")
+    # Older than any transaction may run, so version 2 will never appear
+    db.execute(update(CatalogChange).where(CatalogChange.version == 3)
+               .values(changed_at=datetime.utcnow() - timedelta(hours=1)))
+    db.commit()
+
+    assert changelog.changes_since(db, 0, 100)["next_since"] == 3
+
+def test_since_older_than_the_retained_log_expires(db):
+    for version in (1, 2, 3):
+        _log(db, version, str(version))
+    db.execute(CatalogChange.__table__.delete().where(CatalogChange.version < 3))
+    db.commit()
+
+    assert changelog.changes_since(db, 2, 100)["next_since"] == 3
+    with pytest.raises(changelog.ChangesExpired):
+        changelog.changes_since(db, 1, 100)
@@ -0,0 +1,48 @@
+from app.models.category import Category
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.services import facets
+
+def _product(db, slug: str, category_id, price: int, variants: list) -> Product:
+    product = Product(name=slug, slug=slug, base_price=price, category_id=category_id)
+    db.add(product)
+    db.flush()
+    for size, stock in variants:
+        db.add(ProductVariant(product_id=product.id, sku=f"{slug}-{size}", size=size, color="Red",
+                              stock_quantity=stock))
+    return product
+
+def _counts(db, category_id: int, facet: str) -> dict:
+    return {item["value"]: item["count"] for item in facets.get_facets(db, category_id)[facet]}
+
+def test_counts_match_filters_and_whole_catalog_sums_categories(db):
+    kurtas, sarees = Category(name="Kurtas", slug="kurtas"), Category(name="Sarees", slug="sarees")
+    db.add_all([kurtas, sarees])
+    db.flush()
+    _product(db, "k1", kurtas.id, 900, [("M", 0), ("L", 2)])
+    _product(db, "k2", kurtas.id, 3000, [("M", 0)])
+    _product(db, "s1", sarees.id, 6000, [("M", 1)])
+    _product(db, "loose", None, 500, [("S", 4)])
+    db.commit()
+    facets.rebuild_all(db)
+
+    # size=M returns k1 and k2 without in_stock, although neither has M in stock
+    assert _counts(db, kurtas.id, "size") == {"M": 2, "L": 1}
+    assert _counts(db, kurtas.id, "availability") == {facets.IN_STOCK: 1}
+    assert _counts(db, facets.ALL_CATEGORIES, "size") == {"M": 3, "L": 1, "S": 1}
+    assert _counts(db, facets.ALL_CATEGORIES, "availability") == {facets.IN_STOCK: 3}
+    assert _counts(db, facets.ALL_CATEGORIES, "price") == {"0-1000": 2, "2500-5000": 1, "5000-10000": 1}
+
+def test_refreshing_one_category_updates_the_whole_catalog_row(db):
+    kurtas = Category(name="Kurtas", slug="kurtas")
+    db.add(kurtas)
+    db.flush()
+    product = _product(db, "k1", kurtas.id, 900, [("M", 0)])
+    db.commit()
+    facets.rebuild_all(db)
+    assert _counts(db, facets.ALL_CATEGORIES, "availability") == {}
+
+    product.variants[0].stock_quantity = 5
+    db.commit()
+    facets.refresh(db, [kurtas.id])
+    assert _counts(db, facets.ALL_CATEGORIES, "availability") == {facets.IN_STOCK: 1}
@@ -0,0 +1,81 @@
+import gzip
+import json
+import os
+import pytest
+from app.config import settings
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.services import changelog, feeds
+
+@pytest.fixture
+def catalog(db, monkeypatch):
+    monkeypatch.setattr(settings, "FEED_CHUNK_PRODUCTS", 2)
+    monkeypatch.setattr(feeds, "STREAM_BATCH_SIZE", 3)  # Pages that don't line up with chunks
+    products = []
+    for number in range(1, 6):
+        product = Product(id=f"prod-{number}", name=f"Product {number}", slug=f"product-{number}", base_price=999)
+        db.add(product)
+        db.add(ProductVariant(product_id=product.id, sku=f"SKU-{number}", size="M", color="Red", stock_quantity=3))
+        products.append(product)
+    changelog.record(db, changelog.PRODUCT, upserts=[product.id for product in products])
+    db.commit()
+    return products
+
+def _feed(directory, number: int) -> str:
+    with gzip.open(os.path.join(directory, f"feed-products-{number:04d}.xml.gz"), "rt") as f:
+        return f.read()
+
+def _manifest(directory) -> dict:
+    with open(os.path.join(directory, feeds.MANIFEST)) as f:
+        return json.load(f)
+
+def _change(db, upserts=(), deletes=()) -> None:
+    changelog.record(db, changelog.PRODUCT, upserts=upserts, deletes=deletes)
+    db.commit()
+
+def test_full_run_writes_every_chunk(db, catalog, tmp_path):
+    report = feeds.generate(db, str(tmp_path))
+
+    assert report["rewritten"] == [1, 2, 3]
+    assert (report["products"], report["items"]) == (5, 5)
+    assert "SKU-1" in _feed(tmp_path, 1) and "SKU-2" in _feed(tmp_path, 1)
+    assert "SKU-5" in _feed(tmp_path, 3)
+    manifest = _manifest(tmp_path)
+    assert [chunk["last_id"] for chunk in manifest["chunks"]] == ["prod-2", "prod-4", "prod-5"]
+    assert manifest["version"] == changelog.latest_version(db)
+    with open(tmp_path / feeds.SITEMAP_INDEX) as f:
+        assert f.read().count("<sitemap>") == 3
+
+def test_incremental_run_rewrites_only_the_changed_chunk(db, catalog, tmp_path):
+    feeds.generate(db, str(tmp_path))
+    untouched = _feed(tmp_path, 1)
+    catalog[2].name = "Renamed"
+    _change(db, upserts=[catalog[2].id])
+
+    report = feeds.generate(db, str(tmp_path))
+    assert report["rewritten"] == [2]
+    assert "Renamed" in _feed(tmp_path, 2)
+    assert _feed(tmp_path, 1) == untouched
+    assert _manifest(tmp_path)["version"] == changelog.latest_version(db)
+
+def test_deleted_product_leaves_its_chunk_boundaries(db, catalog, tmp_path):
+    feeds.generate(db, str(tmp_path))
+    db.delete(catalog[1])
+    _change(db, deletes=["prod-2"])
+
+    report = feeds.generate(db, str(tmp_path))
+    assert report["rewritten"] == [1]
+    assert "SKU-2" not in _feed(tmp_path, 1)
+    chunks = _manifest(tmp_path)["chunks"]
+    assert [chunk["last_id"] for chunk in chunks] == ["prod-2", "prod-4", "prod-5"]
+    assert chunks[0]["products"] == 1
+
+def test_chunk_overflow_falls_back_to_a_full_run(db, catalog, tmp_path):
+    feeds.generate(db, str(tmp_path))
+    # Sorts between prod-1 and prod-2, so the first chunk would hold three products
+    db.add(Product(id="prod-1a", name="Inserted", slug="inserted", base_price=999))
+    _change(db, upserts=["prod-1a"])
+
+    report = feeds.generate(db, str(tmp_path))
+    assert report["rewritten"] == [1, 2, 3]
+    assert [chunk["last_id"] for chunk in _manifest(tmp_path)["chunks"]] == ["prod-1a", "prod-3", "prod-5"]
@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine
+from app.database import Base
+import app.models  # noqa: F401
+from tests.conftest import ROOT
+
+def _alembic(url: str, *args: str) -> None:
+    # env.py reads DATABASE_URL from settings, so each run gets its own process
+    subprocess.run(
+        [sys.executable, "-m", "alembic", *args], cwd=ROOT,
+        env=dict(os.environ, DATABASE_URL=url), capture_output=True, text=True, check=True,
+    )
+
+def test_migrations_match_models(tmp_path):
+    url = "sqlite:///" + str(tmp_path / "migrated.db")
+    _alembic(url, "upgrade", "head")
+    with create_engine(url).connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), Base.metadata) == []
+
+def test_migrations_downgrade_to_base(tmp_path):
+    url = "sqlite:///" + str(tmp_path / "migrated.db")
+    _alembic(url, "upgrade", "head")
+    _alembic(url, "downgrade", "base")
+    _alembic(url, "upgrade", "head")
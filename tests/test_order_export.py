@@ -0,0 +1,41 @@
+import json
+from datetime import datetime, timedelta
+from app.models.order import Order, OrderItem, generate_order_number
+from app.models.user import User
+from app.services import order_export
+
+def _orders(db, count: int) -> list:
+    user = User(email="exporter@example.com", password_hash="x", first_name="A", last_name="B")
+    db.add(user)
+    db.flush()
+    placed = datetime(2026, 1, 1)
+    orders = []
+    for number in range(count):
+        # Pairs share a timestamp, so pages have to break ties on id
+        order = Order(order_number=generate_order_number(), user_id=user.id, subtotal=100, total_amount=100,
+                      created_at=placed + timedelta(minutes=number // 2))
+        db.add(order)
+        db.flush()
+        for item in range(number % 3):
+            db.add(OrderItem(order_id=order.id, product_name=f"Item {item}", variant_details="M / Red",
+                             quantity=1, unit_price=50, total_price=50))
+        orders.append(order)
+    db.commit()
+    return sorted(orders, key=lambda order: (order.created_at, order.id))
+
+def test_ndjson_pages_through_every_order_once(db, session_factory, monkeypatch):
+    monkeypatch.setattr(order_export, "SessionLocal", session_factory)
+    orders = _orders(db, 7)
+
+    lines = "".join(order_export.export_ndjson(None, None, [], batch_size=2)).splitlines()
+    exported = [json.loads(line) for line in lines]
+    assert [order["id"] for order in exported] == [order.id for order in orders]
+    assert [len(order["items"]) for order in exported] == [len(order.items) for order in orders]
+
+def test_csv_keeps_orders_without_items(db, session_factory, monkeypatch):
+    monkeypatch.setattr(order_export, "SessionLocal", session_factory)
+    _orders(db, 4)
+
+    lines = "".join(order_export.export_csv(None, None, [], batch_size=3)).splitlines()
+    # Header, then 1 + 1 + 2 + 1 lines for orders with 0, 1, 2 and 0 items
+    assert len(lines) == 1 + 5
@@ -0,0 +1,31 @@
+from app.models.order import Order, OrderItem, generate_order_number
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.models.user import User
+from app.services.order_status import restore_stock
+
+def test_cancelled_items_go_back_into_stock(db):
+    user = User(email="canceller@example.com", password_hash="x", first_name="A", last_name="B")
+    product = Product(name="Kurta", slug="kurta", base_price=999)
+    db.add_all([user, product])
+    db.flush()
+    variants = [ProductVariant(product_id=product.id, sku=f"K-{size}", size=size, color="Red", stock_quantity=5)
+                for size in ("M", "L")]
+    db.add_all(variants)
+    db.flush()
+    orders = []
+    for quantity in (1, 2):
+        order = Order(order_number=generate_order_number(), user_id=user.id, subtotal=999, total_amount=999)
+        db.add(order)
+        db.flush()
+        db.add_all([OrderItem(order_id=order.id, product_variant_id=variant.id, product_name="Kurta",
+                              quantity=quantity, unit_price=999, total_price=999 * quantity)
+                    for variant in variants])
+        orders.append(order)
+    db.commit()
+
+    assert restore_stock(db, [order.id for order in orders]) == [product.id]
+    db.commit()
+    for variant in variants:
+        db.refresh(variant)
+        assert variant.stock_quantity == 8
@@ -0,0 +1,109 @@
+import asyncio
+import smtplib
+import httpx
+from app.config import settings
+from app.integrations import EMAIL, WHATSAPP, FakeTransport, build_transports, email, shiprocket
+from app.integrations.shiprocket import ShiprocketTransport
+from app.models.outbox import OutboxMessage, OutboxStatus
+from app.services import outbox
+from app.workers import outbox as outbox_worker
+
+class ClosingTransport(FakeTransport):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+def test_live_mode_leaves_unconfigured_integrations_without_transport(monkeypatch):
+    monkeypatch.setattr(settings, "INTEGRATION_TRANSPORT", "live")
+    for name in ("SMTP_USER", "SHIPROCKET_EMAIL", "WHATSAPP_API_KEY"):
+        monkeypatch.setattr(settings, name, None)
+    assert build_transports() == {}
+
+def test_claim_leaves_other_integrations_pending(db):
+    outbox.enqueue(db, EMAIL, "order_confirmation", {"order_id": "1"})
+    outbox.enqueue(db, WHATSAPP, "order_confirmation", {"order_id": "1"})
+    db.commit()
+
+    claimed = outbox.claim(db, 10, 60, [EMAIL])
+    assert [message["integration"] for message in claimed] == [EMAIL]
+    waiting = db.query(OutboxMessage).filter_by(integration=WHATSAPP).one()
+    assert waiting.status == OutboxStatus.PENDING
+    assert waiting.attempts == 0
+
+def test_transports_close_after_the_last_batch(db, session_factory, monkeypatch):
+    monkeypatch.setattr(outbox_worker, "SessionLocal", session_factory)
+    outbox.enqueue(db, EMAIL, "order_confirmation", {"order_id": "1"})
+    db.commit()
+    transport = ClosingTransport(EMAIL)
+    dispatcher = outbox_worker.OutboxDispatcher({EMAIL: transport})
+
+    async def run():
+        task = asyncio.create_task(dispatcher.run())
+        while not transport.sent:
+            await asyncio.sleep(0.01)
+        await dispatcher.stop()
+        assert not transport.closed
+        await task
+
+    asyncio.run(run())
+    assert transport.closed
+    db.expire_all()
+    assert db.query(OutboxMessage).one().status == OutboxStatus.SENT
+
+class FlakyQuitSMTP:
+    sent = []
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def send_message(self, mail):
+        self.sent.append(mail["To"])
+
+    def quit(self):
+        raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+
+    def close(self):
+        pass
+
+def test_email_failing_after_the_send_still_counts_as_delivered(monkeypatch):
+    monkeypatch.setattr(email.smtplib, "SMTP", FlakyQuitSMTP)
+    messages = [
+        {"id": number, "kind": "order_confirmation", "payload": {"order_number": f"JORA-{number}", "email": f"{number}@example.com"}}
+        for number in range(3)
+    ]
+    assert asyncio.run(email.SMTPTransport().send_batch(messages)) == [None, None, None]
+    assert len(FlakyQuitSMTP.sent) == 3
+
+def test_shiprocket_bounds_calls_in_flight():
+    in_flight = peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        if request.url.path.endswith("/auth/login"):
+            return httpx.Response(200, json={"token": "t"})
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={})
+
+    async def run():
+        transport = ShiprocketTransport()
+        transport._client = httpx.AsyncClient(base_url=shiprocket.BASE_URL, transport=httpx.MockTransport(handler))
+        message = {"order_number": "JORA-1", "created_at": "2026-01-01", "subtotal": 100, "items": []}
+        try:
+            return await transport.send_batch([{"id": n, "payload": message} for n in range(20)])
+        finally:
+            await transport.close()
+
+    assert asyncio.run(run()) == [None] * 20
+    assert peak == ShiprocketTransport.max_in_flight
@@ -0,0 +1,104 @@
+import uuid
+import pytest
+from app.integrations import webhook_samples
+from app.models.order import Order, OrderStatus, PaymentStatus, generate_order_number
+from app.models.payment_event import PaymentEvent, PaymentEventStatus
+from app.models.user import User
+from app.services import payments
+from app.workers import payments as payment_worker
+
+@pytest.fixture
+def order(db):
+    user = User(email="payer@example.com", password_hash="x", first_name="A", last_name="B")
+    db.add(user)
+    db.flush()
+    order = Order(order_number=generate_order_number(), user_id=user.id, subtotal=2499, total_amount=2499)
+    db.add(order)
+    db.commit()
+    return order
+
+def _queue(db, provider: str, event: dict) -> PaymentEvent:
+    row = PaymentEvent(
+        provider=provider, event_id=event.get("id") or uuid.uuid4().hex,
+        event_type=event.get("type") or event["event"], payload=event,
+    )
+    db.add(row)
+    db.commit()
+    return row
+
+@pytest.mark.parametrize("provider, event", [
+    (payments.RAZORPAY, lambda order_id: webhook_samples.razorpay_event("payment.captured", order_id, 249900)),
+    (payments.STRIPE, lambda order_id: webhook_samples.stripe_event("payment_intent.succeeded", order_id, 249900)),
+])
+def test_capture_for_the_order_total_confirms_it(db, order, provider, event):
+    row = _queue(db, provider, event(order.id))
+
+    assert payments.process_batch(db, 10) == 1
+    db.refresh(order)
+    db.refresh(row)
+    assert row.status == PaymentEventStatus.PROCESSED
+    assert order.payment_status == PaymentStatus.COMPLETED
+    assert order.status == OrderStatus.CONFIRMED
+
+def test_underpaid_capture_leaves_order_unpaid(db, order):
+    row = _queue(db, payments.RAZORPAY, webhook_samples.razorpay_event("payment.captured", order.id, 100))
+
+    payments.process_batch(db, 10)
+    db.refresh(order)
+    db.refresh(row)
+    assert row.status == PaymentEventStatus.FAILED
+    assert "Captured 100 INR" in row.error
+    assert order.payment_status == PaymentStatus.PENDING
+
+def test_wrong_currency_capture_leaves_order_unpaid(db, order):
+    event = webhook_samples.stripe_event("payment_intent.succeeded", order.id, 249900)
+    event["data"]["object"]["currency"] = "usd"
+    row = _queue(db, payments.STRIPE, event)
+
+    payments.process_batch(db, 10)
+    db.refresh(order)
+    db.refresh(row)
+    assert row.status == PaymentEventStatus.FAILED
+    assert order.payment_status == PaymentStatus.PENDING
+
+def test_fallback_fails_only_the_event_it_claimed(db, session_factory, order, monkeypatch):
+    monkeypatch.setattr(payment_worker, "SessionLocal", session_factory)
+    broken_event = webhook_samples.razorpay_event("payment.captured", order.id, 249900)
+    broken = _queue(db, payments.RAZORPAY, broken_event)
+    good = _queue(db, payments.RAZORPAY, webhook_samples.razorpay_event("payment.captured", order.id, 249900))
+    parse_event = payments.parse_event
+
+    def failing_parse(provider, event_type, payload):
+        if payload == broken_event:
+            raise RuntimeError("unexpected payload")
+        return parse_event(provider, event_type, payload)
+
+    monkeypatch.setattr(payments, "parse_event", failing_parse)
+    assert payment_worker._process(10) == 2
+
+    db.expire_all()
+    assert db.get(PaymentEvent, broken.id).status == PaymentEventStatus.FAILED
+    assert "RuntimeError" in db.get(PaymentEvent, broken.id).error
+    assert db.get(PaymentEvent, good.id).status == PaymentEventStatus.PROCESSED
+
+def test_events_for_one_order_apply_in_order_within_a_batch(db, order):
+    captured = _queue(db, payments.RAZORPAY, webhook_samples.razorpay_event("payment.captured", order.id, 249900))
+    refunded = _queue(db, payments.RAZORPAY, webhook_samples.razorpay_event("refund.processed", order.id, 249900))
+
+    assert payments.process_batch(db, 10) == 2
+    db.refresh(order)
+    assert order.payment_status == PaymentStatus.REFUNDED
+    for row in (captured, refunded):
+        db.refresh(row)
+        assert row.status == PaymentEventStatus.PROCESSED
+
+def test_event_made_invalid_by_an_earlier_one_is_ignored(db, order):
+    first = _queue(db, payments.RAZORPAY, webhook_samples.razorpay_event("payment.captured", order.id, 249900))
+    repeat = _queue(db, payments.RAZORPAY, webhook_samples.razorpay_event("payment.captured", order.id, 249900))
+
+    payments.process_batch(db, 10)
+    db.refresh(first)
+    db.refresh(repeat)
+    assert first.status == PaymentEventStatus.PROCESSED
+    assert repeat.status == PaymentEventStatus.IGNORED
+    assert repeat.error == "completed -> completed not allowed"
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+import pytest
+from pydantic import ValidationError
+from app.models.coupon import Coupon, DiscountType
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.models.user import User
+from app.schemas import OrderItemCreate
+from app.services import pricing, reservations
+
+@pytest.fixture
+def shop(db):
+    user = User(email="shopper@example.com", password_hash="x", first_name="A", last_name="B")
+    product = Product(name="Kurta", slug="kurta", base_price=1000)
+    db.add_all([user, product])
+    db.flush()
+    variant = ProductVariant(product_id=product.id, sku="K-M", size="M", color="Red", stock_quantity=10)
+    coupon = Coupon(
+        code="SAVE10", discount_type=DiscountType.PERCENTAGE, discount_value=10, usage_limit=1,
+        valid_from=datetime.utcnow() - timedelta(days=1), valid_until=datetime.utcnow() + timedelta(days=1),
+    )
+    db.add_all([variant, coupon])
+    db.commit()
+    return user, variant, coupon
+
+def test_use_coupon_counts_uses_up_to_the_limit(db, shop):
+    _, _, coupon = shop
+    pricing.use_coupon(db, "SAVE10")
+    db.refresh(coupon)
+    assert coupon.used_count == 1
+
+    with pytest.raises(pricing.PricingError) as exc:
+        pricing.use_coupon(db, "SAVE10")
+    assert exc.value.status_code == 409
+
+def test_quote_is_not_redeemed_once_its_coupon_is_used_up(db, shop):
+    user, variant, coupon = shop
+    quoted = pricing.quote(db, user.id, [(variant.id, 1)], "SAVE10")
+    assert quoted["discount_amount"] == 100
+
+    lines = pricing.load_lines(db, [(variant.id, 1)], user_id=user.id)
+    assert pricing.redeem(db, quoted["quote_token"], user.id, lines, "SAVE10") is not None
+    coupon.used_count = 1
+    db.commit()
+    assert pricing.redeem(db, quoted["quote_token"], user.id, lines, "SAVE10") is None
+
+@pytest.mark.parametrize("quantity", [0, -3])
+def test_non_positive_quantities_are_rejected(db, shop, quantity):
+    user, variant, _ = shop
+    with pytest.raises(ValidationError):
+        OrderItemCreate(product_variant_id=variant.id, quantity=quantity)
+    # A negative line can't offset another one for the same variant either
+    items = [(variant.id, 3), (variant.id, quantity)]
+    with pytest.raises(pricing.PricingError):
+        pricing.load_lines(db, items, user_id=user.id)
+    with pytest.raises(reservations.ReservationError) as exc:
+        reservations.hold(db, user.id, items)
+    assert exc.value.status_code == 400
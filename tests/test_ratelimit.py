@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+from app import ratelimit
+from app.config import settings
+from app.ratelimit import InMemoryBackend, RateLimitMiddleware, parse_rule
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock)
+    return clock
+
+def _take(backend, key, rule) -> bool:
+    return asyncio.run(backend.take(key, rule))[0]
+
+def test_short_period_checks_keep_refilling_long_period_buckets(clock):
+    backend = InMemoryBackend(shards=1)
+    hourly = parse_rule("POST /api/auth/register", "1/hour")
+    per_minute = parse_rule("POST /api/auth/login", "5/minute")
+
+    assert _take(backend, "register|ip:a", hourly)
+    clock.now += 120
+    assert _take(backend, "login|ip:b", per_minute)
+    # Two minutes in, the hourly bucket is still empty and must not be forgotten
+    assert not _take(backend, "register|ip:a", hourly)
+
+def test_refilled_buckets_are_dropped(clock):
+    backend = InMemoryBackend(shards=1)
+    rule = parse_rule("POST /api/auth/login", "5/minute")
+    for client in range(100):
+        _take(backend, f"login|ip:{client}", rule)
+    clock.now += 61
+    _take(backend, "login|ip:new", rule)
+
+    lrus, _ = backend._shards[0]
+    assert list(lrus[rule.period]) == ["login|ip:new"]
+
+def test_key_count_is_capped(clock):
+    backend = InMemoryBackend(shards=1, max_keys_per_shard=10)
+    rule = parse_rule("POST /api/auth/login", "5/minute")
+    for client in range(50):
+        _take(backend, f"login|ip:{client}", rule)
+
+    lrus, _ = backend._shards[0]
+    assert len(lrus[rule.period]) == 10
+    assert "login|ip:49" in lrus[rule.period]
+
+@pytest.mark.parametrize("proxies, header, expected", [
+    (0, b"6.6.6.6", "10.0.0.1"),
+    (1, b"6.6.6.6, 203.0.113.7", "203.0.113.7"),
+    (2, b"6.6.6.6, 203.0.113.7, 10.0.0.2", "203.0.113.7"),
+    (2, b"203.0.113.7", "10.0.0.1"),
+])
+def test_client_ip_uses_entry_added_by_trusted_proxies(monkeypatch, proxies, header, expected):
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUSTED_PROXIES", proxies)
+    scope = {"client": ("10.0.0.1", 5000), "headers": [(b"x-forwarded-for", header)]}
+    assert RateLimitMiddleware._client_ip(scope) == expected
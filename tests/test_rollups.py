@@ -0,0 +1,34 @@
+from sqlalchemy import select
+from app.models.analytics import DailyCategorySales
+from app.models.category import Category
+from app.models.order import Order, OrderItem, generate_order_number
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.models.user import User
+from app.services import rollups
+
+def test_removal_uses_category_recorded_on_the_item(db):
+    shirts, kurtas = Category(name="Shirts", slug="shirts"), Category(name="Kurtas", slug="kurtas")
+    user = User(email="buyer@example.com", password_hash="x", first_name="A", last_name="B")
+    db.add_all([shirts, kurtas, user])
+    db.flush()
+    product = Product(name="Linen", slug="linen", base_price=500, category_id=shirts.id)
+    db.add(product)
+    db.flush()
+    variant = ProductVariant(product_id=product.id, sku="LIN-M", size="M", color="White", stock_quantity=5)
+    order = Order(order_number=generate_order_number(), user_id=user.id, subtotal=500, total_amount=500)
+    db.add_all([variant, order])
+    db.flush()
+    db.add(OrderItem(
+        order_id=order.id, product_variant_id=variant.id, product_name="Linen", quantity=1,
+        unit_price=500, total_price=500, category_id=shirts.id,
+    ))
+    db.flush()
+
+    rollups.add_orders(db, [order.id])
+    product.category_id = kurtas.id
+    db.flush()
+    rollups.remove_orders(db, [order.id])
+
+    rows = db.execute(select(DailyCategorySales.category_id, DailyCategorySales.units)).all()
+    assert rows == [(shirts.id, 0)]
@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+from app.models.shipping import ShippingZone, ShippingZonePrefix
+from app.services import shipping_rules
+
+def _zone(db, name: str, prefixes: list) -> ShippingZone:
+    zone = ShippingZone(name=name, pincode_prefixes=prefixes, rate=49)
+    db.add(zone)
+    db.flush()
+    shipping_rules.set_zone_prefixes(db, zone.id, prefixes)
+    db.commit()
+    return zone
+
+@pytest.fixture
+def fresh_index(monkeypatch):
+    monkeypatch.setattr(shipping_rules, "_index", None)
+    monkeypatch.setattr(shipping_rules, "_stale", False)
+
+def test_prefix_owned_by_another_zone_is_rejected(db):
+    south = _zone(db, "South", ["560", "600"])
+    east = ShippingZone(name="East", pincode_prefixes=["600", "700"], rate=59)
+    db.add(east)
+    db.flush()
+
+    with pytest.raises(shipping_rules.PrefixConflict, match="600 already belongs to 'South'"):
+        shipping_rules.set_zone_prefixes(db, east.id, east.pincode_prefixes)
+    db.rollback()
+    assert shipping_rules.compile_rules(db).zone("600001").id == south.id
+
+def test_database_keeps_a_prefix_to_one_zone(db):
+    south = _zone(db, "South", ["560"])
+    east = _zone(db, "East", ["700"])
+    db.add(ShippingZonePrefix(prefix="560", zone_id=east.id))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
+    assert db.get(ShippingZonePrefix, "560").zone_id == south.id
+
+def test_zone_can_replace_its_own_prefixes(db):
+    zone = _zone(db, "South", ["560", "600"])
+    shipping_rules.set_zone_prefixes(db, zone.id, ["560", "641"])
+    db.commit()
+
+    index = shipping_rules.compile_rules(db)
+    assert index.zone("641001").id == zone.id
+    assert index.zone("600001") is None
+
+def test_current_keeps_last_good_index_when_rules_conflict(db, fresh_index, monkeypatch):
+    _zone(db, "South", ["560"])
+    good = shipping_rules.current(db)
+
+    def conflicting(db):
+        raise shipping_rules.PrefixConflict("Prefix 560 belongs to both 'South' and 'East'")
+
+    monkeypatch.setattr(shipping_rules, "compile_rules", conflicting)
+    shipping_rules._invalidate({})
+    assert shipping_rules.current(db) is good
@@ -0,0 +1,47 @@
+import json
+from app.models.product import Product
+from app.models.product_variant import ProductVariant
+from app.snapshot import CatalogSnapshot, build, with_live_fields
+
+def test_snapshot_round_trip(db, tmp_path):
+    db.add_all([
+        Product(name="Kurta", slug="kurta", base_price=999),
+        Product(name="Saree", slug="saree", base_price=1999),
+    ])
+    db.commit()
+    path = str(tmp_path / "catalog.snapshot")
+
+    stats = build(db, path)
+    snap = CatalogSnapshot(path)
+
+    assert stats["products"] == snap.products == 2
+    product = json.loads(bytes(snap.product_by_slug("saree")))
+    assert product["name"] == "Saree"
+    assert json.loads(bytes(snap.product_by_id(product["id"])))["slug"] == "saree"
+    assert snap.product_by_slug("missing") is None
+    assert list(snap.slugs()) == ["kurta", "saree"]
+
+def test_stock_and_active_flag_are_read_live(db, tmp_path):
+    product = Product(name="Kurta", slug="kurta", base_price=999)
+    db.add(product)
+    db.flush()
+    variants = [ProductVariant(product_id=product.id, sku=f"K-{size}", size=size, color="Red", stock_quantity=5)
+                for size in ("M", "L")]
+    db.add_all(variants)
+    db.commit()
+    path = str(tmp_path / "catalog.snapshot")
+    build(db, path)
+    data = CatalogSnapshot(path).product_by_slug("kurta")
+    assert "stock_quantity" not in json.loads(bytes(data))["variants"][0]
+
+    variants[0].stock_quantity = 1
+    product.is_active = False
+    db.delete(variants[1])
+    db.commit()
+    live = with_live_fields(db, data)
+    assert live["is_active"] is False
+    assert [(variant["sku"], variant["stock_quantity"]) for variant in live["variants"]] == [("K-M", 1)]
+
+    db.delete(product)
+    db.commit()
+    assert with_live_fields(db, data) is None
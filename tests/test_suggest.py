@@ -0,0 +1,79 @@
+import random
+from app.services.suggest import CATEGORY, PRODUCT, SCAN_LIMIT, Suggestion, SuggestIndex
+
+WORDS = ["linen", "silk", "cotton", "satin", "slim", "straight", "shirt", "saree", "kurta", "kaftan"]
+
+def _catalog(rng: random.Random, count: int, weights) -> dict:
+    products = {}
+    for number in range(count):
+        name = " ".join(rng.sample(WORDS, 3))
+        products[number] = Suggestion(PRODUCT, number, name, f"p-{number}", next(weights))
+    return products
+
+def _prefixes() -> set:
+    prefixes = set()
+    for word in WORDS:
+        prefixes.update(word[:length] for length in range(1, len(word) + 1))
+    for first in WORDS:
+        for second in WORDS:
+            prefixes.add(f"{first} {second[:2]}")
+    return prefixes
+
+def _assert_same_lookups(applied: SuggestIndex, built: SuggestIndex) -> None:
+    assert applied.precomputed == built.precomputed
+    for prefix in _prefixes():
+        assert applied.lookup(prefix, 20) == built.lookup(prefix, 20), prefix
+
+def _edit(rng: random.Random, products: dict, weights, changes: int):
+    """Remove, re-weight and add `changes` products each; returns (removed refs, added entries)"""
+    ids = rng.sample(sorted(products), 2 * changes)
+    removed = {(PRODUCT, product_id) for product_id in ids[:changes]}
+    for product_id in ids[:changes]:
+        del products[product_id]
+    added = []
+    for product_id in ids[changes:]:
+        products[product_id] = products[product_id]._replace(weight=next(weights))
+        added.append(products[product_id])
+    start = max(products) + 1
+    for number in range(start, start + changes):
+        products[number] = Suggestion(PRODUCT, number, " ".join(rng.sample(WORDS, 2)), f"p-{number}", next(weights))
+        added.append(products[number])
+    added.append(Suggestion(CATEGORY, 1, "Linen Sarees", "linen-sarees", next(weights)))
+    products["category"] = added[-1]
+    return removed, added
+
+def _weights(rng: random.Random):
+    # Distinct weights give a total order, so both indexes must agree exactly
+    return iter(rng.sample(range(1, 10 ** 7), 10 ** 5))
+
+def test_small_edit_matches_a_fresh_build():
+    rng = random.Random(1)
+    weights = _weights(rng)
+    products = _catalog(rng, 1500, weights)
+    index = SuggestIndex.build(products.values())
+    assert index.precomputed
+
+    removed, added = _edit(rng, products, weights, 3)
+    _assert_same_lookups(index.apply(removed, added), SuggestIndex.build(products.values()))
+
+def test_large_edit_merges_and_matches_a_fresh_build():
+    rng = random.Random(2)
+    weights = _weights(rng)
+    products = _catalog(rng, 1500, weights)
+    index = SuggestIndex.build(products.values())
+
+    removed, added = _edit(rng, products, weights, 200)
+    assert len(added) * 3 > SCAN_LIMIT  # More keys than the in-place path takes
+    _assert_same_lookups(index.apply(removed, added), SuggestIndex.build(products.values()))
+
+def test_removing_a_top_result_promotes_the_next_one():
+    rng = random.Random(3)
+    weights = _weights(rng)
+    products = _catalog(rng, 1500, weights)
+    index = SuggestIndex.build(products.values())
+    best = index.lookup("s", 1)[0]
+    del products[best.id]
+
+    applied = index.apply({(PRODUCT, best.id)}, [])
+    assert best not in applied.lookup("s", 20)
+    _assert_same_lookups(applied, SuggestIndex.build(products.values()))